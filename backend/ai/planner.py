@@ -1,16 +1,29 @@
 import os
 import json
-from groq import Groq
+import threading
+
+from jobs.offload import offload, offload_llm
+from storage.workspace import load_scrape_fields
+from monitoring.metrics import timed_llm_call
 
 class CoursePlanner:
     def __init__(self):
-        api_key = os.environ.get("GROQ_API_KEY")
-        if api_key:
-            self.client = Groq(api_key=api_key)
-        else:
-            self.client = None
+        self.api_key = os.environ.get("GROQ_API_KEY")
+        self._client = None
+        self._client_lock = threading.Lock()
+        if not self.api_key:
             print("Warning: CoursePlanner initialized without GROQ_API_KEY")
 
+    @property
+    def client(self):
+        """Groq client, or None without a key. Built on first use: the SDK import is slow."""
+        if self._client is None and self.api_key:
+            with self._client_lock:
+                if self._client is None:
+                    from groq import Groq
+                    self._client = Groq(api_key=self.api_key)
+        return self._client
+
     async def generate_outline(self, scraped_data_path):
         if not self.client:
             raise ValueError("GROQ_API_KEY is missing. Please set it in the .env file.")
@@ -18,11 +31,16 @@ class CoursePlanner:
         if not os.path.exists(scraped_data_path):
             raise FileNotFoundError(f"Scraped data not found at {scraped_data_path}")
 
-        with open(scraped_data_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        # Title and text only; a scrape pack lets this skip the element data
+        data = await offload(load_scrape_fields, scraped_data_path, ("title", "text_content"))
+        return await self.outline_for(data.get("title", "Untitled Course"), data.get("text_content", ""))
+
+    async def outline_for(self, title, text_content):
+        """Course outline from a page's title and text (no scrape file needed)."""
+        if not self.client:
+            raise ValueError("GROQ_API_KEY is missing. Please set it in the .env file.")
 
-        title = data.get("title", "Untitled Course")
-        text_content = data.get("text_content", "")[:15000] # Groq Llama 3 has good context
+        text_content = text_content[:15000] # Groq Llama 3 has good context
 
         prompt = f"""
         You are an expert curriculum designer. 
@@ -49,7 +67,10 @@ class CoursePlanner:
         }}
         """
 
-        response = self.client.chat.completions.create(
+        # The Groq SDK call is synchronous; run it off the event loop.
+        response = await offload_llm(
+            timed_llm_call, "groq", "outline",
+            self.client.chat.completions.create,
             model="llama-3.3-70b-versatile",  # Updated to current model
             messages=[
                 {"role": "system", "content": "You are a helpful assistant that generates JSON curriculum. Return ONLY valid JSON."},
@@ -91,7 +112,10 @@ class CoursePlanner:
         Do NOT output JSON. Output pure Markdown with proper punctuation.
         """
 
-        response = self.client.chat.completions.create(
+        # The Groq SDK call is synchronous; run it off the event loop.
+        response = await offload_llm(
+            timed_llm_call, "groq", "lesson",
+            self.client.chat.completions.create,
             model="llama-3.3-70b-versatile",
             messages=[
                 {"role": "system", "content": "You are a helpful technical writer who always uses proper punctuation."},
@@ -171,7 +195,10 @@ class CoursePlanner:
 
         print(f"Generating quiz for content length: {len(lesson_content)}")
 
-        response = self.client.chat.completions.create(
+        # The Groq SDK call is synchronous; run it off the event loop.
+        response = await offload_llm(
+            timed_llm_call, "groq", "quiz",
+            self.client.chat.completions.create,
             model="llama-3.3-70b-versatile",
             messages=[
                 {"role": "system", "content": "You are a quiz generator. Return only valid JSON."},
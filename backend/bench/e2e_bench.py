@@ -0,0 +1,290 @@
+"""Offline end-to-end benchmark: navigate, extract, plan, lesson, quiz and video render.
+
+Run from backend/:
+
+    python -m bench.e2e_bench --out bench_before.json
+    # ...change something...
+    python -m bench.e2e_bench --out bench_after.json --compare bench_before.json
+
+Everything runs locally. The fixture site (bench/site_fixture.py) serves
+pages of different size, and two LLM stubs (bench/llm_stub.py) stand in for
+Groq and OpenAI with fixed latency. The app is driven in-process through
+FastAPI's TestClient with the fixture host exempted from the SSRF check via
+BENCH_ALLOWED_HOSTS. Catalog, workspaces and the TTS cache live in a temp
+directory, so each run starts cold; the videos and screenshots it produces
+are deleted afterwards.
+
+If Chromium isn't installed, navigate and extract are recorded as errors and
+the page is scraped statically instead, so the remaining stages still run.
+
+The report is JSON with the commit, machine and stub latencies; each stage
+has per-repeat samples and their median. ``--compare`` prints the ratio to
+a previous report and exits non-zero if any stage got slower by more than
+``--threshold`` (and by more than ``--min-delta`` seconds, to ignore noise).
+"""
+import os
+import sys
+import json
+import time
+import glob
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from bench.site_fixture import PAGES, start_site, static_scrape
+from bench.llm_stub import DEFAULT_LATENCY, start_stub
+
+REPORT_VERSION = 1
+STAGES = ("launch", "navigate", "extract", "plan", "lesson", "quiz", "video")
+VIDEO_TIMEOUT = 900
+
+
+def git_info():
+    def run(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True,
+                                  timeout=30).stdout.strip()
+        except Exception:
+            return ""
+    return {"commit": run("rev-parse", "--short", "HEAD") or None,
+            "dirty": bool(run("status", "--porcelain", "--untracked-files=no"))}
+
+
+class Run:
+    """Times API calls made through the TestClient and records each stage's outcome."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def call(self, method, path, **kwargs):
+        start = time.perf_counter()
+        res = self.client.request(method, path, **kwargs)
+        elapsed = time.perf_counter() - start
+        if res.status_code >= 400:
+            raise RuntimeError(f"{method} {path} -> {res.status_code} {res.text[:200]}")
+        return res.json(), elapsed
+
+    def video(self, title, content, course_id):
+        start = time.perf_counter()
+        body, _ = self.call("POST", "/api/ai/video",
+                            json={"title": title, "text_content": content, "course_id": course_id})
+        job_id = body["job_id"]
+        while body.get("status") not in ("complete", "failed"):
+            if time.perf_counter() - start > VIDEO_TIMEOUT:
+                raise RuntimeError(f"video job {job_id} timed out")
+            time.sleep(0.25)
+            body, _ = self.call("GET", f"/api/ai/video/status/{job_id}")
+        if body["status"] == "failed":
+            raise RuntimeError(f"video job failed: {body.get('detail')}")
+        return body, time.perf_counter() - start
+
+
+def bench_page(run, main, name, url, repeat, with_video, nonce, produced):
+    course_id = f"bench-{name}"
+    samples = {stage: [] for stage in STAGES}
+    errors = {}
+    extract_mode = "browser"
+
+    def record(stage, fn):
+        if stage in errors:
+            return None
+        try:
+            result, seconds = fn()
+        except Exception as e:
+            errors[stage] = str(e)
+            print(f"[BENCH] {name}: {stage} failed: {e}")
+            return None
+        samples[stage].append(seconds)
+        return result
+
+    for i in range(repeat):
+        print(f"[BENCH] {name} ({i + 1}/{repeat})")
+        record("launch", lambda: run.call("POST", "/api/browser/launch", json={"headless": True, "use_auth": False}))
+        record("navigate", lambda: run.call("POST", "/api/browser/navigate", json={"url": url}))
+        scraped = record("extract", lambda: run.call("POST", f"/api/browser/scrape?course_id={course_id}"))
+        if scraped and scraped["data"].get("screenshot"):
+            produced["screenshots"].add(scraped["data"]["screenshot"])
+        if "extract" in errors:
+            extract_mode = "static"
+            main.workspaces.get(course_id).write_scrape(static_scrape(name, url))
+
+        planned = record("plan", lambda: run.call("POST", f"/api/ai/plan?course_id={course_id}"))
+        if not planned:
+            break
+        first = planned["plan"]["modules"][0]
+        lesson_title = first["lessons"][0]["title"]
+        lesson = record("lesson", lambda: run.call("POST", "/api/ai/lesson", json={
+            "lesson_title": lesson_title, "module_title": first["title"], "course_id": course_id}))
+        if not lesson:
+            break
+        record("quiz", lambda: run.call("POST", "/api/ai/quiz", json={"lesson_content": lesson["content"],
+                                                                     "course_id": course_id}))
+        if with_video:
+            # A fresh title per run so the render cache never short-circuits the measurement.
+            video = record("video", lambda: run.video(f"{lesson_title} {nonce}-{i}", lesson["content"], course_id))
+            if video and video.get("video_url"):
+                produced["videos"].add(video["video_url"])
+
+    results = {}
+    for stage in STAGES:
+        if stage == "video" and not with_video:
+            continue
+        if samples[stage]:
+            results[stage] = {"status": "ok", "seconds": round(statistics.median(samples[stage]), 4),
+                              "samples": [round(s, 4) for s in samples[stage]]}
+        else:
+            results[stage] = {"status": "error", "detail": errors.get(stage, "not run")}
+    results["extract_mode"] = extract_mode
+    # Where the last build's time went, from the course trace (see monitoring/tracing.py).
+    res = run.client.get("/api/course/trace", params={"course_id": course_id})
+    if res.status_code == 200:
+        results["trace_ms"] = res.json()["by_name_ms"]
+    return results
+
+
+def cleanup(produced, presenters_before):
+    for path in produced["screenshots"]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    for url in produced["videos"]:
+        stem = os.path.join(BACKEND_DIR, "media", os.path.basename(url))[:-len(".mp4")]
+        for path in glob.glob(stem + "*"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        shutil.rmtree(os.path.join(BACKEND_DIR, "media", "hls", os.path.basename(stem)), ignore_errors=True)
+    for path in set(glob.glob(os.path.join(BACKEND_DIR, "media", "presenter_*"))) - presenters_before:
+        os.remove(path)
+
+
+def run_bench(pages, repeat, with_video, groq_latency, openai_latency, speech_latency, image_latency):
+    tmp = tempfile.mkdtemp(prefix="e2e_bench_")
+    site, site_url = start_site()
+    groq, groq_url, groq_calls = start_stub(latency={"chat": groq_latency})
+    openai, openai_url, openai_calls = start_stub(
+        latency={"chat": openai_latency, "speech": speech_latency, "image": image_latency})
+    # All read at import / client construction, so set before the app is imported.
+    os.environ.update({
+        "GROQ_API_KEY": "bench", "GROQ_BASE_URL": groq_url,
+        "OPENAI_API_KEY": "bench", "OPENAI_BASE_URL": f"{openai_url}/v1",
+        "BENCH_ALLOWED_HOSTS": site_url.split("//", 1)[1],
+        "CATALOG_PATH": os.path.join(tmp, "catalog.db"),
+        "COURSE_WORKSPACES_DIR": os.path.join(tmp, "courses"),
+        "TTS_CACHE_DIR": os.path.join(tmp, "tts"),
+        "SCREENSHOT_RETENTION_DAYS": "100000",
+        "VIDEO_BROLL_CLIPS": "0",
+    })
+    os.chdir(BACKEND_DIR)
+    presenters_before = set(glob.glob(os.path.join(BACKEND_DIR, "media", "presenter_*")))
+    produced = {"screenshots": set(), "videos": set()}
+
+    from fastapi.testclient import TestClient
+    import main
+
+    report = {
+        "version": REPORT_VERSION,
+        **git_info(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpus": os.cpu_count()},
+        "config": {
+            "repeat": repeat, "video": with_video,
+            "pages": {name: {"text_chars": PAGES[name][0], "elements": PAGES[name][1]} for name in pages},
+            "stub_latency": {"groq_chat": groq_latency, "openai_chat": openai_latency,
+                             "openai_speech": speech_latency, "openai_image": image_latency},
+            "presenter_cached": bool(presenters_before),
+        },
+        "pages": {},
+    }
+    nonce = str(int(time.time()))
+    start = time.perf_counter()
+    try:
+        with TestClient(main.app) as client:
+            run = Run(client)
+            for name in pages:
+                report["pages"][name] = bench_page(run, main, name, f"{site_url}/{name}.html", repeat,
+                                                   with_video, nonce, produced)
+            try:
+                client.post("/api/browser/close")
+            except Exception:
+                pass
+    finally:
+        cleanup(produced, presenters_before)
+        site.shutdown()
+        groq.shutdown()
+        openai.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+    report["total_seconds"] = round(time.perf_counter() - start, 2)
+    report["stub_calls"] = {"groq": dict(groq_calls), "openai": dict(openai_calls)}
+    return report
+
+
+def compare(report, baseline, threshold, min_delta):
+    """Per-stage ratios against ``baseline``; returns the list of regressions."""
+    regressions = []
+    print(f"\nvs {baseline.get('commit')} ({baseline.get('created')})")
+    print(f"{'page':<8} {'stage':<9} {'before':>9} {'after':>9} {'ratio':>7}")
+    for name, stages in report["pages"].items():
+        old_stages = baseline.get("pages", {}).get(name, {})
+        for stage in STAGES:
+            new, old = stages.get(stage), old_stages.get(stage)
+            if not new or not old or new.get("status") != "ok" or old.get("status") != "ok":
+                continue
+            ratio = new["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+            slower = ratio > 1 + threshold and new["seconds"] - old["seconds"] > min_delta
+            flag = "  REGRESSION" if slower else ""
+            print(f"{name:<8} {stage:<9} {old['seconds']:>9.3f} {new['seconds']:>9.3f} {ratio:>6.2f}x{flag}")
+            if slower:
+                regressions.append({"page": name, "stage": stage, "before": old["seconds"],
+                                    "after": new["seconds"], "ratio": round(ratio, 3)})
+    if baseline.get("config", {}).get("stub_latency") != report["config"]["stub_latency"]:
+        print("note: stub latencies differ between the two reports")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default=",".join(PAGES), help=f"comma-separated subset of {list(PAGES)}")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--no-video", action="store_true", help="skip the video render stage")
+    parser.add_argument("--groq-latency", type=float, default=DEFAULT_LATENCY["chat"])
+    parser.add_argument("--openai-latency", type=float, default=DEFAULT_LATENCY["chat"])
+    parser.add_argument("--speech-latency", type=float, default=DEFAULT_LATENCY["speech"])
+    parser.add_argument("--image-latency", type=float, default=DEFAULT_LATENCY["image"])
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown ratio (0.2 = 20%%)")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="ignore slowdowns under this many seconds")
+    args = parser.parse_args()
+
+    pages = [p.strip() for p in args.pages.split(",") if p.strip()]
+    unknown = [p for p in pages if p not in PAGES]
+    if unknown:
+        parser.error(f"unknown pages: {unknown}")
+
+    report = run_bench(pages, max(1, args.repeat), not args.no_video, args.groq_latency, args.openai_latency,
+                       args.speech_latency, args.image_latency)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.threshold, args.min_delta)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.out}")
+    else:
+        print(json.dumps(report, indent=2))
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Import-time profile of the API process (per-module milliseconds).
+
+Run from backend/:
+
+    python -m bench.import_profile
+    python -m bench.import_profile --out imports.json --compare imports_before.json
+
+Imports ``main`` (or ``--module``) in fresh interpreters with
+``python -X importtime`` and reports the median over ``--runs``: total
+import time, the slowest modules by cumulative time, and self time rolled up
+by top-level package. ``--compare`` prints the change against an earlier
+report and exits non-zero if the total grew by more than ``--threshold``.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile_once(module):
+    """{module: (self us, cumulative us, depth)} for one cold import, plus wall ms."""
+    env = {**os.environ, "STARTUP_WARMUP": "0"}
+    start = time.perf_counter()
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=BACKEND_DIR,
+                         env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if res.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{res.stderr[-2000:]}")
+    modules = {}
+    for line in res.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if m:
+            modules[m.group(4)] = (int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2)
+    return modules, wall_ms
+
+
+def profile(module, runs, top):
+    samples = [profile_once(module) for _ in range(runs)]
+    names = set().union(*(mods for mods, _ in samples))
+
+    def median_ms(name, field):
+        return round(statistics.median(s[0].get(name, (0, 0, 0))[field] for s in samples) / 1000, 2)
+
+    modules = {name: {"self_ms": median_ms(name, 0), "cumulative_ms": median_ms(name, 1),
+                      "depth": samples[0][0].get(name, (0, 0, 0))[2]} for name in names}
+    packages = {}
+    for name, rec in modules.items():
+        pkg = name.split(".")[0]
+        packages[pkg] = round(packages.get(pkg, 0) + rec["self_ms"], 2)
+    slowest = sorted(modules.items(), key=lambda kv: kv[1]["cumulative_ms"], reverse=True)
+    return {
+        "module": module,
+        "runs": runs,
+        "total_ms": modules.get(module, {}).get("cumulative_ms", 0.0),
+        "process_wall_ms": round(statistics.median(w for _, w in samples), 1),
+        "module_count": len(modules),
+        # Direct imports of the profiled module: where its own startup time goes.
+        "direct": {n: r["cumulative_ms"] for n, r in slowest if r["depth"] == 1},
+        "slowest": {n: r for n, r in slowest[:top]},
+        "packages": dict(sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed growth of the total (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    report = profile(args.module, max(1, args.runs), args.top)
+    print(f"import {report['module']}: {report['total_ms']:.0f}ms "
+          f"({report['module_count']} modules, process {report['process_wall_ms']:.0f}ms)")
+    print("\ndirect imports (cumulative ms)")
+    for name, ms in list(report["direct"].items())[:args.top]:
+        print(f"  {ms:>9.1f}  {name}")
+    print("\nby package (self ms)")
+    for name, ms in report["packages"].items():
+        print(f"  {ms:>9.1f}  {name}")
+
+    regressed = False
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            before = json.load(f)
+        ratio = report["total_ms"] / before["total_ms"] if before.get("total_ms") else float("inf")
+        regressed = ratio > 1 + args.threshold
+        print(f"\ntotal {before['total_ms']:.0f}ms -> {report['total_ms']:.0f}ms ({ratio:.2f}x)"
+              + ("  REGRESSION" if regressed else ""))
+        for name, ms in report["direct"].items():
+            old = before.get("direct", {}).get(name)
+            if old is None:
+                print(f"  new import: {name} ({ms:.1f}ms)")
+            elif ms - old > 20:
+                print(f"  slower: {name} {old:.1f}ms -> {ms:.1f}ms")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.out}")
+    if regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Local stand-ins for the Groq and OpenAI APIs with configurable latency.
+
+Run from backend/:
+
+    python -m bench.llm_stub --port 8767 --chat-latency 0.8
+
+then point the SDKs at it (both read these at client construction):
+
+    GROQ_BASE_URL=http://127.0.0.1:8767  OPENAI_BASE_URL=http://127.0.0.1:8767/v1
+
+Chat completions answer with canned content picked from the system prompt
+(course outline JSON, quiz JSON, lesson markdown or narration script),
+speech returns silent 24kHz PCM sized to the input text, and image
+generation returns a URL to a generated PNG on the stub itself. Responses
+are deterministic so every run does the same downstream work.
+"""
+import sys
+import json
+import time
+import argparse
+import threading
+from io import BytesIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds each kind of call takes before answering.
+DEFAULT_LATENCY = {"chat": 0.5, "speech": 0.2, "image": 1.0}
+# Narration pace used to size the silent speech (characters per second).
+SPEECH_CHARS_PER_SECOND = 15
+PCM_RATE = 24000
+
+OUTLINE = {
+    "course_title": "Fixture Product Guide",
+    "description": "A generated course over the benchmark fixture site.",
+    "modules": [
+        {"title": f"Module {m}: Working with the product",
+         "lessons": [{"title": f"Lesson {m}.{l}", "description": f"Covers part {l} of module {m}."}
+                     for l in range(1, 4)]}
+        for m in range(1, 4)
+    ],
+}
+
+QUIZ = {"questions": [
+    {"question": f"Which setting controls part {i}?", "options": ["Billing", "Team", "Usage", "Storage"],
+     "correct_index": i % 4}
+    for i in range(3)
+]}
+
+LESSON = "\n\n".join(
+    [f"## Step {i}\n\nThis step explains how the dashboard, project settings and team invites fit together. "
+     "Each setting is described in plain language with the reasoning behind it. "
+     "Review the usage page after every change to confirm the result."
+     for i in range(1, 7)]
+    + ["## Key Takeaways\n\n- Settings are grouped by project.\n- Usage reflects changes within a minute."]
+)
+
+SCRIPT = (
+    "Welcome to this lesson. Today we walk through the dashboard and the project settings. "
+    "First, open the settings page and review the team members. Next, check the usage page to see "
+    "how storage and functions are counted. Finally, invite a colleague and confirm the change. "
+    "That is everything you need to get started."
+)
+
+
+def _chat_content(payload):
+    system = " ".join(m.get("content", "") for m in payload.get("messages", []) if m.get("role") == "system")
+    if "quiz" in system.lower():
+        return json.dumps(QUIZ)
+    if "curriculum" in system.lower():
+        return json.dumps(OUTLINE)
+    if "scriptwriter" in system.lower():
+        return SCRIPT
+    return f"# Lesson\n\n{LESSON}"
+
+
+def _presenter_png():
+    from PIL import Image
+    buf = BytesIO()
+    Image.new("RGB", (1024, 1024), (120, 130, 150)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def make_handler(latency):
+    latency = {**DEFAULT_LATENCY, **(latency or {})}
+    counts = {}
+    lock = threading.Lock()
+    png = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code, body, content_type="application/json"):
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _count(self, kind):
+            with lock:
+                counts[kind] = counts.get(kind, 0) + 1
+            time.sleep(latency[kind])
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            path = self.path.rstrip("/")
+            if path.endswith("/chat/completions"):
+                self._count("chat")
+                body = {
+                    "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()),
+                    "model": payload.get("model", "stub"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": _chat_content(payload)}}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                }
+                return self._send(200, json.dumps(body).encode("utf-8"))
+            if path.endswith("/audio/speech"):
+                self._count("speech")
+                seconds = max(0.5, len(payload.get("input", "")) / SPEECH_CHARS_PER_SECOND)
+                return self._send(200, b"\x00\x00" * int(seconds * PCM_RATE), "application/octet-stream")
+            if path.endswith("/images/generations"):
+                self._count("image")
+                host, port = self.server.server_address[:2]
+                body = {"created": int(time.time()), "data": [{"url": f"http://{host}:{port}/stub/presenter.png"}]}
+                return self._send(200, json.dumps(body).encode("utf-8"))
+            self._send(404, b'{"error": "not found"}')
+
+        def do_GET(self):
+            if self.path == "/stub/presenter.png":
+                with lock:
+                    if "body" not in png:
+                        png["body"] = _presenter_png()
+                return self._send(200, png["body"], "image/png")
+            if self.path == "/stub/stats":
+                with lock:
+                    return self._send(200, json.dumps(counts).encode("utf-8"))
+            self._send(404, b'{"error": "not found"}')
+
+    Handler.counts = counts
+    return Handler
+
+
+def start_stub(port=0, latency=None):
+    """Serves the stub in a daemon thread; returns (server, base URL, call counts by kind)."""
+    handler = make_handler(latency)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", handler.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--chat-latency", type=float, default=DEFAULT_LATENCY["chat"])
+    parser.add_argument("--speech-latency", type=float, default=DEFAULT_LATENCY["speech"])
+    parser.add_argument("--image-latency", type=float, default=DEFAULT_LATENCY["image"])
+    args = parser.parse_args()
+    latency = {"chat": args.chat_latency, "speech": args.speech_latency, "image": args.image_latency}
+    server, base_url, _ = start_stub(args.port, latency)
+    print(f"LLM stub listening at {base_url} (latency {latency})")
+    print(f"  GROQ_BASE_URL={base_url}  OPENAI_BASE_URL={base_url}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
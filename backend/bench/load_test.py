@@ -0,0 +1,402 @@
+"""Concurrent load generator replaying instructor journeys against the API.
+
+Run from backend/:
+
+    python -m bench.load_test --concurrency 20 --duration 60
+    python -m bench.load_test --rate 5 --duration 60 --journey author
+    python -m bench.load_test --base-url http://127.0.0.1:8000 --concurrency 10 --journeys 50
+
+By default a backend is started with uvicorn on a free port, wired to the
+offline stubs (bench/llm_stub.py, bench/site_fixture.py) exactly as
+bench/e2e_bench.py does, so results are reproducible and cost nothing.
+Every virtual user owns a course workspace that is pre-seeded with a
+static scrape of a fixture page and the stub's course plan, so the AI
+steps work even without Chromium. With ``--base-url`` the target is an
+existing server instead (scrape before planning; nothing is seeded).
+
+Load shapes:
+  --concurrency N   closed loop: N users each run journeys back to back
+  --rate R          open loop: journeys start as a Poisson process at R/s,
+                    whether or not earlier ones have finished
+
+The report gives, per endpoint and overall, the request count, error rate,
+throughput and p50/p95/p99/max latency. ``video`` steps also report the
+time until the render finished as "video render (end to end)".
+"""
+import os
+import sys
+import json
+import time
+import glob
+import random
+import shutil
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+import httpx
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from bench.site_fixture import PAGES, start_site, static_scrape
+from bench.llm_stub import DEFAULT_LATENCY, OUTLINE, start_stub
+from monitoring.loop_lag import percentile
+
+JOURNEYS = {
+    # Reading an existing course: no LLM calls beyond the lesson text.
+    "learner": ["snapshot", "course", "lesson", "lesson"],
+    # Building a course from an already-scraped site.
+    "author": ["snapshot", "plan", "lesson", "lesson", "quiz"],
+    # The whole flow including the browser and a rendered video.
+    "full": ["navigate", "scrape", "plan", "lesson", "quiz", "video"],
+}
+DEFAULT_JOURNEY = "author"
+REQUEST_TIMEOUT = 300
+VIDEO_TIMEOUT = 900
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.started = time.perf_counter()
+
+    def add(self, endpoint, seconds, ok, status):
+        self.samples.setdefault(endpoint, []).append((seconds, ok, status))
+
+    def summary(self):
+        wall = time.perf_counter() - self.started
+
+        def stats(rows):
+            latencies = sorted(r[0] for r in rows)
+            errors = sum(1 for r in rows if not r[1])
+            statuses = {}
+            for r in rows:
+                statuses[str(r[2])] = statuses.get(str(r[2]), 0) + 1
+            return {
+                "requests": len(rows),
+                "errors": errors,
+                "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+                "throughput_rps": round(len(rows) / wall, 3) if wall else 0.0,
+                "latency_ms": {
+                    "p50": round(percentile(latencies, 50) * 1000, 1),
+                    "p95": round(percentile(latencies, 95) * 1000, 1),
+                    "p99": round(percentile(latencies, 99) * 1000, 1),
+                    "max": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+                },
+                "statuses": statuses,
+            }
+
+        all_rows = [r for endpoint, rows in self.samples.items() if not endpoint.startswith("video render")
+                    for r in rows]
+        return {
+            "wall_seconds": round(wall, 2),
+            "overall": stats(all_rows),
+            "endpoints": {endpoint: stats(rows) for endpoint, rows in sorted(self.samples.items())},
+        }
+
+
+class User:
+    """One virtual instructor working on their own course."""
+
+    def __init__(self, index, client, recorder, site_url, page, produced):
+        self.course_id = f"load-{index}"
+        self.client = client
+        self.recorder = recorder
+        self.url = f"{site_url}/{page}.html" if site_url else None
+        self.lessons = []
+        self.next_lesson = 0
+        self.content = ""
+        self.produced = produced
+
+    async def request(self, endpoint, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            res = await self.client.request(method, path, **kwargs)
+            ok, status = res.status_code < 400, res.status_code
+        except httpx.HTTPError as e:
+            res, ok, status = None, False, type(e).__name__
+        self.recorder.add(endpoint, time.perf_counter() - start, ok, status)
+        return res.json() if ok else None
+
+    def _lesson(self):
+        if not self.lessons:
+            return None
+        lesson = self.lessons[self.next_lesson % len(self.lessons)]
+        self.next_lesson += 1
+        return lesson
+
+    async def step(self, name):
+        cid = {"course_id": self.course_id}
+        if name == "navigate":
+            await self.request("POST /api/browser/navigate", "POST", "/api/browser/navigate", json={"url": self.url})
+        elif name == "scrape":
+            body = await self.request("POST /api/browser/scrape", "POST", "/api/browser/scrape",
+                                      params={**cid, "fields": "text"})
+            if body and body["data"].get("screenshot"):
+                self.produced["screenshots"].add(body["data"]["screenshot"])
+        elif name == "snapshot":
+            await self.request("GET /api/browser/snapshot", "GET", "/api/browser/snapshot",
+                               params={**cid, "fields": "hotspots"})
+        elif name in ("plan", "course"):
+            if name == "plan":
+                body = await self.request("POST /api/ai/plan", "POST", "/api/ai/plan", params=cid)
+                plan = body and body["plan"]
+            else:
+                plan = await self.request("GET /api/course/current", "GET", "/api/course/current", params=cid)
+            if plan:
+                self.lessons = [(m["title"], l["title"]) for m in plan.get("modules", []) for l in m.get("lessons", [])]
+        elif name == "lesson":
+            lesson = self._lesson()
+            if lesson:
+                body = await self.request("POST /api/ai/lesson", "POST", "/api/ai/lesson", json={
+                    "module_title": lesson[0], "lesson_title": lesson[1], "course_id": self.course_id})
+                if body:
+                    self.content = body["content"]
+        elif name == "quiz":
+            if self.content:
+                await self.request("POST /api/ai/quiz", "POST", "/api/ai/quiz",
+                                   json={"lesson_content": self.content})
+        elif name == "video":
+            await self.video()
+
+    async def video(self):
+        lesson = self.lessons[0][1] if self.lessons else "Load test lesson"
+        start = time.perf_counter()
+        body = await self.request("POST /api/ai/video", "POST", "/api/ai/video", json={
+            "title": lesson, "text_content": self.content or lesson, "course_id": self.course_id})
+        if not body:
+            return
+        job_id = body["job_id"]
+        while body.get("status") not in ("complete", "failed") and time.perf_counter() - start < VIDEO_TIMEOUT:
+            await asyncio.sleep(1.0)
+            try:
+                res = await self.client.get(f"/api/ai/video/status/{job_id}")
+                body = res.json() if res.status_code == 200 else body
+            except httpx.HTTPError:
+                continue
+        ok = body.get("status") == "complete"
+        if ok:
+            self.produced["videos"].add(body["video_url"])
+        self.recorder.add("video render (end to end)", time.perf_counter() - start, ok, body.get("status"))
+
+    async def journey(self, steps):
+        for name in steps:
+            await self.step(name)
+
+
+async def closed_loop(users, steps, deadline, journeys):
+    remaining = [journeys]
+
+    async def worker(user):
+        while time.perf_counter() < deadline:
+            if journeys:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            await user.journey(steps)
+
+    await asyncio.gather(*(worker(u) for u in users))
+
+
+async def open_loop(users, steps, deadline, rate, journeys, max_inflight, seed=0):
+    rng = random.Random(seed)
+    inflight = set()
+    started = dropped = 0
+    busy = set()
+    while time.perf_counter() < deadline and (not journeys or started < journeys):
+        await asyncio.sleep(rng.expovariate(rate))
+        idle = [u for u in users if u.course_id not in busy]
+        if len(inflight) >= max_inflight or not idle:
+            dropped += 1
+            continue
+        user = idle[started % len(idle)]
+        busy.add(user.course_id)
+
+        async def run(u=user):
+            try:
+                await u.journey(steps)
+            finally:
+                busy.discard(u.course_id)
+
+        task = asyncio.create_task(run())
+        inflight.add(task)
+        task.add_done_callback(inflight.discard)
+        started += 1
+    if inflight:
+        await asyncio.gather(*inflight)
+    return {"journeys_started": started, "arrivals_dropped": dropped}
+
+
+def start_backend(tmp, users, page, latency):
+    """Starts uvicorn on the offline stubs; returns (process, base URL, site URL, stub servers)."""
+    site, site_url = start_site()
+    groq, groq_url, _ = start_stub(latency={"chat": latency["groq_chat"]})
+    openai, openai_url, _ = start_stub(latency={"chat": latency["openai_chat"], "speech": latency["openai_speech"],
+                                                "image": latency["openai_image"]})
+    workspaces = os.path.join(tmp, "courses")
+    for i in range(users):
+        path = os.path.join(workspaces, f"load-{i}", "scrape.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(static_scrape(page, f"{site_url}/{page}.html"), f)
+        # "learner" journeys open an existing course without planning one first.
+        with open(os.path.join(os.path.dirname(path), "course_plan.json"), "w", encoding="utf-8") as f:
+            json.dump(OUTLINE, f)
+
+    port = free_port()
+    env = {
+        **os.environ,
+        "GROQ_API_KEY": "bench", "GROQ_BASE_URL": groq_url,
+        "OPENAI_API_KEY": "bench", "OPENAI_BASE_URL": f"{openai_url}/v1",
+        "BENCH_ALLOWED_HOSTS": site_url.split("//", 1)[1],
+        "CATALOG_PATH": os.path.join(tmp, "catalog.db"),
+        "COURSE_WORKSPACES_DIR": workspaces,
+        "TTS_CACHE_DIR": os.path.join(tmp, "tts"),
+        "SCREENSHOT_RETENTION_DAYS": "100000",
+        "VIDEO_BROLL_CLIPS": "0",
+    }
+    log = open(os.path.join(tmp, "server.log"), "w")
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                             "--port", str(port), "--log-level", "warning"],
+                            cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"backend exited with {proc.returncode}; see {log.name}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return proc, base_url, site_url, (site, groq, openai)
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("backend did not become healthy within 60s")
+
+
+def cleanup(produced):
+    for path in produced["screenshots"]:
+        path = path if os.path.isabs(path) else os.path.join(BACKEND_DIR, path)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    for url in produced["videos"]:
+        stem = os.path.join(BACKEND_DIR, "media", os.path.basename(url))[:-len(".mp4")]
+        for path in glob.glob(stem + "*"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+async def run_load(args, base_url, site_url, produced):
+    users_n = args.concurrency or args.users
+    limits = httpx.Limits(max_connections=users_n + 10, max_keepalive_connections=users_n + 10)
+    recorder = Recorder()
+    async with httpx.AsyncClient(base_url=base_url, timeout=REQUEST_TIMEOUT, limits=limits) as client:
+        users = [User(i, client, recorder, site_url, args.page, produced) for i in range(users_n)]
+        steps = JOURNEYS.get(args.journey) or [s.strip() for s in args.journey.split(",") if s.strip()]
+        if "lesson" in steps and "plan" not in steps and "course" not in steps:
+            steps = ["course"] + steps
+        deadline = time.perf_counter() + args.duration
+        extra = {}
+        if args.rate:
+            extra = await open_loop(users, steps, deadline, args.rate, args.journeys, args.max_inflight)
+        else:
+            await closed_loop(users, steps, deadline, args.journeys)
+    report = recorder.summary()
+    report.update(extra)
+    report["config"] = {
+        "journey": args.journey, "steps": steps, "users": users_n, "page": args.page,
+        "mode": "open" if args.rate else "closed", "rate": args.rate, "duration": args.duration,
+        "journeys": args.journeys, "base_url": None if args.spawned else base_url,
+    }
+    return report
+
+
+def print_table(report):
+    print(f"\n{'endpoint':<32} {'reqs':>6} {'err%':>6} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for endpoint, s in rows:
+        lat = s["latency_ms"]
+        print(f"{endpoint:<32} {s['requests']:>6} {s['error_rate'] * 100:>5.1f}% {s['throughput_rps']:>7.2f} "
+              f"{lat['p50']:>7.0f}ms {lat['p95']:>6.0f}ms {lat['p99']:>6.0f}ms {lat['max']:>6.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--journey", default=DEFAULT_JOURNEY,
+                        help=f"one of {list(JOURNEYS)} or comma-separated steps "
+                             "(navigate, scrape, snapshot, plan, course, lesson, quiz, video)")
+    shape = parser.add_mutually_exclusive_group()
+    shape.add_argument("--concurrency", type=int, help="closed loop with this many users")
+    shape.add_argument("--rate", type=float, help="open loop: journeys started per second")
+    parser.add_argument("--users", type=int, default=20, help="user pool for --rate (default 20)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to generate load")
+    parser.add_argument("--journeys", type=int, default=0, help="stop after this many journeys (0 = no limit)")
+    parser.add_argument("--max-inflight", type=int, default=200, help="open loop: drop arrivals beyond this")
+    parser.add_argument("--page", default="medium", choices=list(PAGES), help="fixture page each course uses")
+    parser.add_argument("--base-url", help="target an existing server instead of starting one")
+    parser.add_argument("--groq-latency", type=float, default=DEFAULT_LATENCY["chat"])
+    parser.add_argument("--openai-latency", type=float, default=DEFAULT_LATENCY["chat"])
+    parser.add_argument("--speech-latency", type=float, default=DEFAULT_LATENCY["speech"])
+    parser.add_argument("--image-latency", type=float, default=DEFAULT_LATENCY["image"])
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    if not args.rate and not args.concurrency:
+        args.concurrency = 10
+    unknown = [s for s in (JOURNEYS.get(args.journey) or args.journey.split(","))
+               if s.strip() not in ("navigate", "scrape", "snapshot", "plan", "course", "lesson", "quiz", "video")]
+    if unknown:
+        parser.error(f"unknown journey steps: {unknown}")
+
+    latency = {"groq_chat": args.groq_latency, "openai_chat": args.openai_latency,
+               "openai_speech": args.speech_latency, "openai_image": args.image_latency}
+    produced = {"screenshots": set(), "videos": set()}
+    tmp = proc = None
+    servers = ()
+    args.spawned = not args.base_url
+    try:
+        if args.base_url:
+            base_url, site_url = args.base_url.rstrip("/"), None
+        else:
+            tmp = tempfile.mkdtemp(prefix="load_test_")
+            proc, base_url, site_url, servers = start_backend(tmp, args.concurrency or args.users, args.page, latency)
+            print(f"[LOAD] Backend on {base_url} (stub latency {latency})")
+        print(f"[LOAD] {args.journey} journeys, "
+              + (f"{args.rate}/s arrivals" if args.rate else f"{args.concurrency} concurrent users")
+              + f" for {args.duration}s")
+        report = asyncio.run(run_load(args, base_url, site_url, produced))
+        if args.spawned:
+            report["config"]["stub_latency"] = latency
+    finally:
+        if proc:
+            proc.terminate()
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        for server in servers:
+            server.shutdown()
+        cleanup(produced)
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    print_table(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
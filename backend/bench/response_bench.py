@@ -0,0 +1,108 @@
+"""Measures API payload size and serialization time for typical scrapes.
+
+Run from backend/:
+
+    python -m bench.response_bench
+    python -m bench.response_bench --scrape scraped_data/latest_scrape.json
+
+For each scrape (the saved snapshot plus synthetic small/large pages) it
+reports body size as stdlib JSON, compact JSON, gzip and brotli (if
+installed), the size of the ?fields=hotspots and ?fields=text selections,
+and the time to serialize with FastAPI's default JSONResponse
+(jsonable_encoder + json.dumps) against FastJSONResponse.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def synthetic_scrape(text_chars, elements, seed=0):
+    rng = random.Random(seed)
+    words = ["account", "billing", "settings", "dashboard", "project", "deploy", "database", "team",
+             "invite", "usage", "storage", "function", "analytics", "logs", "docs", "support"]
+    text = []
+    size = 0
+    while size < text_chars:
+        w = rng.choice(words)
+        text.append(w)
+        size += len(w) + 1
+    return {
+        "title": "Synthetic page",
+        "url": "https://example.com/app",
+        "text_content": " ".join(text),
+        "screenshot": "scraped_data/screenshot_1767120710.png",
+        "viewport": {"width": 1280, "height": 720},
+        "interactive_elements": [
+            {"text": f"{rng.choice(words).title()} {i}", "type": rng.choice(["a", "button"]),
+             "x": rng.uniform(0, 1280), "y": rng.uniform(0, 8000),
+             "width": rng.uniform(20, 300), "height": rng.uniform(16, 60)}
+            for i in range(elements)
+        ],
+    }
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def measure(name, data, repeat):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from web.responses import FastJSONResponse, dumps, parse_fields, select_fields
+    from web.compression import compress, brotli
+
+    payload = {"status": "loaded", "data": data}
+    compact = dumps(payload)
+    row = {
+        "scrape": name,
+        "elements": len(data.get("interactive_elements", [])),
+        "pretty_bytes": len(json.dumps(payload, indent=2).encode("utf-8")),
+        "compact_bytes": len(compact),
+        "gzip_bytes": len(compress(compact, "gzip")),
+        "br_bytes": len(compress(compact, "br")) if brotli else None,
+        "hotspots_bytes": len(dumps({"status": "loaded", "data": select_fields(data, parse_fields("hotspots"))})),
+        "text_bytes": len(dumps({"status": "loaded", "data": select_fields(data, parse_fields("text"))})),
+        "default_ms": round(timed(lambda: JSONResponse(jsonable_encoder(payload)), repeat), 3),
+        "fast_ms": round(timed(lambda: FastJSONResponse(payload), repeat), 3),
+        "gzip_ms": round(timed(lambda: compress(compact, "gzip"), repeat), 3),
+    }
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scrape", default=os.path.join("scraped_data", "latest_scrape.json"))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = []
+    if os.path.exists(args.scrape):
+        with open(args.scrape, "r", encoding="utf-8") as f:
+            cases.append(("snapshot", json.load(f)))
+    cases.append(("small", synthetic_scrape(5_000, 30)))
+    cases.append(("typical", synthetic_scrape(40_000, 100)))
+    cases.append(("large", synthetic_scrape(200_000, 1000)))
+
+    rows = [measure(name, data, args.repeat) for name, data in cases]
+    print(f"{'scrape':>9} {'elems':>5} {'pretty':>9} {'compact':>9} {'gzip':>8} {'br':>8} "
+          f"{'hotspots':>9} {'text':>8} {'default':>9} {'fast':>8}")
+    for r in rows:
+        br = r["br_bytes"] if r["br_bytes"] is not None else "-"
+        print(f"{r['scrape']:>9} {r['elements']:>5} {r['pretty_bytes']:>9} {r['compact_bytes']:>9} "
+              f"{r['gzip_bytes']:>8} {br:>8} {r['hotspots_bytes']:>9} {r['text_bytes']:>8} "
+              f"{r['default_ms']:>7.2f}ms {r['fast_ms']:>6.2f}ms")
+    print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
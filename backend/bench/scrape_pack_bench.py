@@ -0,0 +1,93 @@
+"""Size and load time of scrape packs against the JSON scrape files.
+
+Run from backend/:
+
+    python -m bench.scrape_pack_bench
+    python -m bench.scrape_pack_bench --scrape scraped_data/latest_scrape.json --out pack.json
+
+For each scrape (saved files given with --scrape plus synthetic crawls up
+to 20k elements and 2 MB of text) it writes the current JSON format
+(indent=2) and a pack, then reports file sizes and the best-of-N time to
+load everything, only the text (what /api/ai/lesson needs) and only the
+boxes and labels (what the element index needs), each from a cold open.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench.response_bench import synthetic_scrape, timed
+
+CRAWLS = [("medium", 40_000, 300), ("large", 400_000, 3_000), ("huge", 2_000_000, 20_000)]
+
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def measure(name, data, workdir, repeat):
+    from storage.scrape_pack import ScrapePack, pack_scrape
+
+    json_path = os.path.join(workdir, f"{name}.json")
+    pack_file = os.path.join(workdir, f"{name}.pack")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    pack_ms = timed(lambda: pack_scrape(data), repeat)
+    with open(pack_file, "wb") as f:
+        f.write(pack_scrape(data))
+
+    def pack_read(fn):
+        def run():
+            with ScrapePack(pack_file) as pack:
+                return fn(pack)
+        return run
+
+    json_ms = timed(lambda: load_json(json_path), repeat)
+    json_size = os.path.getsize(json_path)
+    pack_size = os.path.getsize(pack_file)
+    return {
+        "scrape": name,
+        "elements": len(data.get("interactive_elements") or []),
+        "text_chars": len(data.get("text_content") or ""),
+        "json_bytes": json_size,
+        "pack_bytes": pack_size,
+        "size_ratio": round(json_size / pack_size, 1),
+        "json_load_ms": round(json_ms, 3),
+        "pack_full_ms": round(timed(pack_read(lambda p: p.to_dict()), repeat), 3),
+        "pack_text_ms": round(timed(pack_read(lambda p: p.text()), repeat), 3),
+        "pack_boxes_ms": round(timed(pack_read(lambda p: (p.boxes(), p.labels())), repeat), 3),
+        "pack_write_ms": round(pack_ms, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scrape", action="append", default=[], help="saved scrape JSON to include (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    cases = [(os.path.basename(p), load_json(p)) for p in args.scrape]
+    cases += [(name, synthetic_scrape(chars, elements)) for name, chars, elements in CRAWLS]
+    with tempfile.TemporaryDirectory(prefix="packbench_") as workdir:
+        rows = [measure(name, data, workdir, max(1, args.repeat)) for name, data in cases]
+
+    print(f"{'scrape':<22}{'elems':>7}{'json KB':>10}{'pack KB':>10}{'ratio':>7}"
+          f"{'json ms':>10}{'full ms':>10}{'text ms':>10}{'boxes ms':>10}")
+    for r in rows:
+        print(f"{r['scrape']:<22}{r['elements']:>7}{r['json_bytes'] / 1024:>10.1f}{r['pack_bytes'] / 1024:>10.1f}"
+              f"{r['size_ratio']:>6.1f}x{r['json_load_ms']:>10.2f}{r['pack_full_ms']:>10.2f}"
+              f"{r['pack_text_ms']:>10.2f}{r['pack_boxes_ms']:>10.2f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"results": rows}, f, indent=2)
+        print(f"\nReport written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Static fixture site for offline benchmarks: generated pages of known size.
+
+Run from backend/:
+
+    python -m bench.site_fixture --port 8766
+
+Each page in PAGES is served at ``/<name>.html`` with a fixed amount of
+prose and a fixed number of links and buttons, generated from a seed so
+every run (and every commit) scrapes exactly the same content.
+"""
+import sys
+import time
+import random
+import argparse
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# name: (text characters, interactive elements)
+PAGES = {
+    "small": (2_000, 10),
+    "medium": (20_000, 60),
+    "large": (100_000, 300),
+}
+
+WORDS = ["account", "billing", "settings", "dashboard", "project", "deploy", "database", "team", "invite",
+         "usage", "storage", "function", "analytics", "logs", "docs", "support", "workflow", "report"]
+
+
+def render_page(name, text_chars, elements, seed=0):
+    rng = random.Random(f"{name}-{seed}")
+    paragraphs = []
+    size = 0
+    while size < text_chars:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16))).capitalize() + "."
+        paragraphs.append(sentence)
+        size += len(sentence) + 1
+    controls = []
+    for i in range(elements):
+        label = f"{rng.choice(WORDS).title()} {i}"
+        if i % 3 == 2:
+            controls.append(f'<button type="button">{escape(label)}</button>')
+        else:
+            controls.append(f'<a href="#{i}">{escape(label)}</a>')
+    sections = []
+    per_section = max(1, len(paragraphs) // 8)
+    for s in range(0, len(paragraphs), per_section):
+        sections.append(f"<section><h2>Section {s // per_section + 1}</h2><p>"
+                        + " ".join(paragraphs[s:s + per_section]) + "</p></section>")
+    nav = "".join(f"<li>{c}</li>" for c in controls)
+    return (f"<!doctype html><html><head><meta charset='utf-8'><title>Fixture {name.title()} Product Guide</title>"
+            "<style>body{font-family:sans-serif;max-width:960px;margin:0 auto}"
+            "li{display:inline-block;margin:4px}</style></head>"
+            f"<body><h1>Fixture {name.title()} Product Guide</h1><nav><ul>{nav}</ul></nav>"
+            + "".join(sections) + "</body></html>").encode("utf-8")
+
+
+def static_scrape(name, url):
+    """Scrape-shaped record for a fixture page, built without a browser.
+
+    Used by the benchmark when Chromium isn't available so the AI and video
+    stages still run against the same content; there's no screenshot and no
+    element geometry.
+    """
+    from bs4 import BeautifulSoup
+    text_chars, elements = PAGES[name]
+    soup = BeautifulSoup(render_page(name, text_chars, elements), "html.parser")
+    for tag in soup(["script", "style"]):
+        tag.decompose()
+    return {
+        "title": soup.title.get_text() if soup.title else name,
+        "url": url,
+        "text_content": soup.get_text(separator=" ", strip=True),
+        "screenshot": None,
+        "viewport": {"width": 1280, "height": 720},
+        "interactive_elements": [],
+    }
+
+
+def make_handler(latency):
+    pages = {f"/{name}.html": render_page(name, *spec) for name, spec in PAGES.items()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body = pages.get(self.path.split("?")[0].split("#")[0])
+            if latency:
+                time.sleep(latency)
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def start_site(port=0, latency=0.0):
+    """Serves the fixture pages in a daemon thread; returns (server, base URL)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+    server, base_url = start_site(args.port, args.latency)
+    for name, (chars, elements) in PAGES.items():
+        print(f"{base_url}/{name}.html  ({chars} chars, {elements} elements)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
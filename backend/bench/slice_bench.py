@@ -0,0 +1,117 @@
+"""Benchmarks screenshot slicing on synthetic tall pages.
+
+Run from backend/:
+
+    python -m bench.slice_bench
+    python -m bench.slice_bench --sizes 1280x8000 2560x30000
+
+Each (method, size) pair runs in a fresh subprocess so peak RSS is measured
+in isolation. Methods:
+
+- legacy:  LANCZOS-resize the whole page, then crop windows (previous behaviour)
+- region:  plan source regions first, resample only those (split_tall_screenshot)
+
+Both decode the whole PNG; the region path saves the full-page resample.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+CANVAS = (1280, 720)
+
+
+def make_page(path, width, height):
+    """Writes a synthetic full-page screenshot: flat bands with noisy blocks."""
+    import numpy as np
+    from PIL import Image
+    rng = np.random.default_rng(0)
+    arr = np.empty((height, width, 3), dtype=np.uint8)
+    band = 600
+    for y in range(0, height, band):
+        arr[y:y + band] = rng.integers(0, 255, size=3, dtype=np.uint8)
+        block = rng.integers(0, 255, size=(min(band, height - y) // 3, width // 2, 3), dtype=np.uint8)
+        arr[y + 40:y + 40 + block.shape[0], 40:40 + block.shape[1]] = block
+    Image.fromarray(arr).save(path, compress_level=1)
+    del arr
+
+
+def legacy_split(img, size=CANVAS, max_slides=5):
+    from PIL import Image
+    canvas_w, canvas_h = size
+    src_w, src_h = img.size
+    scale = canvas_w / src_w
+    new_h = max(1, int(round(src_h * scale)))
+    scaled = img.resize((canvas_w, new_h), Image.Resampling.LANCZOS).convert("RGB")
+    n_slides = min(max_slides, max(2, int(round(new_h / canvas_h))))
+    max_start = new_h - canvas_h
+    return [scaled.crop((0, int(round(max_start * i / (n_slides - 1))), canvas_w,
+                         int(round(max_start * i / (n_slides - 1))) + canvas_h)) for i in range(n_slides)]
+
+
+def run_case(method, path):
+    """Child-process entry point: slice once and print a JSON result."""
+    from PIL import Image
+    from media.video_maker import split_tall_screenshot
+    Image.MAX_IMAGE_PIXELS = None
+    start = time.time()
+    with Image.open(path) as img:
+        if method == "legacy":
+            slides = legacy_split(img)
+        else:
+            slides = split_tall_screenshot(img, size=CANVAS)
+    elapsed = time.time() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": round(elapsed, 3), "peak_rss_mb": round(peak_kb / 1024, 1), "slides": len(slides)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["1280x6000", "1920x15000", "2560x30000"])
+    parser.add_argument("--case", nargs=2, metavar=("METHOD", "PATH"), help=argparse.SUPPRESS)
+    parser.add_argument("--make", nargs=3, metavar=("W", "H", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case[0], args.case[1])
+        return
+    if args.make:
+        make_page(args.make[2], int(args.make[0]), int(args.make[1]))
+        return
+
+    # Pages are generated and sliced in child processes: Linux carries a
+    # parent's peak RSS over into a forked child's ru_maxrss, so the parent
+    # must stay small for the per-case numbers to mean anything.
+    backend_dir = os.path.join(os.path.dirname(__file__), "..")
+
+    workdir = tempfile.mkdtemp(prefix="slice_bench_")
+    results = []
+    try:
+        for size in args.sizes:
+            w, h = (int(v) for v in size.lower().split("x"))
+            path = os.path.join(workdir, f"page_{w}x{h}.png")
+            subprocess.run([sys.executable, "-m", "bench.slice_bench", "--make", str(w), str(h), path],
+                           cwd=backend_dir, check=True)
+            for method in ("legacy", "region"):
+                out = subprocess.run(
+                    [sys.executable, "-m", "bench.slice_bench", "--case", method, path],
+                    cwd=backend_dir, capture_output=True, text=True, check=True,
+                )
+                row = {"size": size, "method": method, **json.loads(out.stdout.strip().splitlines()[-1])}
+                results.append(row)
+                print(f"{size:>12} {method:>8}  {row['seconds']:>7.3f}s  {row['peak_rss_mb']:>8.1f} MB  {row['slides']} slides")
+    finally:
+        for name in os.listdir(workdir):
+            os.remove(os.path.join(workdir, name))
+        os.rmdir(workdir)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Local stand-in for the OpenAI videos API, plus a concurrency benchmark.
+
+Run from backend/:
+
+    python -m bench.sora_stub --serve --port 8765 --latency 6
+    python -m bench.sora_stub --prompts 4 --latency 3
+    python -m bench.sora_stub --check
+
+``--serve`` only runs the stub (point SORA_API_URL at it). Without it the
+stub is started in-process and SoraClipService generates the prompts three
+ways: one at a time (the old serial behaviour), concurrently, and again
+concurrently against a warm cache. ``--check`` instead asserts that a warm
+cache makes no API calls, that two renders asking for the same prompt at
+once submit it once, that polling backs off, that an oversized clip is
+refused without leaving a file behind, and that pruning trims the cache.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+FAKE_CLIP = b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 64 * 1024
+
+
+def make_handler(latency):
+    jobs = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        # Request log for --check: submit count and poll times per video id.
+        submits = 0
+        polls = {}
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, code, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/v1/videos"):
+                return self._json(404, {"error": "not found"})
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            video_id = f"video_{uuid.uuid4().hex[:12]}"
+            with lock:
+                jobs[video_id] = time.time()
+                Handler.submits += 1
+            self._json(200, {"id": video_id, "status": "queued"})
+
+        def do_GET(self):
+            parts = self.path.rstrip("/").split("/")
+            content = parts[-1] == "content"
+            video_id = parts[-2] if content else parts[-1]
+            with lock:
+                started = jobs.get(video_id)
+            if started is None:
+                return self._json(404, {"error": "unknown video"})
+            elapsed = time.time() - started
+            if not content:
+                with lock:
+                    Handler.polls.setdefault(video_id, []).append(time.time())
+            if content:
+                self.send_response(200)
+                self.send_header("Content-Type", "video/mp4")
+                self.send_header("Content-Length", str(len(FAKE_CLIP)))
+                self.end_headers()
+                self.wfile.write(FAKE_CLIP)
+                return
+            if elapsed >= latency:
+                return self._json(200, {"id": video_id, "status": "completed", "progress": 100})
+            self._json(200, {"id": video_id, "status": "in_progress", "progress": int(100 * elapsed / latency)})
+
+    return Handler
+
+
+def start_stub(port=0, latency=3.0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1/videos"
+
+
+def _trace_to(cache_dir):
+    """Keep the client's trace log inside the bench's temp dir."""
+    from media import sora
+    sora.TRACE_LOG = os.path.join(cache_dir, "sora_trace.log")
+
+
+def run(prompt_count, latency, concurrency):
+    from media.sora import SoraClipService
+    server, base_url = start_stub(latency=latency)
+    cache_dir = tempfile.mkdtemp(prefix="sora_bench_")
+    _trace_to(cache_dir)
+    prompts = [f"benchmark shot {i}" for i in range(prompt_count)]
+    results = {}
+    try:
+        def service(cache, conc):
+            return SoraClipService(api_key="stub", base_url=base_url, cache_dir=cache, concurrency=conc,
+                                   poll_initial=0.5, poll_max=2.0, timeout=latency * 10)
+
+        start = time.time()
+        serial = service(os.path.join(cache_dir, "serial"), 1)
+        for p in prompts:
+            serial.generate_many_sync([p])
+        results["serial_seconds"] = round(time.time() - start, 2)
+
+        conc = service(os.path.join(cache_dir, "concurrent"), concurrency)
+        start = time.time()
+        paths = conc.generate_many_sync(prompts)
+        results["concurrent_seconds"] = round(time.time() - start, 2)
+        results["clips"] = sum(1 for p in paths if p)
+
+        start = time.time()
+        conc.generate_many_sync(prompts)
+        results["cached_seconds"] = round(time.time() - start, 3)
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    results.update({"prompts": prompt_count, "latency": latency, "concurrency": concurrency})
+    return results
+
+
+def check(latency=2.0):
+    """Assert cache hits, in-flight sharing, poll backoff, the size cap and pruning against the stub."""
+    from media.sora import SoraClipService, prune_sora_cache
+    server, base_url = start_stub(latency=latency)
+    handler = server.RequestHandlerClass
+    cache_dir = tempfile.mkdtemp(prefix="sora_check_")
+    _trace_to(cache_dir)
+    results = {}
+    try:
+        def service(cache, **kwargs):
+            return SoraClipService(api_key="stub", base_url=base_url, cache_dir=os.path.join(cache_dir, cache),
+                                   concurrency=2, poll_initial=0.2, poll_max=1.0, timeout=latency * 10, **kwargs)
+
+        svc = service("warm")
+        prompts = ["check shot a", "check shot b"]
+        first = svc.generate_many_sync(prompts)
+        assert all(first), f"stub clips failed: {first}"
+        assert all(os.path.getsize(p) == len(FAKE_CLIP) for p in first), "clip size differs from the stub's"
+        submits = handler.submits
+        assert submits == len(prompts), f"expected {len(prompts)} submits, saw {submits}"
+        assert svc.generate_many_sync(prompts) == first, "warm cache returned different paths"
+        assert handler.submits == submits, "warm cache still submitted jobs"
+        results["cache_hit"] = True
+
+        # Two renders (each with its own service and event loop) share the job.
+        shared = [service("shared"), service("shared")]
+        out = [None, None]
+        threads = [threading.Thread(target=lambda i=i: out.__setitem__(i, shared[i].generate_many_sync(["check shared"])))
+                   for i in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert out[0] == out[1] and out[0][0], f"shared prompt results differ: {out}"
+        assert handler.submits == submits + 1, f"shared prompt submitted {handler.submits - submits} times"
+        results["shared_in_flight"] = True
+
+        # Before the stub reports 80% progress every wait is 1.5x the last.
+        gaps = []
+        for times in handler.polls.values():
+            gaps = [b - a for a, b in zip(times, times[1:])][:3]
+            assert len(gaps) >= 2, f"too few polls to measure backoff: {times}"
+            assert all(later > earlier * 1.2 for earlier, later in zip(gaps, gaps[1:])), \
+                f"poll interval did not grow: {gaps}"
+        results["poll_gaps"] = [round(g, 2) for g in gaps]
+
+        capped = service("capped", max_bytes=len(FAKE_CLIP) - 1)
+        assert capped.generate_many_sync(["check oversized"]) == [None], "oversized clip was accepted"
+        leftovers = os.listdir(capped.cache_dir)
+        assert not leftovers, f"oversized clip left files behind: {leftovers}"
+        results["size_cap"] = True
+
+        # Oldest-used clip goes first once the cache is over budget.
+        os.utime(first[0], (time.time() - 60, time.time() - 60))
+        removed = prune_sora_cache(svc.cache_dir, max_bytes=len(FAKE_CLIP))
+        assert removed == 1 and not os.path.exists(first[0]) and os.path.exists(first[1]), \
+            f"prune removed {removed}, left {os.listdir(svc.cache_dir)}"
+        assert prune_sora_cache(svc.cache_dir, max_age_days=0) == 1, "age limit did not remove the last clip"
+        results["prune"] = True
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--serve", action="store_true", help="only run the stub server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=3.0, help="seconds until each stub job completes")
+    parser.add_argument("--prompts", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--check", action="store_true", help="assert cache, backoff and size-cap behaviour")
+    args = parser.parse_args()
+
+    if args.check:
+        print(json.dumps(check(), indent=2))
+        print("Sora client checks passed")
+        return
+
+    if args.serve:
+        server, base_url = start_stub(args.port, args.latency)
+        print(f"Sora stub listening at {base_url} (latency {args.latency}s)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    print(json.dumps(run(args.prompts, args.latency, args.concurrency), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Compares single-call TTS against chunked parallel synthesis.
+
+Run from backend/:
+
+    python -m bench.tts_bench                   # simulated engine, no network
+    python -m bench.tts_bench --engine openai   # real OpenAI TTS (needs OPENAI_API_KEY)
+    python -m bench.tts_bench --engine gtts     # real gTTS
+
+The simulated engine sleeps ``--base-latency + len(text) * --per-char``
+seconds, which is roughly how hosted TTS latency scales with input length.
+"""
+import os
+import sys
+import time
+import json
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from media.tts import OpenAIEngine, GTTSEngine, synthesize_speech, PCM_RATE, PCM_WIDTH
+
+SAMPLE_SCRIPT = (
+    "Welcome to this lesson on getting started with the dashboard. "
+    "First, sign in with your work account and open the projects page. "
+    "Each project card shows its status, owner and the date it was last updated. "
+    "Use the search bar at the top to filter projects by name or tag. "
+    "To create a new project, click the New Project button in the top right corner. "
+    "Give it a clear name, choose a template, and invite your teammates. "
+    "Templates include sensible defaults for permissions and notifications. "
+    "Once the project is created, the overview tab summarizes recent activity. "
+    "The settings tab lets you rename the project, archive it, or transfer ownership. "
+    "That covers the basics. In the next lesson we will look at reports."
+)
+
+
+class SimulatedEngine:
+    name = "simulated"
+    ext = "pcm"
+    voice = "sim"
+
+    def __init__(self, base_latency=0.4, per_char=0.004):
+        self.base_latency = base_latency
+        self.per_char = per_char
+
+    def synthesize(self, text):
+        time.sleep(self.base_latency + len(text) * self.per_char)
+        # ~15 chars/second of speech, silent samples.
+        seconds = max(0.2, len(text) / 15)
+        return b"\x00" * int(seconds * PCM_RATE) * PCM_WIDTH
+
+
+def make_engine(args):
+    if args.engine == "openai":
+        from openai import OpenAI
+        return OpenAIEngine(OpenAI(api_key=os.environ["OPENAI_API_KEY"]), voice="nova")
+    if args.engine == "gtts":
+        return GTTSEngine()
+    return SimulatedEngine(args.base_latency, args.per_char)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", choices=["simulated", "openai", "gtts"], default="simulated")
+    parser.add_argument("--base-latency", type=float, default=0.4)
+    parser.add_argument("--per-char", type=float, default=0.004)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--script", help="Path to a text file to narrate instead of the sample")
+    args = parser.parse_args()
+
+    text = open(args.script, encoding="utf-8").read() if args.script else SAMPLE_SCRIPT
+    engine = make_engine(args)
+    workdir = tempfile.mkdtemp(prefix="tts_bench_")
+    cache_dir = os.path.join(workdir, "cache")
+    try:
+        start = time.time()
+        engine.synthesize(text)
+        single = time.time() - start
+
+        _, cold = synthesize_speech(engine, text, os.path.join(workdir, "cold"),
+                                    cache_dir=cache_dir, max_workers=args.workers)
+        _, warm = synthesize_speech(engine, text, os.path.join(workdir, "warm"),
+                                    cache_dir=cache_dir, max_workers=args.workers)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "engine": engine.name,
+        "script_chars": len(text),
+        "single_call_seconds": round(single, 3),
+        "chunked_cold": cold,
+        "chunked_warm": warm,
+        "speedup_cold": round(single / cold["wall_seconds"], 2) if cold["wall_seconds"] else None,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
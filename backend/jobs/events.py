@@ -0,0 +1,113 @@
+import json
+import time
+import asyncio
+import threading
+from collections import OrderedDict, deque
+
+HISTORY_PER_JOB = 500
+MAX_CHANNELS = 1000
+KEEPALIVE_SECONDS = 15
+
+TERMINAL_EVENTS = ("complete", "failed")
+
+
+class _Channel:
+    def __init__(self):
+        self.events = deque(maxlen=HISTORY_PER_JOB)
+        self.next_id = 1
+        self.closed = False
+        self.waiters = set()  # (loop, asyncio.Event)
+
+
+class JobEventBus:
+    """Fan-out of job events to any number of subscribers.
+
+    Publishers are worker threads (the video renderer); subscribers are
+    asyncio SSE handlers. Each job keeps a bounded history with sequential
+    ids so a reconnecting client can resume from its Last-Event-ID without
+    missing anything still in the buffer.
+    """
+
+    def __init__(self):
+        self._channels = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _channel(self, job_id):
+        ch = self._channels.get(job_id)
+        if ch is None:
+            ch = self._channels[job_id] = _Channel()
+            # Forget the oldest finished jobs once we hold too many.
+            while len(self._channels) > MAX_CHANNELS:
+                oldest_id, oldest = next(iter(self._channels.items()))
+                if not oldest.closed or oldest_id == job_id:
+                    break
+                self._channels.pop(oldest_id)
+        return ch
+
+    def publish(self, job_id, event, data):
+        """Thread-safe. Appends an event and wakes every subscriber of the job."""
+        with self._lock:
+            ch = self._channel(job_id)
+            if ch.closed:
+                return None
+            ev = {"id": ch.next_id, "event": event, "data": data, "ts": time.time()}
+            ch.next_id += 1
+            ch.events.append(ev)
+            if event in TERMINAL_EVENTS:
+                ch.closed = True
+            waiters = list(ch.waiters)
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:
+                # Subscriber's loop is gone; it will be dropped on its own.
+                pass
+        return ev
+
+    def _since(self, job_id, last_id):
+        with self._lock:
+            ch = self._channels.get(job_id)
+            if ch is None:
+                return [], True
+            return [e for e in ch.events if e["id"] > last_id], ch.closed
+
+    async def subscribe(self, job_id, last_event_id=0):
+        """Async generator of events after ``last_event_id``; ends after a terminal event.
+
+        Yields None every KEEPALIVE_SECONDS of silence so the caller can send
+        a keep-alive comment through proxies.
+        """
+        loop = asyncio.get_running_loop()
+        cursor = last_event_id
+        while True:
+            waiter = asyncio.Event()
+            entry = (loop, waiter)
+            with self._lock:
+                ch = self._channels.get(job_id)
+                if ch is not None:
+                    ch.waiters.add(entry)
+            try:
+                # Re-check after registering so nothing published in between is missed.
+                events, closed = self._since(job_id, cursor)
+                for ev in events:
+                    cursor = ev["id"]
+                    yield ev
+                if closed:
+                    return
+                if not events:
+                    try:
+                        await asyncio.wait_for(waiter.wait(), timeout=KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        yield None
+            finally:
+                with self._lock:
+                    ch = self._channels.get(job_id)
+                    if ch is not None:
+                        ch.waiters.discard(entry)
+
+
+def format_sse(ev):
+    """Serializes one event in text/event-stream framing (None -> keep-alive)."""
+    if ev is None:
+        return ": keep-alive\n\n"
+    return f"id: {ev['id']}\nevent: {ev['event']}\ndata: {json.dumps(ev['data'])}\n\n"
@@ -0,0 +1,64 @@
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from monitoring.tracing import propagate
+
+OFFLOAD_WORKERS = int(os.environ.get("OFFLOAD_WORKERS", "8"))
+# Multi-second synchronous LLM SDK calls get their own threads so they can't
+# fill the pool that millisecond file reads and DNS lookups wait on.
+LLM_WORKERS = int(os.environ.get("LLM_WORKERS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=OFFLOAD_WORKERS, thread_name_prefix="offload")
+_llm_executor = ThreadPoolExecutor(max_workers=LLM_WORKERS, thread_name_prefix="offload-llm")
+_lock = threading.Lock()
+_stats = {"queued": 0, "running": 0, "completed": 0, "failed": 0}
+_llm_stats = {"queued": 0, "running": 0, "completed": 0, "failed": 0}
+
+
+def _tracked(stats, fn):
+    with _lock:
+        stats["queued"] -= 1
+        stats["running"] += 1
+    try:
+        result = fn()
+    except BaseException:
+        with _lock:
+            stats["running"] -= 1
+            stats["failed"] += 1
+        raise
+    with _lock:
+        stats["running"] -= 1
+        stats["completed"] += 1
+    return result
+
+
+async def _run(executor, stats, fn, args, kwargs):
+    with _lock:
+        stats["queued"] += 1
+    # Carries the request's trace context into the pool thread.
+    call = propagate(functools.partial(fn, *args, **kwargs))
+    return await asyncio.get_running_loop().run_in_executor(executor, _tracked, stats, call)
+
+
+async def offload(fn, *args, **kwargs):
+    """Runs blocking ``fn(*args, **kwargs)`` on the bounded offload pool and awaits it.
+
+    For file I/O, DNS lookups and CPU-bound work in async handlers, so the
+    event loop keeps serving other requests. At most OFFLOAD_WORKERS calls run
+    at once; the rest wait in the pool's queue. Slow LLM calls go through
+    ``offload_llm`` instead.
+    """
+    return await _run(_executor, _stats, fn, args, kwargs)
+
+
+async def offload_llm(fn, *args, **kwargs):
+    """Like ``offload``, on a separate pool of LLM_WORKERS threads for synchronous LLM SDK calls."""
+    return await _run(_llm_executor, _llm_stats, fn, args, kwargs)
+
+
+def offload_stats():
+    with _lock:
+        return {"workers": OFFLOAD_WORKERS, **_stats, "llm": {"workers": LLM_WORKERS, **_llm_stats}}
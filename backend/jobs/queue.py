@@ -0,0 +1,82 @@
+import os
+import time
+import functools
+import threading
+import traceback
+from collections import deque
+
+from monitoring.tracing import span, propagate
+
+VIDEO_WORKERS = int(os.environ.get("VIDEO_WORKERS", "2"))
+
+
+class RenderQueue:
+    """FIFO of background jobs drained by a fixed pool of worker threads.
+
+    ``on_positions(job_ids)`` is called with the waiting jobs in order every
+    time the queue changes, so callers can tell users where they stand.
+    """
+
+    def __init__(self, workers=VIDEO_WORKERS, on_positions=None, name="render"):
+        self.name = name
+        self.on_positions = on_positions
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self.running = 0
+        self.workers = max(1, workers)
+        # Running average of job duration, for Retry-After estimates when the queue is full.
+        self.avg_seconds = 60.0
+        for i in range(max(1, workers)):
+            threading.Thread(target=self._worker, name=f"{name}-{i}", daemon=True).start()
+
+    def submit(self, job_id, fn, *args):
+        """Queues ``fn(job_id, *args)``; it runs as a span in the submitter's trace."""
+        fn = propagate(functools.partial(self._run_traced, fn, time.time()))
+        with self._cond:
+            self._pending.append((job_id, fn, args))
+            waiting = [j for j, _, _ in self._pending]
+            self._cond.notify()
+        self._report(waiting)
+
+    def position(self, job_id):
+        """1-based position among waiting jobs, or None if not waiting."""
+        with self._cond:
+            for i, (j, _, _) in enumerate(self._pending):
+                if j == job_id:
+                    return i + 1
+        return None
+
+    def _run_traced(self, fn, submitted, job_id, *args):
+        with span(f"{self.name}.job", job_id=job_id, queue_wait_ms=round((time.time() - submitted) * 1000, 1)):
+            fn(job_id, *args)
+
+    @property
+    def depth(self):
+        with self._cond:
+            return len(self._pending)
+
+    def _report(self, waiting):
+        if self.on_positions:
+            try:
+                self.on_positions(waiting)
+            except Exception as e:
+                print(f"[QUEUE] on_positions failed: {e}")
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                job_id, fn, args = self._pending.popleft()
+                waiting = [j for j, _, _ in self._pending]
+                self.running += 1
+            self._report(waiting)
+            start = time.time()
+            try:
+                fn(job_id, *args)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                with self._cond:
+                    self.running -= 1
+                    self.avg_seconds = 0.8 * self.avg_seconds + 0.2 * (time.time() - start)
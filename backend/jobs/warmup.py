@@ -0,0 +1,58 @@
+import os
+import time
+import threading
+import importlib
+
+STARTUP_WARMUP = os.environ.get("STARTUP_WARMUP", "1") != "0"
+# Lets the server finish binding and answer its first health check before
+# the warm-up starts competing for the GIL.
+WARMUP_DELAY_SECONDS = float(os.environ.get("WARMUP_DELAY_SECONDS", "0.5"))
+
+
+class Warmup:
+    """Runs slow first-use work (heavy imports, SDK clients) in a background thread.
+
+    Subsystems that are imported lazily would otherwise make the first
+    request that needs them pay the import; warming them up after startup
+    keeps both cold start and that first request fast. Steps run in order
+    and a failing step is logged and skipped. A request that needs a module
+    the warm-up is still importing simply waits on Python's import lock.
+    """
+
+    def __init__(self):
+        self.steps = []
+        self.results = {}
+        self.state = "idle"
+        self._lock = threading.Lock()
+
+    def add(self, name, fn):
+        self.steps.append((name, fn))
+
+    def add_import(self, module):
+        self.add(module, lambda: importlib.import_module(module))
+
+    def start(self, delay=WARMUP_DELAY_SECONDS):
+        self.state = "pending"
+        threading.Thread(target=self._run, args=(delay,), name="warmup", daemon=True).start()
+
+    def _run(self, delay):
+        time.sleep(delay)
+        self.state = "running"
+        start = time.perf_counter()
+        for name, fn in self.steps:
+            step_start = time.perf_counter()
+            try:
+                fn()
+                result = {"status": "ok"}
+            except Exception as e:
+                print(f"[WARMUP] {name} failed: {e}")
+                result = {"status": "failed", "detail": str(e)}
+            result["ms"] = round((time.perf_counter() - step_start) * 1000, 1)
+            with self._lock:
+                self.results[name] = result
+        self.state = "done"
+        print(f"[WARMUP] {len(self.steps)} steps in {time.perf_counter() - start:.2f}s")
+
+    def snapshot(self):
+        with self._lock:
+            return {"state": self.state, "steps": dict(self.results)}
@@ -1,6 +1,10 @@
 import sys
+import time
 import asyncio
 
+# Startup cost is tracked in /api/metrics; measured from here to app startup.
+_IMPORT_STARTED = time.perf_counter()
+
 # Load environment variables from .env file
 from dotenv import load_dotenv
 load_dotenv()
@@ -9,10 +13,11 @@ load_dotenv()
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from pydantic import BaseModel, Field
+from typing import Optional
 import uvicorn
 import os
 import traceback
@@ -22,32 +27,75 @@ import socket
 from urllib.parse import urlparse
 
 # Import our scraper modules
-from scraper.browser import BrowserManager
+from scraper.browser import BrowserManager, DEVICE_PROFILES, PRIMARY_DEVICE
 from scraper.auth import AuthManager
-from scraper.extractor import ContentExtractor
+from scraper.extractor import ContentExtractor, DYNAMIC_CONTENT_WAIT, scrape_record
+from scraper.elements import index_for_scrape
+from storage.catalog import get_catalog, course_key_for_url
+from storage.workspace import WorkspaceStore
+from jobs.offload import offload, offload_stats
+from jobs.warmup import Warmup, STARTUP_WARMUP
+from monitoring.loop_lag import LoopLagMonitor
+from monitoring.metrics import (
+    registry, timed, RouteMetricsMiddleware, BROWSER_SECONDS, BROWSER_ERRORS, ADMISSION_REJECTED,
+)
+from web.responses import FastJSONResponse, dumps, parse_fields, select_fields
+from web.compression import CompressionMiddleware, strip_etag_suffix
+from web.admission import AdmissionMiddleware, Overloaded, build_limiters, retry_after_seconds
+from monitoring.tracing import (
+    TracingMiddleware, tracer, begin_trace, continue_trace, mark_error, summarize, span,
+)
 
-app = FastAPI(title="Training Hub Builder API")
+app = FastAPI(title="Training Hub Builder API", default_response_class=FastJSONResponse)
 
 # Configure CORS for frontend communication
 # In production, update ALLOWED_ORIGINS via environment variable
 ALLOWED_ORIGINS = os.environ.get("ALLOWED_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").split(",")
 
+# Concurrency limits with bounded wait queues for the expensive routes (ADMISSION_LIMITS).
+# Innermost, so 429/503 rejections still carry CORS headers and show up in route metrics.
+admission_limiters = build_limiters()
+app.add_middleware(AdmissionMiddleware, limiters=admission_limiters)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization"],
+    expose_headers=["Retry-After"],
 )
+# brotli/gzip for JSON and text bodies over 1 KB; streams and media pass through.
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+# Outside compression, so route latency includes it.
+app.add_middleware(RouteMetricsMiddleware)
+# Outermost: one span per request, covering every other middleware; handlers join
+# it to the course's trace (see trace_key).
+app.add_middleware(TracingMiddleware, skip=(
+    "/health", "/metrics", "/api/metrics", "/media/", "/api/traces/", "/api/course/trace",
+    "/api/ai/video/status/", "/api/ai/video/events/", "/api/course/build/",
+))
 
 import mimetypes
 mimetypes.add_type("video/mp4", ".mp4")
 mimetypes.add_type("audio/mpeg", ".mp3")
+mimetypes.add_type("application/vnd.apple.mpegurl", ".m3u8")
+mimetypes.add_type("video/iso.segment", ".m4s")
 
 from fastapi.staticfiles import StaticFiles
 if not os.path.exists("media"):
     os.makedirs("media")
-app.mount("/media", StaticFiles(directory="media"), name="media")
+
+class MediaFiles(StaticFiles):
+    """/media static files; serving a video counts as a use for the cache's LRU eviction."""
+
+    async def get_response(self, path, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 206):
+            video_cache.touch(path)
+        return response
+
+app.mount("/media", MediaFiles(directory="media"), name="media")
 # Security: scraped_data is NOT served as a public static directory.
 # It contains scraped page content and course data — access it only via API endpoints.
 # (Removed: app.mount("/scraped_data", ...))
@@ -55,7 +103,17 @@ app.mount("/media", StaticFiles(directory="media"), name="media")
 # Global State
 browser_manager = BrowserManager()
 auth_manager = AuthManager()
-extractor = ContentExtractor()
+catalog = get_catalog()
+extractor = ContentExtractor(catalog=catalog)
+workspaces = WorkspaceStore()
+
+def get_workspace(course_id: Optional[str]):
+    """Course workspace for an optional course ID; None is the legacy single course."""
+    try:
+        return workspaces.get(course_id)
+    except ValueError:
+        # Security: course IDs are used as directory names; reject anything but a slug
+        raise HTTPException(status_code=400, detail="Invalid course ID")
 
 # Request Models
 class LaunchRequest(BaseModel):
@@ -89,6 +147,12 @@ def _is_private_ip(hostname: str) -> bool:
         return True
     return False
 
+# Test-only: "host:port" pairs that skip the private-address check, so the
+# offline benchmark (bench/e2e_bench.py) can navigate to its local fixture site.
+# Security: never set this in production; only exact host:port matches are exempt.
+BENCH_ALLOWED_HOSTS = {h.strip().lower() for h in os.environ.get("BENCH_ALLOWED_HOSTS", "").split(",") if h.strip()}
+if BENCH_ALLOWED_HOSTS:
+    print(f"WARNING: BENCH_ALLOWED_HOSTS is set; SSRF protection is disabled for {sorted(BENCH_ALLOWED_HOSTS)}")
 
 def validate_url(url: str) -> tuple[bool, str]:
     """
@@ -116,6 +180,9 @@ def validate_url(url: str) -> tuple[bool, str]:
     if not hostname:
         return False, "Invalid URL: missing host"
 
+    if BENCH_ALLOWED_HOSTS and parsed.port and f"{hostname.lower()}:{parsed.port}" in BENCH_ALLOWED_HOSTS:
+        return True, url
+
     # Security: resolve hostname to actual IPs and reject private/reserved ranges.
     # This also defeats DNS rebinding — we check at request time.
     if _is_private_ip(hostname):
@@ -135,6 +202,98 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+loop_monitor = LoopLagMonitor()
+warmup = Warmup()
+startup_stats = {}
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    loop_monitor.register_routes(app.routes)
+    loop_monitor.start()
+
+@app.on_event("startup")
+async def start_warmup():
+    startup_stats["import_to_startup_ms"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+    print(f"[STARTUP] Ready {startup_stats['import_to_startup_ms']:.0f}ms after main.py began importing")
+    if STARTUP_WARMUP:
+        # Heavy subsystems load after the server is listening, not before the first health check.
+        warmup.add_import("media.video_maker")
+        warmup.add("groq client", lambda: planner.client)
+        warmup.add_import("bs4")
+        warmup.start()
+
+@app.get("/api/metrics")
+def runtime_metrics():
+    """Event-loop lag percentiles, recent attributed stalls, offload pool usage and startup timings."""
+    return {"loop": loop_monitor.snapshot(), "offload": offload_stats(),
+            "startup": {**startup_stats, "warmup": warmup.snapshot()},
+            "admission": {name: lim.snapshot() for name, lim in admission_limiters.items()}}
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """All metrics in the Prometheus text format, for a local scraper or curl."""
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _loop_lag_quantiles():
+    lag = loop_monitor.snapshot()["lag_ms"]
+    return {(q,): lag[k] / 1000 for q, k in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99"))}
+
+def _offload_gauge(stats):
+    pools = {"default": stats, "llm": stats["llm"]}
+    return {(pool, k): s[k] for pool, s in pools.items() for k in ("queued", "running")}
+
+registry.gauge("event_loop_lag_seconds", "Event-loop scheduling delay over the recent sample window.",
+               ("quantile",), fn=_loop_lag_quantiles)
+registry.gauge("event_loop_stalls", "Event-loop stalls over the threshold since start.",
+               fn=lambda: loop_monitor.stall_count)
+registry.gauge("offload_tasks", "Offload pool tasks by state.", ("pool", "state"),
+               fn=lambda: _offload_gauge(offload_stats()))
+registry.gauge("admission_in_flight", "Requests holding an admission slot.", ("limiter",),
+               fn=lambda: {(n,): lim.in_flight for n, lim in admission_limiters.items()})
+registry.gauge("admission_queue_depth", "Requests waiting for an admission slot.", ("limiter",),
+               fn=lambda: {(n,): lim.waiting for n, lim in admission_limiters.items()})
+
+def _append_error_log(text: str):
+    with open("error.log", "a") as f:
+        f.write(text)
+
+async def log_error(label: str, e: Exception):
+    """Appends the current traceback to error.log without blocking the event loop."""
+    await offload(_append_error_log, traceback.format_exc())
+    print(f"ERROR IN {label}:", str(e))
+
+# Navigate starts a course build's trace; scrape hands it to the course, and
+# plan/lesson/quiz/video requests for that course join it.
+BROWSER_TRACE_KEY = "browser"
+
+def trace_key(course_id: Optional[str]) -> str:
+    return f"course:{course_id or 'default'}"
+
+def get_fields(fields: Optional[str]):
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def artifact_response(request: Request, artifact, prefix: bytes = b"", suffix: bytes = b"", keys=None):
+    """Serves a cached JSON artifact with a strong ETag, answering If-None-Match with 304.
+
+    The full body is the artifact's pre-serialized JSON, optionally wrapped,
+    so a hit costs neither a file read nor a json.dumps. ``keys`` selects a
+    subset of top-level fields, which gets its own ETag.
+    """
+    etag = artifact.etag
+    if keys is not None:
+        etag = etag[:-1] + "-" + "+".join(keys) + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match:
+        tags = [strip_etag_suffix(t.strip()) for t in if_none_match.split(",")]
+        if "*" in tags or etag in tags:
+            return Response(status_code=304, headers=headers)
+    body = artifact.body if keys is None else dumps(select_fields(artifact.data, keys))
+    return Response(content=prefix + body + suffix, media_type="application/json", headers=headers)
+
 # --- Browser Control Endpoints ---
 
 async def ensure_browser(headless: bool = True, use_auth: bool = True):
@@ -166,72 +325,127 @@ async def launch_browser(pkt: LaunchRequest):
         await browser_manager.launch(headless=pkt.headless, auth_state_path=auth_path)
         return {"status": "launched", "auth_loaded": bool(auth_path and auth_manager.exists())}
     except Exception as e:
-        with open("error.log", "a") as f:
-            traceback.print_exc(file=f)
-        print("ERROR IN LAUNCH:", str(e))
+        await log_error("LAUNCH", e)
         traceback.print_exc()
         # Security: don't leak internal error details to client
         raise HTTPException(status_code=500, detail="Failed to launch browser")
 
 @app.post("/api/browser/navigate")
 async def navigate(pkt: NavigateRequest):
+    begin_trace(BROWSER_TRACE_KEY)
     try:
         await ensure_browser()
         # Validate URL to prevent SSRF attacks
-        is_valid, result = validate_url(pkt.url)
+        # DNS resolution in validate_url blocks; keep it off the loop
+        is_valid, result = await offload(validate_url, pkt.url)
         if not is_valid:
             raise HTTPException(status_code=400, detail=result)
 
         url = result  # result contains the cleaned URL if valid
         print(f"Navigating to {url}")
-        await browser_manager.page.goto(url, wait_until="networkidle", timeout=30000)
+        with timed(BROWSER_SECONDS, BROWSER_ERRORS, span_name="browser.navigate", operation="navigate"):
+            await browser_manager.page.goto(url, wait_until="networkidle", timeout=30000)
         return {"status": "navigated", "url": url}
     except HTTPException:
         raise  # Re-raise HTTP exceptions as-is
     except Exception as e:
-        with open("error.log", "a") as f:
-            traceback.print_exc(file=f)
-        print("ERROR IN NAVIGATE:", str(e))
+        await log_error("NAVIGATE", e)
         # Security: don't leak internal error details to client
         raise HTTPException(status_code=500, detail="Navigation failed")
 
+def get_devices(devices: Optional[str]):
+    """Extra device profiles from "tablet,mobile"; the desktop page is always captured."""
+    names = []
+    for name in (devices or "").split(","):
+        name = name.strip()
+        if not name or name == PRIMARY_DEVICE or name in names:
+            continue
+        if name not in DEVICE_PROFILES:
+            raise HTTPException(status_code=400, detail=f"Unknown device: {name}")
+        names.append(name)
+    return names
+
 @app.post("/api/browser/scrape")
-async def scrape_page():
+async def scrape_page(course_id: Optional[str] = None, fields: Optional[str] = None, devices: Optional[str] = None):
+    ws = get_workspace(course_id)
+    keys = get_fields(fields)
+    device_names = get_devices(devices)
+    continue_trace(BROWSER_TRACE_KEY, bind=trace_key(course_id))
     try:
         await ensure_browser()
-        print("Scraping page...")
-        data = await extractor.extract_page(browser_manager.page)
-        
-        # Save data to file for AI processing
-        output_path = os.path.join("scraped_data", "latest_scrape.json")
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-            
-        print(f"Scraped data saved to {output_path}")
+        print(f"Scraping page{' (+ ' + ', '.join(device_names) + ')' if device_names else ''}...")
+        data = await extractor.extract_page(browser_manager.page, course=course_id, devices=device_names,
+                                            browser=browser_manager)
+
+        # Save data to the course workspace for AI processing
+        await offload(ws.write_scrape, data)
+        print(f"Scraped data saved to {ws.scrape_path}")
+        # Retention/quota sweep of old screenshots now that a new one landed.
+        await offload(catalog.gc)
         # Security: don't leak internal filesystem path in response
-        return {"status": "scraped", "data": data}
+        return {"status": "scraped", "data": select_fields(data, keys)}
     except Exception as e:
-        with open("error.log", "a") as f:
-            traceback.print_exc(file=f)
-        print("ERROR IN SCRAPE:", str(e))
+        await log_error("SCRAPE", e)
         # Security: don't leak internal error details to client
         raise HTTPException(status_code=500, detail="Scrape failed")
 
 @app.get("/api/browser/snapshot")
-async def get_snapshot():
-    output_path = os.path.join("scraped_data", "latest_scrape.json")
-    if not os.path.exists(output_path):
-        raise HTTPException(status_code=404, detail="No snapshot found")
+async def get_snapshot(request: Request, course_id: Optional[str] = None, fields: Optional[str] = None):
+    ws = get_workspace(course_id)
+    keys = get_fields(fields)
     try:
-        with open(output_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return {"status": "loaded", "data": data}
+        artifact = await offload(ws.scrape_artifact)
+        if artifact is None:
+            raise HTTPException(status_code=404, detail="No snapshot found")
+        return artifact_response(request, artifact, b'{"status":"loaded","data":', b"}", keys=keys)
+    except HTTPException:
+        raise
     except Exception as e:
         print("ERROR IN SNAPSHOT:", str(e))
         traceback.print_exc()
         # Security: don't leak internal error details to client
         raise HTTPException(status_code=500, detail="Failed to load snapshot")
 
+# Security: bound query geometry so a request can't make the grid walk billions of cells
+MAX_QUERY_PX = 100_000
+# A slice is at most a few viewports in each direction, so one query can't
+# walk most of a long page's grid and serialize thousands of elements.
+MAX_QUERY_SPAN = 4096
+
+def scrape_element_index(course_id: Optional[str], device: Optional[str] = None):
+    if device is not None and device not in DEVICE_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown device: {device}")
+    return index_for_scrape(get_workspace(course_id).scrape_path, None if device == PRIMARY_DEVICE else device)
+
+@app.get("/api/browser/elements")
+async def get_elements(x: float = Query(0, ge=0, le=MAX_QUERY_PX), y: float = Query(0, ge=0, le=MAX_QUERY_PX),
+                       width: float = Query(1280, gt=0, le=MAX_QUERY_SPAN),
+                       height: float = Query(720, gt=0, le=MAX_QUERY_SPAN),
+                       course_id: Optional[str] = None, device: Optional[str] = None):
+    """Interactive elements intersecting a viewport slice of the scraped page (page coordinates).
+
+    ``device`` selects a viewport captured with ``scrape?devices=`` (default desktop).
+    """
+    index = await offload(scrape_element_index, course_id, device)
+    if index is None:
+        raise HTTPException(status_code=404, detail="No snapshot found")
+
+    def query():
+        ids = index.query(x, y, width, height)
+        return {"count": len(ids), "total": len(index), "elements": index.elements(ids)}
+
+    return await offload(query)
+
+@app.get("/api/browser/element-at")
+async def get_element_at(x: float = Query(..., ge=0, le=MAX_QUERY_PX), y: float = Query(..., ge=0, le=MAX_QUERY_PX),
+                         course_id: Optional[str] = None, device: Optional[str] = None):
+    """The innermost interactive element under a point of the scraped page, or null."""
+    index = await offload(scrape_element_index, course_id, device)
+    if index is None:
+        raise HTTPException(status_code=404, detail="No snapshot found")
+    i = index.at(x, y)
+    return {"element": index.element(i) if i is not None else None}
+
 @app.post("/api/browser/save-auth")
 async def save_auth():
     if not browser_manager.context:
@@ -241,9 +455,7 @@ async def save_auth():
         # Security: don't expose server-side filesystem paths to the client
         return {"status": "saved"}
     except Exception as e:
-        with open("error.log", "a") as f:
-            traceback.print_exc(file=f)
-        print("ERROR IN SAVE-AUTH:", str(e))
+        await log_error("SAVE-AUTH", e)
         # Security: don't leak internal error details to client
         raise HTTPException(status_code=500, detail="Failed to save session")
 
@@ -271,10 +483,23 @@ async def get_screenshot(filename: str):
 from ai.planner import CoursePlanner
 planner = CoursePlanner()
 
+# Placeholder outline for dev/demo runs without GROQ_API_KEY
+MOCK_PLAN = {
+    "course_title": "Mock Generated Course",
+    "description": "This is a placeholder because no API key was found.",
+    "modules": [
+        {
+            "title": "Module 1: Getting Started",
+            "lessons": [{"title": "Welcome", "description": "Intro"}]
+        }
+    ]
+}
+
 @app.post("/api/ai/plan")
-async def generate_plan():
-    scrape_path = os.path.join("scraped_data", "latest_scrape.json")
-    if not os.path.exists(scrape_path):
+async def generate_plan(course_id: Optional[str] = None):
+    ws = get_workspace(course_id)
+    continue_trace(trace_key(course_id))
+    if not os.path.exists(ws.scrape_path):
         raise HTTPException(status_code=400, detail="No scraped data found. Run scraper first.")
     
     try:
@@ -282,26 +507,12 @@ async def generate_plan():
              # For dev/demo without key, return mock data or raise clear error
              print("WARNING: No GROQ_API_KEY found. Using mock response.")
              # raise HTTPException(status_code=500, detail="Missing GROQ_API_KEY")
-             return {
-                 "status": "planned",
-                 "plan": {
-                     "course_title": "Mock Generated Course",
-                     "description": "This is a placeholder because no API key was found.",
-                     "modules": [
-                         {
-                             "title": "Module 1: Getting Started",
-                             "lessons": [{"title": "Welcome", "description": "Intro"}]
-                         }
-                     ]
-                 }
-             }
-
-        plan = await planner.generate_outline(scrape_path)
-        
+             return {"status": "planned", "plan": MOCK_PLAN}
+
+        plan = await planner.generate_outline(ws.scrape_path)
+
         # Save plan
-        plan_path = os.path.join("scraped_data", "course_plan.json")
-        with open(plan_path, "w", encoding="utf-8") as f:
-            json.dump(plan, f, indent=2)
+        await offload(ws.write_plan, plan)
 
         return {"status": "planned", "plan": plan}
     except Exception as e:
@@ -310,33 +521,39 @@ async def generate_plan():
         raise HTTPException(status_code=500, detail="Failed to generate course plan")
 
 @app.get("/api/course/current")
-def get_current_course():
-    plan_path = os.path.join("scraped_data", "course_plan.json")
-    if not os.path.exists(plan_path):
+def get_current_course(request: Request, course_id: Optional[str] = None):
+    artifact = get_workspace(course_id).plan_artifact()
+    if artifact is None:
         raise HTTPException(status_code=404, detail="No course plan found")
-    
-    with open(plan_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return artifact_response(request, artifact)
+
+@app.get("/api/courses")
+def list_courses():
+    """Course IDs that have a workspace (the legacy default course isn't listed)."""
+    return {"courses": workspaces.list_courses()}
 
 class LessonRequest(BaseModel):
     # Security: enforce max lengths to prevent oversized payloads
     lesson_title: str = Field(..., max_length=500)
     module_title: str = Field(..., max_length=500)
+    course_id: Optional[str] = Field(None, max_length=64)
 
 @app.post("/api/ai/lesson")
 async def generate_lesson_content(req: LessonRequest):
     # Load context from scrape
-    scrape_path = os.path.join("scraped_data", "latest_scrape.json")
-    if not os.path.exists(scrape_path):
+    ws = get_workspace(req.course_id)
+    continue_trace(trace_key(req.course_id))
+    # Only the text is needed: with a scrape pack the elements aren't even read
+    data = await offload(ws.read_scrape_fields, "text_content")
+    if data is None:
         raise HTTPException(status_code=400, detail="No source data found")
-        
-    with open(scrape_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    
+
     text_content = data.get("text_content", "")
-    
+
     try:
         content = await planner.generate_lesson(req.lesson_title, text_content)
+        # Kept so a course batch render narrates the same text the lesson page shows.
+        await offload(ws.write_lesson, req.lesson_title, content)
         return {"status": "generated", "content": content}
     except Exception as e:
         traceback.print_exc()
@@ -346,57 +563,178 @@ async def generate_lesson_content(req: LessonRequest):
 class QuizRequest(BaseModel):
     # Security: cap content length — backend already slices to 4000 chars but validate at ingress
     lesson_content: str = Field(..., max_length=50000)
+    course_id: Optional[str] = Field(None, max_length=64)
+    # Saves the quiz with the course (for static export) when given
+    lesson_title: Optional[str] = Field(None, max_length=500)
 
 @app.post("/api/ai/quiz")
 async def generate_quiz(req: QuizRequest):
+    ws = get_workspace(req.course_id)
+    continue_trace(trace_key(req.course_id))
     try:
         questions = await planner.generate_quiz(req.lesson_content)
+        if req.lesson_title:
+            await offload(ws.write_quiz, req.lesson_title, questions)
         return {"status": "generated", "questions": questions}
     except Exception as e:
         traceback.print_exc()
         # Security: don't leak internal error details to client
         raise HTTPException(status_code=500, detail="Failed to generate quiz")
 
-from media.video_maker import generate_simple_video
+from media.pipeline import critical_path, AsyncStageGraph
+from media.video_cache import VideoCache
+from media.batch import render_course, course_lessons
+from jobs.events import JobEventBus, format_sse
+from jobs.queue import RenderQueue
+from fastapi.responses import StreamingResponse
 import re as _re
 import uuid as _uuid
-import threading
+import shutil
 
 # In-memory video job tracker
 video_jobs: dict[str, dict] = {}
+video_cache = VideoCache(media_dir="media")
+video_events = JobEventBus()
+
+def _on_queue_positions(waiting: list[str]):
+    for position, waiting_id in enumerate(waiting, start=1):
+        job = video_jobs.get(waiting_id)
+        if job and job.get("queue_position") != position:
+            job["queue_position"] = position
+            video_events.publish(waiting_id, "queued", {"position": position})
+
+video_queue = RenderQueue(on_positions=_on_queue_positions, name="video")
+registry.gauge("video_queue_depth", "Video jobs waiting for a render worker.", fn=lambda: video_queue.depth)
+registry.gauge("video_jobs_running", "Video jobs currently rendering.", fn=lambda: video_queue.running)
+registry.gauge("media_dir_bytes", "Total size of the media directory.", fn=lambda: video_cache.total_bytes())
+MAX_BATCH_LESSONS = 100
+# Render jobs allowed to wait for a worker; beyond this new renders get 429.
+VIDEO_QUEUE_MAX = int(os.environ.get("VIDEO_QUEUE_MAX", "20"))
+
+def render_queue_full_error():
+    """429 for a new render when VIDEO_QUEUE_MAX jobs are already waiting, or None."""
+    depth = video_queue.depth
+    if depth < VIDEO_QUEUE_MAX:
+        return None
+    ADMISSION_REJECTED.inc(limiter="render_queue", reason="queue_full")
+    retry = retry_after_seconds(video_queue.avg_seconds, depth, video_queue.workers, cap=600)
+    print(f"[ADMISSION] render_queue: rejected, {depth} jobs waiting")
+    return HTTPException(status_code=429, detail="Too many videos are queued, retry later",
+                         headers={"Retry-After": str(retry)})
+
+# media.video_maker (moviepy, numpy, openai) is the slowest import in the app, so
+# it is loaded on first use or by the startup warm-up, never at module load.
+def _course_screenshots(course_id: Optional[str]):
+    """Screenshots tagged with this workspace's course, never another course's.
+
+    The default workspace's captures are tagged with its scraped site's
+    hostname (see ``record_screenshot``). Screenshots taken before tagging
+    are untagged, so the scrape's own screenshot is used if none match;
+    with no scrape there are none.
+    """
+    from media.video_maker import get_screenshots
+    from web.static_export import screenshot_file
+    if course_id is not None:
+        return get_screenshots(course=course_id)
+    fields = get_workspace(None).read_scrape_fields("url", "screenshot") or {}
+    course = course_key_for_url(fields.get("url"))
+    shots = get_screenshots(course=course) if course else []
+    if not shots and screenshot_file(fields.get("screenshot")):
+        shots = [screenshot_file(fields["screenshot"])]
+    return shots
 
 class VideoRequest(BaseModel):
     # Security: enforce max lengths to prevent oversized payloads
     title: str = Field(..., max_length=500)
     text_content: str = Field(..., max_length=50000)
+    # Progressive mode: low-res preview + HLS segments playable before the encode finishes
+    progressive: bool = False
+    course_id: Optional[str] = Field(None, max_length=64)
 
-def _run_video_job(job_id: str, title: str, script: str, output_path: str, video_filename: str):
+def _run_video_job(job_id: str, key: str, title: str, script: str, screenshots: list[str], video_filename: str,
+                   progressive: bool = False, course_id: Optional[str] = None):
     """Runs video generation in a background thread and updates job status."""
+    from media.video_maker import generate_simple_video
+    job = video_jobs[job_id]
+    job["stages"] = {}
+    job.pop("queue_position", None)
+
+    def on_stage(name, record):
+        # Per-stage start/end timestamps so the critical path of each render is visible.
+        job["stages"][name] = record
+        if record["status"] == "running":
+            job["stage"] = name
+        video_events.publish(job_id, "stage", {"name": name, **record})
+
+    def on_progress(stage, percent):
+        job["percent"] = percent
+        video_events.publish(job_id, "progress", {"stage": stage, "percent": percent})
+
+    def on_slides(report):
+        job["slides"] = report
+        video_events.publish(job_id, "slides", report)
+
+    # Render to a partial file and rename on success, so a crashed render is
+    # never mistaken for a finished (deduplicated) video.
+    output_path = os.path.join("media", video_filename)
+    partial_path = output_path.replace(".mp4", ".partial.mp4")
+
+    preview_path = stream_dir = None
+    if progressive:
+        stem = video_filename[:-len(".mp4")]
+        preview_path = os.path.join("media", f"{stem}_preview.mp4")
+        stream_dir = os.path.join("media", "hls", stem)
+        shutil.rmtree(stream_dir, ignore_errors=True)
+
+    def on_asset(kind, path):
+        url = "/media/" + os.path.relpath(path, "media").replace(os.sep, "/")
+        job[f"{kind}_url"] = url
+        # The first thing that can be played wins; the final MP4 replaces it on completion.
+        job.setdefault("playable_url", url)
+        video_events.publish(job_id, "asset", {"kind": kind, "url": url})
+        print(f"[JOB {job_id}] {kind} playable: {url}")
+
     try:
-        video_jobs[job_id]["status"] = "processing"
-        generate_simple_video(title, script, output_path)
-        video_jobs[job_id]["status"] = "complete"
-        video_jobs[job_id]["video_url"] = f"/media/{video_filename}"
+        job["status"] = "processing"
+        video_events.publish(job_id, "processing", {})
+        generate_simple_video(title, script, partial_path, on_stage=on_stage, screenshots=screenshots,
+                              preview_path=preview_path, stream_dir=stream_dir, on_asset=on_asset,
+                              on_progress=on_progress, on_slides=on_slides)
+        os.replace(partial_path, output_path)
+        job["critical_path"] = critical_path(job["stages"])
+        job["status"] = "complete"
+        job["video_url"] = f"/media/{video_filename}"
+        job["playable_url"] = job["video_url"]
+        # Recorded so the course's static export ships this lesson's video
+        workspaces.get(course_id).record_videos({title: job["video_url"]})
+        video_events.publish(job_id, "complete", {"video_url": job["video_url"], "critical_path": job["critical_path"]})
         print(f"[JOB {job_id}] Video complete: /media/{video_filename}")
     except Exception as e:
         print(f"[JOB {job_id}] Video failed: {e}")
         traceback.print_exc()
+        mark_error(e)
+        try:
+            os.remove(partial_path)
+        except OSError:
+            pass
         raw_msg = str(e)
         if "insufficient_quota" in raw_msg or "billing_hard_limit" in raw_msg:
             detail = "OpenAI quota/billing limit reached. Check your usage at platform.openai.com/usage and try again after your limit resets."
         else:
             detail = "Video generation failed"
-        video_jobs[job_id]["status"] = "failed"
-        video_jobs[job_id]["detail"] = detail
+        job["status"] = "failed"
+        job["detail"] = detail
+        video_events.publish(job_id, "failed", {"detail": detail})
+    finally:
+        video_cache.release(key)
+        video_cache.evict()
+        catalog.gc()
 
 @app.post("/api/ai/video")
 async def create_lesson_video(req: VideoRequest):
-    # Security: sanitize title for use in filename — strip non-alphanumeric chars,
-    # use a UUID suffix to avoid collisions and prevent path traversal via crafted titles
-    safe_slug = _re.sub(r'[^a-zA-Z0-9_-]', '_', req.title)[:40]
+    get_workspace(req.course_id)  # validates the ID
+    trace_id = continue_trace(trace_key(req.course_id))
     job_id = _uuid.uuid4().hex[:12]
-    video_filename = f"video_{safe_slug}_{job_id}.mp4"
-    output_path = os.path.join("media", video_filename)
 
     # Ensure media dir exists
     if not os.path.exists("media"):
@@ -404,13 +742,122 @@ async def create_lesson_video(req: VideoRequest):
 
     script = req.text_content[:2500] if len(req.text_content) > 2500 else req.text_content
 
-    # Register job and launch in background thread
-    video_jobs[job_id] = {"status": "queued", "title": req.title}
-    thread = threading.Thread(target=_run_video_job, args=(job_id, req.title, script, output_path, video_filename), daemon=True)
-    thread.start()
+    # Content-address the render: identical inputs map to the same file.
+    # Screenshots come from the requested course (for the default workspace, its scraped site), not just the newest files on disk.
+    tts_engine = "openai" if os.getenv("OPENAI_API_KEY") else "gtts"
+
+    def resolve():
+        # Catalog query + screenshot hashing are blocking I/O
+        from media.video_maker import PERSONA_VERSION, ENCODER_SETTINGS, BROLL_SETTINGS
+        shots = _course_screenshots(req.course_id)
+        return shots, video_cache.key_for(req.title, script, shots, PERSONA_VERSION, ENCODER_SETTINGS, tts_engine,
+                                          broll=BROLL_SETTINGS)
+
+    screenshots, key = await offload(resolve)
+    video_filename = video_cache.filename_for(req.title, key)
+
+    if await offload(video_cache.lookup, video_filename):
+        url = f"/media/{video_filename}"
+        await offload(get_workspace(req.course_id).record_videos, {req.title: url})
+        video_jobs[job_id] = {"status": "complete", "title": req.title, "video_url": url, "playable_url": url, "cached": True}
+        video_events.publish(job_id, "complete", {"video_url": url})
+        print(f"[JOB {job_id}] Reusing rendered video for: {req.title}")
+        return {"status": "complete", "job_id": job_id, "video_url": url}
+
+    existing_job = video_cache.claim(key, job_id)
+    if existing_job:
+        print(f"[JOB {existing_job}] Attached duplicate request for: {req.title}")
+        return {"status": "accepted", "job_id": existing_job}
+    # Only new work is refused when the queue is full; cached and attached requests add none.
+    error = render_queue_full_error()
+    if error:
+        video_cache.release(key)
+        raise error
+
+    # Register job and hand it to the render workers
+    video_jobs[job_id] = {"status": "queued", "title": req.title, "trace_id": trace_id}
+    video_queue.submit(job_id, _run_video_job, key, req.title, script, screenshots, video_filename, req.progressive,
+                       req.course_id)
+
+    print(f"[JOB {job_id}] Video job queued for: {req.title} (trace {trace_id})")
+    return {"status": "accepted", "job_id": job_id, "queue_position": video_queue.position(job_id),
+            "trace_id": trace_id}
+
+def _run_course_video_job(job_id: str, course_id: Optional[str], lessons: list[dict], screenshots: list[str],
+                          tts_engine: str):
+    """Renders every lesson of a course as one background job."""
+    job = video_jobs[job_id]
+    job.pop("queue_position", None)
+    job["status"] = "processing"
+    video_events.publish(job_id, "processing", {})
+
+    ws = workspaces.get(course_id)
+    context = (ws.read_scrape_fields("text_content") or {}).get("text_content", "")
 
-    print(f"[JOB {job_id}] Video job started for: {req.title}")
-    return {"status": "accepted", "job_id": job_id}
+    def lesson_text(lesson):
+        # Same lesson content the lesson page narrates; fall back to the outline text.
+        saved = ws.read_lesson(lesson["title"])
+        if saved:
+            return saved
+        try:
+            content = asyncio.run(planner.generate_lesson(lesson["title"], context))
+            ws.write_lesson(lesson["title"], content)
+            return content
+        except Exception as e:
+            print(f"[JOB {job_id}] Lesson text failed for {lesson['title']!r}: {e}")
+            return f"{lesson['title']}. {lesson['description']}"
+
+    def on_lesson(record):
+        job["lessons"][record["index"]] = record
+        video_events.publish(job_id, "lesson", record)
+
+    job["lessons"] = [{"index": i, "title": l["title"], "status": "pending"} for i, l in enumerate(lessons)]
+    try:
+        report = render_course(lessons, lesson_text, screenshots, video_cache, tts_engine, on_lesson=on_lesson)
+        ws.record_videos({r["title"]: r["video_url"] for r in report["lessons"] if r.get("video_url")})
+        job.update(report)
+        job["status"] = "complete"
+        video_events.publish(job_id, "complete", {k: v for k, v in report.items() if k != "lessons"})
+        print(f"[JOB {job_id}] Course render complete in {report['total_seconds']}s")
+    except Exception as e:
+        print(f"[JOB {job_id}] Course render failed: {e}")
+        traceback.print_exc()
+        mark_error(e)
+        job["status"] = "failed"
+        job["detail"] = "Course video rendering failed"
+        video_events.publish(job_id, "failed", {"detail": job["detail"]})
+    finally:
+        video_cache.evict()
+        catalog.gc()
+
+@app.post("/api/ai/video/course")
+async def create_course_videos(course_id: Optional[str] = None):
+    """Queues one job that renders a video for every lesson in the course plan."""
+    plan = await offload(get_workspace(course_id).read_plan)
+    trace_id = continue_trace(trace_key(course_id))
+    if plan is None:
+        raise HTTPException(status_code=404, detail="No course plan found")
+    lessons = course_lessons(plan)
+    if not lessons:
+        raise HTTPException(status_code=400, detail="Course plan has no lessons")
+    # Security: bound the work a single request can queue
+    if len(lessons) > MAX_BATCH_LESSONS:
+        raise HTTPException(status_code=400, detail=f"Course has more than {MAX_BATCH_LESSONS} lessons")
+
+    error = render_queue_full_error()
+    if error:
+        raise error
+
+    os.makedirs("media", exist_ok=True)
+    job_id = _uuid.uuid4().hex[:12]
+    screenshots = await offload(_course_screenshots, course_id)
+    tts_engine = "openai" if os.getenv("OPENAI_API_KEY") else "gtts"
+    video_jobs[job_id] = {"status": "queued", "kind": "course", "course_id": course_id, "lesson_count": len(lessons),
+                          "trace_id": trace_id}
+    video_queue.submit(job_id, _run_course_video_job, course_id, lessons, screenshots, tts_engine)
+    print(f"[JOB {job_id}] Course video job queued ({len(lessons)} lessons, trace {trace_id})")
+    return {"status": "accepted", "job_id": job_id, "queue_position": video_queue.position(job_id),
+            "trace_id": trace_id}
 
 @app.get("/api/ai/video/status/{job_id}")
 async def get_video_status(job_id: str):
@@ -422,6 +869,259 @@ async def get_video_status(job_id: str):
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
+@app.get("/api/ai/video/events/{job_id}")
+async def stream_video_events(job_id: str, request: Request, last_event_id: int = 0):
+    """Server-sent events for one video job: queue position, stage, encode percent, final URL.
+
+    Any number of clients may subscribe. EventSource reconnects send the
+    Last-Event-ID header, and the stream resumes from there.
+    """
+    # Security: validate job_id format (hex only, 12 chars)
+    if not _re.fullmatch(r'[0-9a-f]{12}', job_id):
+        raise HTTPException(status_code=400, detail="Invalid job ID")
+    if job_id not in video_jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return sse_response(video_events, job_id, request, last_event_id)
+
+def sse_response(bus: JobEventBus, job_id: str, request: Request, last_event_id: int = 0):
+    """Streams a job's events from ``bus``, resuming after Last-Event-ID on reconnect."""
+    header_id = request.headers.get("last-event-id", "")
+    if header_id.isdigit():
+        last_event_id = int(header_id)
+
+    async def stream():
+        async for ev in bus.subscribe(job_id, last_event_id):
+            if await request.is_disconnected():
+                break
+            yield format_sse(ev)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache, no-transform",
+        "X-Accel-Buffering": "no",
+    })
+
+
+@app.get("/api/traces/{trace_id}")
+def get_trace(trace_id: str):
+    """Spans recorded for one trace (still in the in-memory buffer), with time per span name."""
+    # Security: validate trace_id format (hex only, 32 chars)
+    if not _re.fullmatch(r'[0-9a-f]{32}', trace_id):
+        raise HTTPException(status_code=400, detail="Invalid trace ID")
+    summary = summarize(tracer.trace(trace_id))
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return summary
+
+@app.get("/api/course/trace")
+def get_course_trace(course_id: Optional[str] = None):
+    """The trace of the course's latest build (navigate/scrape onwards)."""
+    get_workspace(course_id)  # validates the ID
+    trace_id = tracer.course_trace(trace_key(course_id))
+    if trace_id is None:
+        raise HTTPException(status_code=404, detail="No trace for this course")
+    return get_trace(trace_id)
+
+# --- One-shot Course Build ---
+
+class CourseBuildRequest(BaseModel):
+    # Security: cap URL length to prevent oversized inputs
+    url: str = Field(..., max_length=2048)
+    course_id: Optional[str] = Field(None, max_length=64)
+    use_auth: bool = True
+
+# In-memory course build tracker; builds run as tasks on the event loop
+course_builds: dict[str, dict] = {}
+build_events = JobEventBus()
+_build_tasks: set = set()
+
+async def _run_course_build(job_id: str, url: str, course_id: Optional[str], use_auth: bool):
+    """Builds a course from a URL as one stage graph:
+
+        launch -> navigate -> text -+-> outline
+                                    +-> elements -> screenshot -> save
+
+    Outline generation starts as soon as the text is read, while elements
+    and the screenshot are still being captured. A text-only scrape is
+    saved right away and the plan as soon as it exists, so the viewer and
+    lesson generation work before the capture is done; if the build fails
+    before ``save``, the previous full scrape is put back. The browser slot
+    is held only until the screenshot is taken.
+    """
+    job = course_builds[job_id]
+    ws = workspaces.get(course_id)
+    browser_limiter = admission_limiters["browser"]
+    plan_limiter = admission_limiters["plan"]
+    held = {}
+
+    def release_browser():
+        if "browser" in held:
+            browser_limiter.release(held.pop("browser"))
+
+    def on_stage(name, record):
+        job["stages"][name] = record
+        build_events.publish(job_id, "stage", {"name": name, **record})
+
+    async def launch():
+        # Same one-page-at-a-time rule as navigate/scrape
+        held["browser"] = await browser_limiter.acquire()
+        await ensure_browser(use_auth=use_auth)
+
+    async def navigate(launch):
+        with timed(BROWSER_SECONDS, BROWSER_ERRORS, span_name="browser.navigate", operation="navigate"):
+            await browser_manager.page.goto(url, wait_until="networkidle", timeout=30000)
+
+    async def text(navigate):
+        await asyncio.sleep(DYNAMIC_CONTENT_WAIT)
+        data = await extractor.extract_text(browser_manager.page)
+        held["previous_scrape"] = await offload(ws.read_scrape)
+        await offload(ws.write_scrape, scrape_record(data, None, []))
+        return data
+
+    async def outline(text):
+        if not os.environ.get("GROQ_API_KEY"):
+            plan = MOCK_PLAN
+        else:
+            acquired = await plan_limiter.acquire()
+            try:
+                plan = await planner.outline_for(text["title"], text["text_content"])
+            finally:
+                plan_limiter.release(acquired)
+        await offload(ws.write_plan, plan)
+        job["plan_ready_seconds"] = round(time.time() - job["started"], 3)
+        build_events.publish(job_id, "plan", {"plan": plan, "seconds": job["plan_ready_seconds"]})
+        return plan
+
+    async def elements(text):
+        return await extractor.extract_elements(browser_manager.page)
+
+    async def screenshot(text, elements):
+        # After the elements: the page is shared, so captures don't overlap each other
+        try:
+            return await extractor.capture_screenshot(browser_manager.page, course=course_id, url=text["url"])
+        finally:
+            release_browser()
+
+    async def save(text, elements, screenshot):
+        await offload(ws.write_scrape, scrape_record(text, screenshot, elements))
+        held.pop("previous_scrape", None)
+        await offload(catalog.gc)
+
+    graph = AsyncStageGraph(on_stage=on_stage)
+    graph.add("launch", launch).add("navigate", navigate, ("launch",)).add("text", text, ("navigate",))
+    graph.add("outline", outline, ("text",)).add("elements", elements, ("text",))
+    graph.add("screenshot", screenshot, ("text", "elements"))
+    graph.add("save", save, ("text", "elements", "screenshot"))
+
+    job["status"] = "processing"
+    job["started"] = time.time()
+    build_events.publish(job_id, "processing", {})
+    try:
+        await graph.run()
+        job.update(status="complete", total_seconds=round(time.time() - job["started"], 3),
+                   stage_seconds=round(sum(r.get("duration", 0) for r in graph.records.values()), 3),
+                   critical_path=graph.critical_path())
+        build_events.publish(job_id, "complete", {k: job.get(k) for k in (
+            "course_id", "total_seconds", "stage_seconds", "plan_ready_seconds", "critical_path")})
+        print(f"[BUILD {job_id}] Course ready in {job['total_seconds']}s "
+              f"(stages sum {job['stage_seconds']}s, plan at {job.get('plan_ready_seconds')}s)")
+    except Overloaded as e:
+        job.update(status="failed", detail="Browser is busy, retry later", retry_after=e.retry_after)
+        build_events.publish(job_id, "failed", {"detail": job["detail"], "retry_after": e.retry_after})
+    except Exception as e:
+        await log_error("COURSE BUILD", e)
+        mark_error(e)
+        # Security: don't leak internal error details to client
+        job.update(status="failed", detail="Course build failed")
+        build_events.publish(job_id, "failed", {"detail": job["detail"]})
+    finally:
+        release_browser()
+        # The text-only interim scrape must not outlive a failed build
+        previous = held.pop("previous_scrape", None)
+        if previous is not None:
+            try:
+                await offload(ws.write_scrape, previous)
+            except Exception as e:
+                await log_error("COURSE BUILD", e)
+
+@app.post("/api/course/build", status_code=202)
+async def build_course(req: CourseBuildRequest):
+    """Starts a one-shot URL -> course build; follow it with /api/course/build/{job_id}/events."""
+    get_workspace(req.course_id)  # validates the ID
+    # DNS resolution in validate_url blocks; keep it off the loop
+    is_valid, result = await offload(validate_url, req.url)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=result)
+    limiter = admission_limiters["browser"]
+    if limiter.waiting >= limiter.queue:
+        ADMISSION_REJECTED.inc(limiter="browser", reason="queue_full")
+        raise HTTPException(status_code=429, detail="Server is busy, retry later",
+                            headers={"Retry-After": str(limiter.retry_after())})
+
+    trace_id = begin_trace(trace_key(req.course_id))
+    job_id = _uuid.uuid4().hex[:12]
+    course_builds[job_id] = {"status": "queued", "url": result, "course_id": req.course_id, "stages": {},
+                             "trace_id": trace_id}
+    # The task inherits this request's trace context, so its stages join the trace
+    task = asyncio.create_task(_run_course_build(job_id, result, req.course_id, req.use_auth))
+    _build_tasks.add(task)
+    task.add_done_callback(_build_tasks.discard)
+    print(f"[BUILD {job_id}] Course build started for {result} (trace {trace_id})")
+    return {"status": "accepted", "job_id": job_id, "trace_id": trace_id}
+
+@app.get("/api/course/build/{job_id}")
+async def get_course_build(job_id: str):
+    # Security: validate job_id format (hex only, 12 chars)
+    if not _re.fullmatch(r'[0-9a-f]{12}', job_id):
+        raise HTTPException(status_code=400, detail="Invalid job ID")
+    job = course_builds.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/course/build/{job_id}/events")
+async def stream_course_build_events(job_id: str, request: Request, last_event_id: int = 0):
+    """Server-sent events for a course build: stage start/end, the plan as soon as it exists, completion."""
+    # Security: validate job_id format (hex only, 12 chars)
+    if not _re.fullmatch(r'[0-9a-f]{12}', job_id):
+        raise HTTPException(status_code=400, detail="Invalid job ID")
+    if job_id not in course_builds:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return sse_response(build_events, job_id, request, last_event_id)
+
+# --- Static export ---
+
+from web.static_export import export_course, export_dir
+
+@app.post("/api/course/export")
+async def export_course_bundle(course_id: Optional[str] = None, generate: bool = True):
+    """Compiles the course into a static bundle any static host can serve (see web/static_export.py).
+
+    Lessons and quizzes not generated yet are written first unless
+    ``generate=false``. The bundle is also zipped for /api/course/export/download.
+    """
+    ws = get_workspace(course_id)
+    continue_trace(trace_key(course_id))
+    try:
+        with span("course.export", course_id=course_id or "default"):
+            report = await export_course(ws, planner, export_dir(course_id), generate=generate,
+                                         limiter=admission_limiters["lesson"])
+    except Exception as e:
+        await log_error("EXPORT", e)
+        # Security: don't leak internal error details to client
+        raise HTTPException(status_code=500, detail="Course export failed")
+    if report is None:
+        raise HTTPException(status_code=404, detail="No course plan found")
+    download = "/api/course/export/download" + (f"?course_id={course_id}" if course_id else "")
+    return {"status": "exported", **report, "download_url": download}
+
+@app.get("/api/course/export/download")
+async def download_course_bundle(course_id: Optional[str] = None):
+    get_workspace(course_id)  # validates the ID
+    zip_path = export_dir(course_id) + ".zip"
+    if not os.path.isfile(zip_path):
+        raise HTTPException(status_code=404, detail="No export found")
+    return FileResponse(zip_path, media_type="application/zip", filename=f"{course_id or 'course'}-static.zip")
+
 
 if __name__ == "__main__":
     if sys.platform == "win32":
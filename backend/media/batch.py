@@ -0,0 +1,162 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from monitoring.tracing import span, propagate
+
+# Lessons rendered at once; 0 = pick from the core count (see plan_packing).
+BATCH_PARALLEL = int(os.environ.get("VIDEO_BATCH_PARALLEL", "0"))
+# Lesson texts are fetched from the LLM concurrently before rendering starts.
+TEXT_CONCURRENCY = 4
+
+
+def course_lessons(plan):
+    """Flattens a course plan into [{"module", "title", "description"}] in course order."""
+    lessons = []
+    for module in plan.get("modules", []):
+        for lesson in module.get("lessons", []):
+            if lesson.get("title"):
+                lessons.append({
+                    "module": module.get("title", ""),
+                    "title": lesson["title"],
+                    "description": lesson.get("description", ""),
+                })
+    return lessons
+
+
+def plan_packing(n_lessons, cpus=None, parallel=BATCH_PARALLEL):
+    """Returns (parallel renders, x264 threads per encode) for this machine.
+
+    Encodes are CPU bound but much of a render (script, TTS, presenter) waits
+    on the network, so two threads per encode with one render per pair of
+    cores keeps the CPU busy without oversubscribing it.
+    """
+    cpus = cpus or os.cpu_count() or 1
+    if parallel <= 0:
+        parallel = max(1, cpus // 2)
+    parallel = max(1, min(parallel, n_lessons or 1))
+    return parallel, max(1, cpus // parallel)
+
+
+def render_course(lessons, lesson_text, screenshots, cache, tts_engine, media_dir="media",
+                  parallel=BATCH_PARALLEL, on_lesson=None):
+    """Renders a video for every lesson of a course in one job.
+
+    ``lesson_text(lesson)`` returns the narration source for a lesson (the
+    lesson content). Shared assets are prepared once while the texts are
+    fetched; lessons are then rendered longest-first on ``parallel`` workers
+    with x264 threads split between them. Lessons whose video already exists
+    in ``cache`` are reused, and lessons another job is rendering are skipped.
+    ``on_lesson(record)`` fires whenever a lesson starts or finishes.
+
+    Returns a report with total wall time, time spent on shared assets and
+    the per-lesson cost (wall seconds and per-stage durations).
+    """
+    # Imported here so course_lessons/plan_packing don't pull in moviepy.
+    from media.video_maker import (generate_simple_video, prepare_shared_assets, PERSONA_VERSION, ENCODER_SETTINGS,
+                                   BROLL_SETTINGS)
+
+    start = time.time()
+    parallel, encode_threads = plan_packing(len(lessons), parallel=parallel)
+    records = [{"index": i, "module": l["module"], "title": l["title"], "status": "pending"}
+               for i, l in enumerate(lessons)]
+    print(f"[BATCH] {len(lessons)} lessons, {parallel} parallel renders x {encode_threads} encode threads")
+
+    def notify(record):
+        if on_lesson:
+            try:
+                on_lesson(dict(record))
+            except Exception as e:
+                print(f"[BATCH] on_lesson callback failed: {e}")
+
+    # Shared assets and lesson texts are independent; fetch them side by side.
+    work_prefix = os.path.join(media_dir, f"video_batch_{os.getpid()}_{int(start * 1000)}")
+    with ThreadPoolExecutor(max_workers=TEXT_CONCURRENCY + 1) as pool:
+        assets_future = pool.submit(propagate(prepare_shared_assets), screenshots, work_prefix)
+        texts = list(pool.map(propagate(lesson_text), lessons))
+        assets = assets_future.result()
+    prepared = time.time()
+    print(f"[BATCH] Shared assets and lesson texts ready in {prepared - start:.1f}s")
+
+    def render(i):
+        record = records[i]
+        lesson = lessons[i]
+        script = texts[i][:2500]
+        key = cache.key_for(lesson["title"], script, screenshots, PERSONA_VERSION, ENCODER_SETTINGS, tts_engine,
+                            broll=BROLL_SETTINGS)
+        filename = cache.filename_for(lesson["title"], key)
+        record["video_url"] = f"/media/{filename}"
+        if cache.lookup(filename):
+            record.update(status="complete", cached=True, seconds=0.0)
+            notify(record)
+            return
+        owner = f"batch-{i}-{int(start)}"
+        if cache.claim(key, owner):
+            record.update(status="skipped", detail="already rendering in another job")
+            record.pop("video_url")
+            notify(record)
+            return
+
+        stages = {}
+        output_path = os.path.join(media_dir, filename)
+        partial_path = output_path.replace(".mp4", ".partial.mp4")
+        lesson_start = time.time()
+        # Catalog GC sweeps render temp files older than an hour; keep the
+        # shared slides fresh for courses that take longer than that.
+        for p in assets.slide_paths:
+            try:
+                os.utime(p)
+            except OSError:
+                pass
+        record["status"] = "processing"
+        notify(record)
+        try:
+            with span("video.lesson", title=lesson["title"], index=i):
+                generate_simple_video(
+                    lesson["title"], script, partial_path, screenshots=screenshots, assets=assets,
+                    encode_threads=encode_threads, on_stage=lambda name, rec: stages.__setitem__(name, rec),
+                )
+            os.replace(partial_path, output_path)
+            record["status"] = "complete"
+            record["cached"] = False
+        except Exception as e:
+            print(f"[BATCH] Lesson {lesson['title']!r} failed: {e}")
+            try:
+                os.remove(partial_path)
+            except OSError:
+                pass
+            record["status"] = "failed"
+            record.pop("video_url")
+        finally:
+            cache.release(key)
+        record["seconds"] = round(time.time() - lesson_start, 2)
+        record["stage_seconds"] = {n: r.get("duration") for n, r in stages.items() if r.get("duration") is not None}
+        notify(record)
+
+    # Longest narration first, so the slowest lessons don't start last.
+    order = sorted(range(len(lessons)), key=lambda i: len(texts[i]), reverse=True)
+    try:
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            list(pool.map(propagate(render), order))
+    finally:
+        assets.close()
+
+    total = time.time() - start
+    rendered = [r["seconds"] for r in records if r["status"] == "complete" and not r.get("cached")]
+    report = {
+        "lessons": records,
+        "total_seconds": round(total, 2),
+        "shared_seconds": round(prepared - start, 2),
+        "render_seconds": round(total - (prepared - start), 2),
+        # Sum of per-lesson wall times; compare with render_seconds to see the packing gain.
+        "lesson_seconds_sum": round(sum(rendered), 2),
+        "parallel": parallel,
+        "encode_threads": encode_threads,
+        # Shared screenshot slides after blank/duplicate pruning (see media/slide_dedup.py).
+        "slides": assets.slide_report,
+        "complete": sum(1 for r in records if r["status"] == "complete"),
+        "failed": sum(1 for r in records if r["status"] == "failed"),
+    }
+    print(f"[BATCH] Course rendered in {report['total_seconds']}s "
+          f"({report['complete']}/{len(records)} complete, {report['failed']} failed)")
+    return report
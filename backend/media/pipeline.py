@@ -0,0 +1,193 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from monitoring.tracing import span, propagate
+
+
+class StageGraph:
+    """A tiny dependency graph of pipeline stages run on a thread pool.
+
+    Each stage is a callable that receives the results of its dependencies as
+    keyword arguments (keyed by stage name). A stage is submitted as soon as
+    all of its dependencies have finished, so stages that don't depend on each
+    other overlap. Start/end timestamps are recorded per stage so callers can
+    see which chain of stages bounded the total render time.
+    """
+
+    def __init__(self, max_workers=4, on_stage=None):
+        self.max_workers = max_workers
+        self.on_stage = on_stage
+        self.records = {}
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, fn, deps=()):
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        for dep in deps:
+            if dep not in self._stages:
+                raise ValueError(f"Stage {name} depends on unknown stage {dep}")
+        self._stages[name] = (fn, tuple(deps))
+        self.records[name] = {"status": "pending", "deps": list(deps)}
+        return self
+
+    def _notify(self, name):
+        if self.on_stage:
+            try:
+                self.on_stage(name, dict(self.records[name]))
+            except Exception as e:
+                print(f"[PIPELINE] on_stage callback failed for {name}: {e}")
+
+    def _begin(self, name):
+        with self._lock:
+            self.records[name].update(status="running", start=time.time())
+        self._notify(name)
+
+    def _end(self, name, error=None):
+        with self._lock:
+            end = time.time()
+            rec = self.records[name]
+            rec.update(status="failed" if error else "done", end=end, duration=round(end - rec["start"], 3))
+            if error:
+                rec["error"] = str(error)[:200]
+        self._notify(name)
+
+    def _run_stage(self, name, fn, kwargs):
+        self._begin(name)
+        try:
+            with span(f"stage.{name}"):
+                result = fn(**kwargs)
+        except Exception as e:
+            self._end(name, e)
+            raise
+        self._end(name)
+        return result
+
+    def run(self):
+        """Runs every stage respecting dependencies. Returns {stage: result}.
+
+        The first stage failure cancels anything not yet started and is
+        re-raised to the caller once in-flight stages have settled.
+        """
+        results = {}
+        remaining = dict(self._stages)
+        running = {}
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as pool:
+            while remaining or running:
+                if error is None:
+                    ready = [n for n, (_, deps) in remaining.items() if all(d in results for d in deps)]
+                    for name in ready:
+                        fn, deps = remaining.pop(name)
+                        kwargs = {d: results[d] for d in deps}
+                        running[pool.submit(propagate(self._run_stage), name, fn, kwargs)] = name
+                else:
+                    for name in remaining:
+                        self.records[name]["status"] = "skipped"
+                    remaining.clear()
+
+                if not running:
+                    if remaining:
+                        raise RuntimeError(f"Unsatisfiable stages: {sorted(remaining)}")
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    try:
+                        results[name] = fut.result()
+                    except Exception as e:
+                        if error is None:
+                            error = e
+
+        if error is not None:
+            raise error
+        return results
+
+    def critical_path(self):
+        return critical_path(self.records)
+
+
+class AsyncStageGraph(StageGraph):
+    """StageGraph for coroutine stages, run as tasks on the event loop.
+
+    For I/O-bound pipelines (browser, LLM calls) that don't need threads.
+    Records, callbacks and failure handling match StageGraph; ``run`` is
+    awaited, and cancelling it cancels the stages in flight.
+    """
+
+    def __init__(self, on_stage=None):
+        super().__init__(max_workers=None, on_stage=on_stage)
+
+    async def _run_async_stage(self, name, fn, kwargs):
+        self._begin(name)
+        try:
+            with span(f"stage.{name}"):
+                result = await fn(**kwargs)
+        except BaseException as e:
+            self._end(name, e if isinstance(e, Exception) else "cancelled")
+            raise
+        self._end(name)
+        return result
+
+    async def run(self):
+        results = {}
+        remaining = dict(self._stages)
+        running = {}
+        error = None
+        try:
+            while remaining or running:
+                if error is None:
+                    ready = [n for n, (_, deps) in remaining.items() if all(d in results for d in deps)]
+                    for name in ready:
+                        fn, deps = remaining.pop(name)
+                        kwargs = {d: results[d] for d in deps}
+                        running[asyncio.ensure_future(self._run_async_stage(name, fn, kwargs))] = name
+                else:
+                    for name in remaining:
+                        self.records[name]["status"] = "skipped"
+                    remaining.clear()
+
+                if not running:
+                    if remaining:
+                        raise RuntimeError(f"Unsatisfiable stages: {sorted(remaining)}")
+                    break
+
+                done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    try:
+                        results[name] = fut.result()
+                    except Exception as e:
+                        if error is None:
+                            error = e
+        finally:
+            for fut in running:
+                fut.cancel()
+
+        if error is not None:
+            raise error
+        return results
+
+
+def critical_path(records):
+    """Walks back from the last stage to finish through its latest-ending dependency.
+
+    Works on the plain record dicts (as stored on a video job) so callers
+    don't need the graph object itself.
+    """
+    finished = {n: r for n, r in records.items() if "end" in r}
+    if not finished:
+        return []
+    name = max(finished, key=lambda n: finished[n]["end"])
+    path = [name]
+    while True:
+        deps = [d for d in finished[name].get("deps", []) if d in finished]
+        if not deps:
+            break
+        name = max(deps, key=lambda d: finished[d]["end"])
+        path.append(name)
+    return list(reversed(path))
@@ -0,0 +1,119 @@
+import os
+
+import numpy as np
+from PIL import Image
+
+# Slides whose difference hashes differ in at most this many of 64 bits are
+# the same picture (re-scrapes, a sticky header over the same section); -1
+# keeps every slide.
+SLIDE_DEDUP_DISTANCE = int(os.environ.get("SLIDE_DEDUP_DISTANCE", "6"))
+# A slice is blank when this share of its pixels sits within BLANK_TOLERANCE
+# grey levels of its median (empty page bottoms, unloaded lazy sections); 0
+# keeps blank slices.
+SLIDE_BLANK_FRACTION = float(os.environ.get("SLIDE_BLANK_FRACTION", "0.98"))
+BLANK_TOLERANCE = 12
+# Greyscale thumbnail every check works on; 72x40 averages evenly into the
+# 9x8 grid of the hash.
+THUMB_SIZE = (72, 40)
+HASH_GRID = (9, 8)
+
+
+def thumbnail(img, box=None):
+    """Greyscale THUMB_SIZE thumbnail of ``img`` (or of ``box`` in source pixels)."""
+    return img.resize(THUMB_SIZE, Image.Resampling.BOX, box=box, reducing_gap=2.0).convert("L")
+
+
+def dhash(thumbs):
+    """64-bit difference hashes of a stack of thumbnails, shape (n, 40, 72) -> (n,) uint64.
+
+    Each thumbnail is averaged down to 9x8 and every bit records whether a
+    cell is brighter than its left neighbour, for the whole stack at once.
+    """
+    gw, gh = HASH_GRID
+    n, h, w = thumbs.shape
+    grid = thumbs.reshape(n, gh, h // gh, gw, w // gw).mean(axis=(2, 4))
+    bits = grid[:, :, 1:] > grid[:, :, :-1]
+    return np.packbits(bits.reshape(n, 64), axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def hamming(hashes, h):
+    """Bit distance from ``h`` to each of ``hashes``."""
+    diff = np.bitwise_xor(hashes, np.uint64(h))
+    return np.unpackbits(diff.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def blank_mask(thumbs, fraction=SLIDE_BLANK_FRACTION):
+    """True for each thumbnail that is (almost) one flat colour."""
+    if fraction <= 0:
+        return np.zeros(len(thumbs), dtype=bool)
+    flat = thumbs.reshape(len(thumbs), -1).astype(np.int16)
+    median = np.median(flat, axis=1, keepdims=True)
+    return (np.abs(flat - median) <= BLANK_TOLERANCE).mean(axis=1) >= fraction
+
+
+class SlidePruner:
+    """Drops blank and near-duplicate slides before they are resampled, baked and encoded.
+
+    One pruner spans a whole render, so a slice is compared against every
+    slide kept so far, from any screenshot. The caller adds the time spent
+    resampling the kept slices to ``build_seconds`` and reports baking
+    (presenter composite and PNG write) through ``baked``; ``report`` turns
+    the per-slide averages into the time the pruned slides would have cost.
+    """
+
+    def __init__(self, distance=SLIDE_DEDUP_DISTANCE, blank_fraction=SLIDE_BLANK_FRACTION):
+        self.distance = distance
+        self.blank_fraction = blank_fraction
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.candidates = 0
+        self.duplicates = 0
+        self.blank = 0
+        self.build_seconds = 0.0
+        self.baked_seconds = 0.0
+        self.baked_slides = 0
+
+    @property
+    def kept(self):
+        return len(self.hashes)
+
+    @property
+    def pruned(self):
+        return self.duplicates + self.blank
+
+    def select(self, thumbs):
+        """Which of ``thumbs`` (PIL thumbnails, in slide order) to keep, as a list of bools."""
+        if not thumbs:
+            return []
+        stack = np.stack([np.asarray(t, dtype=np.uint8) for t in thumbs])
+        hashes = dhash(stack)
+        blank = blank_mask(stack, self.blank_fraction)
+        keep = []
+        for h, is_blank in zip(hashes, blank):
+            self.candidates += 1
+            if is_blank:
+                self.blank += 1
+                keep.append(False)
+            elif self.distance >= 0 and self.kept and hamming(self.hashes, h).min() <= self.distance:
+                self.duplicates += 1
+                keep.append(False)
+            else:
+                self.hashes = np.append(self.hashes, h)
+                keep.append(True)
+        return keep
+
+    def baked(self, seconds, count):
+        self.baked_seconds += seconds
+        self.baked_slides += count
+
+    def report(self):
+        per_slide = self.build_seconds / self.kept if self.kept else 0.0
+        if self.baked_slides:
+            per_slide += self.baked_seconds / self.baked_slides
+        return {
+            "candidates": self.candidates,
+            "kept": self.kept,
+            "pruned": self.pruned,
+            "duplicates": self.duplicates,
+            "blank": self.blank,
+            "saved_seconds": round(per_slide * self.pruned, 3),
+        }
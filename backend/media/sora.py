@@ -0,0 +1,256 @@
+import os
+import time
+import asyncio
+import hashlib
+import threading
+import concurrent.futures
+from urllib.parse import urlparse
+
+import httpx
+
+from monitoring.metrics import timed, LLM_SECONDS, LLM_ERRORS
+
+SORA_API_URL = os.environ.get("SORA_API_URL", "https://api.openai.com/v1/videos")
+SORA_CACHE_DIR = os.environ.get("SORA_CACHE_DIR",
+                                os.path.join(os.path.dirname(__file__), "..", "cache", "sora"))
+SORA_CONCURRENCY = int(os.environ.get("SORA_CONCURRENCY", "3"))
+# Security: cap downloaded clip size so a misbehaving endpoint can't fill the disk
+MAX_CLIP_BYTES = int(os.environ.get("SORA_MAX_CLIP_BYTES", str(200 * 1024 * 1024)))
+TRACE_LOG = os.environ.get("SORA_TRACE_LOG", "sora_trace.log")
+# Clip cache limits; catalog GC evicts the least recently used clips beyond
+# the size budget and any clip unused for longer than the age limit.
+SORA_CACHE_MAX_BYTES = int(os.environ.get("SORA_CACHE_MAX_BYTES", str(1024 ** 3)))
+SORA_CACHE_MAX_AGE_DAYS = float(os.environ.get("SORA_CACHE_MAX_AGE_DAYS", "30"))
+# Partial downloads older than this were left by a crash mid-download.
+PART_MAX_AGE_SECONDS = 3600
+
+_trace_lock = threading.Lock()
+# Clip path -> concurrent Future of the render producing it. Shared by every
+# service instance and event loop in the process, so concurrent renders of
+# the same lesson submit each paid prompt once.
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _trace(tag, message):
+    """Appends to TRACE_LOG; concurrent clips share the file, tagged by prompt hash."""
+    line = f"{time.strftime('%Y-%m-%d %H:%M:%S')} [{tag}] {message}\n"
+    with _trace_lock:
+        try:
+            with open(TRACE_LOG, "a", encoding="utf-8") as log:
+                log.write(line)
+        except OSError:
+            pass
+
+
+def prompt_key(prompt, seconds, size, model):
+    return hashlib.sha256(f"{model}\x00{seconds}\x00{size}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+def _find_video_url(data):
+    """The completed payload has used several shapes; the legacy code accepted all of them."""
+    url = data.get("video_url") or data.get("url")
+    if not url and isinstance(data.get("result"), dict):
+        url = data["result"].get("url")
+    if not url and isinstance(data.get("data"), list) and data["data"]:
+        url = data["data"][0].get("url")
+    return url
+
+
+class SoraClipService:
+    """Generates b-roll clips concurrently against the OpenAI videos API.
+
+    Prompts are submitted together (bounded by ``concurrency``), each job is
+    polled with exponential backoff instead of a fixed 10s sleep, and results
+    are streamed to disk under a size cap. Finished clips are cached by prompt
+    hash, and concurrent requests for the same prompt, from any render in the
+    process, share one API job.
+    """
+
+    def __init__(self, api_key=None, base_url=SORA_API_URL, cache_dir=SORA_CACHE_DIR,
+                 concurrency=SORA_CONCURRENCY, model="sora-2", seconds="8", size="1280x720",
+                 poll_initial=2.0, poll_max=20.0, timeout=300.0, max_bytes=MAX_CLIP_BYTES):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.base_url = base_url.rstrip("/")
+        self.cache_dir = cache_dir
+        self.concurrency = concurrency
+        self.model = model
+        self.seconds = seconds
+        self.size = size
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+
+    @property
+    def _headers(self):
+        return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+    def cache_path(self, prompt):
+        return os.path.join(self.cache_dir, f"{prompt_key(prompt, self.seconds, self.size, self.model)}.mp4")
+
+    async def generate_many(self, prompts):
+        """Returns a list of clip paths (None where a clip failed), in prompt order."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        sem = asyncio.Semaphore(max(1, self.concurrency))
+        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0)) as http:
+            return await asyncio.gather(*(self._generate_one(http, sem, p) for p in prompts))
+
+    async def _generate_one(self, http, sem, prompt):
+        path = self.cache_path(prompt)
+        if os.path.exists(path):
+            try:
+                os.utime(path)  # recently used, for the LRU prune
+            except OSError:
+                pass
+            return path
+        with _inflight_lock:
+            shared = _inflight.get(path)
+            owner = shared is None
+            if owner:
+                shared = _inflight[path] = concurrent.futures.Future()
+        if owner:
+            try:
+                result = await self._render(http, sem, prompt, path)
+            except BaseException as e:
+                # Waiters in other renders must not hang on a cancelled owner.
+                shared.set_exception(e if isinstance(e, Exception) else RuntimeError("clip render cancelled"))
+                if not isinstance(e, Exception):
+                    raise
+            else:
+                shared.set_result(result)
+            finally:
+                with _inflight_lock:
+                    _inflight.pop(path, None)
+        try:
+            # Shielded: a cancelled waiter must not cancel the shared future.
+            return await asyncio.shield(asyncio.wrap_future(shared))
+        except Exception as e:
+            tag = os.path.basename(path)[:12]
+            print(f"[SORA {tag}] Clip failed: {e}")
+            _trace(tag, f"Exception: {e}")
+            return None
+
+    async def _render(self, http, sem, prompt, path):
+        tag = os.path.basename(path)[:12]
+        async with sem:
+            start = time.time()
+            payload = {
+                "model": self.model,
+                "prompt": f"Realism style, high definition, cinematic lighting. {prompt}",
+                "seconds": self.seconds,
+                "size": self.size,
+            }
+            print(f"[SORA {tag}] Requesting clip: {prompt[:50]}...")
+            _trace(tag, f"Submit: {prompt[:80]}")
+            with timed(LLM_SECONDS, LLM_ERRORS, span_name="llm.openai.sora_submit", provider="openai",
+                       operation="sora_submit"):
+                res = await http.post(self.base_url, json=payload, headers=self._headers)
+                if res.status_code != 200:
+                    raise RuntimeError(f"submit returned {res.status_code}: {res.text[:200]}")
+            video_id = res.json().get("id")
+            if not video_id:
+                raise RuntimeError("submit response had no id")
+            _trace(tag, f"Task ID: {video_id}")
+
+            data = await self._poll(http, video_id, tag)
+            url = _find_video_url(data) or f"{self.base_url}/{video_id}/content"
+            await self._download(http, url, path, tag)
+            print(f"[SORA {tag}] Clip ready in {time.time() - start:.1f}s")
+            _trace(tag, f"Done in {time.time() - start:.1f}s")
+            return path
+
+    async def _poll(self, http, video_id, tag):
+        deadline = time.time() + self.timeout
+        delay = self.poll_initial
+        while time.time() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, self.poll_max)
+            res = await http.get(f"{self.base_url}/{video_id}", headers=self._headers)
+            if res.status_code != 200:
+                _trace(tag, f"Poll error {res.status_code}: {res.text[:200]}")
+                continue
+            data = res.json()
+            status = data.get("status")
+            if status == "completed":
+                return data
+            if status == "failed":
+                raise RuntimeError(f"generation failed: {str(data)[:200]}")
+            # Poll sooner once the job reports it is nearly done.
+            progress = data.get("progress")
+            if isinstance(progress, (int, float)) and progress >= 80:
+                delay = self.poll_initial
+        raise TimeoutError(f"clip {video_id} not ready after {self.timeout:.0f}s")
+
+    async def _download(self, http, url, path, tag):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        received = 0
+        # Security: only send the API key to the API itself, never to a CDN/redirect host.
+        headers = self._headers if urlparse(url).netloc == urlparse(self.base_url).netloc else {}
+        try:
+            async with http.stream("GET", url, headers=headers, follow_redirects=True,
+                                   timeout=httpx.Timeout(60.0)) as res:
+                res.raise_for_status()
+                declared = int(res.headers.get("content-length") or 0)
+                if declared > self.max_bytes:
+                    raise ValueError(f"clip exceeds size limit ({declared} > {self.max_bytes} bytes)")
+                with open(tmp_path, "wb") as f:
+                    async for chunk in res.aiter_bytes(65536):
+                        received += len(chunk)
+                        if received > self.max_bytes:
+                            raise ValueError(f"clip exceeded size limit ({self.max_bytes} bytes)")
+                        f.write(chunk)
+            os.replace(tmp_path, path)
+            _trace(tag, f"Downloaded {received} bytes")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def generate_many_sync(self, prompts):
+        """Blocking wrapper for callers on worker threads (the video pipeline)."""
+        return asyncio.run(self.generate_many(prompts))
+
+
+def prune_sora_cache(cache_dir=SORA_CACHE_DIR, max_bytes=SORA_CACHE_MAX_BYTES,
+                     max_age_days=SORA_CACHE_MAX_AGE_DAYS):
+    """Evicts clips unused for ``max_age_days``, then least recently used ones until the cache fits ``max_bytes``.
+
+    Stale partial downloads are swept too. Returns the number of files removed.
+    """
+    try:
+        names = os.listdir(cache_dir)
+    except FileNotFoundError:
+        return 0
+    now = time.time()
+    removed = 0
+    entries = []
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if name.endswith(".part"):
+            stale = now - st.st_mtime > PART_MAX_AGE_SECONDS
+        else:
+            stale = now - st.st_mtime > max_age_days * 86400
+        if stale:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+            continue
+        if not name.endswith(".part"):
+            entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,244 @@
+import os
+import re
+import time
+import wave
+import hashlib
+import threading
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+
+from monitoring.metrics import timed_llm_call
+from monitoring.tracing import propagate
+
+TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", os.path.join("cache", "tts"))
+TTS_CONCURRENCY = int(os.environ.get("TTS_CONCURRENCY", "4"))
+# OpenAI's speech endpoint caps input at 4096 chars; small chunks parallelize
+# better and are far more likely to be shared between scripts.
+CHUNK_CHARS = int(os.environ.get("TTS_CHUNK_CHARS", "280"))
+# Chunk cache size budget; catalog GC evicts the least recently used chunks beyond it.
+TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_BYTES", str(200 * 1024 ** 2)))
+# Temp writes older than this were left by a crash mid-write.
+TTS_TMP_MAX_AGE_SECONDS = 3600
+
+# OpenAI "pcm" responses are raw 24kHz 16-bit mono samples.
+PCM_RATE = 24000
+PCM_WIDTH = 2
+PCM_CHANNELS = 1
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+
+class OpenAIEngine:
+    """OpenAI TTS returning raw PCM so chunks can be joined sample-exactly."""
+    name = "openai-tts-1"
+    ext = "pcm"
+
+    def __init__(self, client, voice="nova", model="tts-1"):
+        self.client = client
+        self.voice = voice
+        self.model = model
+
+    def synthesize(self, text):
+        response = timed_llm_call(
+            "openai", "tts", self.client.audio.speech.create,
+            model=self.model, voice=self.voice, input=text[:4096], response_format="pcm",
+        )
+        return response.content
+
+
+class GTTSEngine:
+    """gTTS fallback. gTTS only produces MP3, which we join frame-wise."""
+    name = "gtts"
+    ext = "mp3"
+
+    def __init__(self, voice="en"):
+        self.voice = voice
+
+    def synthesize(self, text):
+        from gtts import gTTS
+        buf = BytesIO()
+        gTTS(text=text, lang=self.voice).write_to_fp(buf)
+        return buf.getvalue()
+
+
+def split_sentences(text, max_chars=CHUNK_CHARS):
+    """Group sentences into chunks of at most ``max_chars``.
+
+    Grouping is deterministic, so the same script always yields the same
+    chunks (and therefore the same cache keys). A single sentence longer than
+    the limit is split on whitespace.
+    """
+    chunks = []
+    current = ""
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_cache_path(engine, text, cache_dir=TTS_CACHE_DIR):
+    digest = hashlib.sha256(f"{engine.name}\x00{engine.voice}\x00{text}".encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{digest}.{engine.ext}")
+
+
+def _strip_id3(data):
+    """Drops a leading ID3v2 tag so MP3 chunks can be concatenated frame-wise."""
+    if len(data) > 10 and data[:3] == b"ID3":
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        return data[10 + size:]
+    return data
+
+
+def stitch(engine, parts, output_base):
+    """Joins chunk audio without re-encoding. Returns the written path."""
+    if engine.ext == "pcm":
+        path = f"{output_base}.wav"
+        with wave.open(path, "wb") as w:
+            w.setnchannels(PCM_CHANNELS)
+            w.setsampwidth(PCM_WIDTH)
+            w.setframerate(PCM_RATE)
+            for part in parts:
+                w.writeframes(part)
+        return path
+    path = f"{output_base}.{engine.ext}"
+    with open(path, "wb") as f:
+        for i, part in enumerate(parts):
+            f.write(part if i == 0 else _strip_id3(part))
+    return path
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _read_cached(path):
+    """Cached chunk bytes, or None; a hit refreshes the mtime that cache eviction goes by."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return data
+
+
+def _synthesize_chunk(engine, text, cache_dir):
+    """Returns ``(audio_bytes, cache_hit, synth_seconds)`` for one chunk."""
+    path = chunk_cache_path(engine, text, cache_dir)
+    data = _read_cached(path)
+    if data is not None:
+        return data, True, 0.0
+
+    # Collapse concurrent requests for the same chunk (e.g. a repeated
+    # phrase within one script) into a single API call.
+    with _inflight_lock:
+        lock = _inflight.setdefault(path, threading.Lock())
+    try:
+        with lock:
+            data = _read_cached(path)
+            if data is not None:
+                return data, True, 0.0
+            start = time.time()
+            data = engine.synthesize(text)
+            elapsed = time.time() - start
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+    finally:
+        # Also on failure, so a chunk whose synthesis raised doesn't pin its lock forever.
+        with _inflight_lock:
+            _inflight.pop(path, None)
+    return data, False, elapsed
+
+
+def prune_tts_cache(cache_dir=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+    """Evicts least recently used chunks until the cache fits ``max_bytes``; sweeps stale temp files.
+
+    Returns the number of files removed.
+    """
+    try:
+        names = os.listdir(cache_dir)
+    except FileNotFoundError:
+        return 0
+    now = time.time()
+    removed = 0
+    entries = []
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if name.endswith(".tmp"):
+            if now - st.st_mtime > TTS_TMP_MAX_AGE_SECONDS:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def synthesize_speech(engine, text, output_base, cache_dir=TTS_CACHE_DIR, max_workers=TTS_CONCURRENCY,
+                      max_chars=CHUNK_CHARS):
+    """Synthesizes ``text`` chunk-by-chunk in parallel and stitches the result.
+
+    Returns ``(audio_path, stats)``. ``stats["synth_seconds"]`` is the summed
+    per-chunk API time, a rough stand-in for what a single serial call would
+    have cost; compare it with ``stats["wall_seconds"]``.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    chunks = split_sentences(text, max_chars=max_chars) or [text.strip() or "."]
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="tts") as pool:
+        results = list(pool.map(propagate(lambda c: _synthesize_chunk(engine, c, cache_dir)), chunks))
+    path = stitch(engine, [data for data, _, _ in results], output_base)
+    stats = {
+        "chunks": len(chunks),
+        "cached": sum(1 for _, hit, _ in results if hit),
+        "synth_seconds": round(sum(secs for _, _, secs in results), 3),
+        "wall_seconds": round(time.time() - start, 3),
+    }
+    print(f"[TTS] {engine.name}: {stats['chunks']} chunks ({stats['cached']} cached) "
+          f"in {stats['wall_seconds']}s wall / {stats['synth_seconds']}s synth")
+    return path, stats
@@ -0,0 +1,206 @@
+import os
+import re
+import json
+import glob
+import hashlib
+import time
+import shutil
+import threading
+
+MEDIA_MAX_BYTES = int(os.environ.get("MEDIA_MAX_BYTES", str(2 * 1024 ** 3)))
+
+
+def _file_sha256(path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class VideoCache:
+    """Content-addressed store for finished lesson videos.
+
+    A video's filename embeds a hash of everything that determines its
+    content (title, input text, screenshot bytes, presenter persona, TTS
+    engine and encoder settings), so an identical request is a single
+    ``os.path.exists`` away from its answer. Renders in flight are tracked by
+    key so concurrent identical requests attach to the same job.
+
+    The media directory is kept under ``max_bytes`` by evicting the least
+    recently used videos, previews and HLS stream directories. A cache hit
+    and serving the file from /media (``touch``) both bump its mtime.
+    """
+
+    def __init__(self, media_dir="media", max_bytes=MEDIA_MAX_BYTES):
+        self.media_dir = media_dir
+        self.max_bytes = max_bytes
+        self._inflight = {}
+        self._hashes = {}
+        self._lock = threading.Lock()
+        self._total_cache = None
+        self._touched = {}
+
+    def screenshot_hash(self, path):
+        """sha256 of a screenshot's bytes, memoized on (path, size, mtime)."""
+        st = os.stat(path)
+        sig = (path, st.st_size, st.st_mtime_ns)
+        digest = self._hashes.get(sig)
+        if digest is None:
+            digest = _file_sha256(path)
+            self._hashes[sig] = digest
+        return digest
+
+    def key_for(self, title, text, screenshots, persona_version, encoder_settings, tts_engine, broll=None):
+        """Content hash of a render's inputs; ``broll`` is the b-roll configuration (None when it is off)."""
+        h = hashlib.sha256()
+        parts = {
+            "title": title,
+            "text": text,
+            "screenshots": [self.screenshot_hash(p) for p in screenshots],
+            "persona": persona_version,
+            "encoder": encoder_settings,
+            "tts": tts_engine,
+        }
+        # Only present when b-roll is on, so keys of renders without it are unchanged.
+        if broll:
+            parts["broll"] = broll
+        h.update(json.dumps(parts, sort_keys=True).encode("utf-8"))
+        return h.hexdigest()
+
+    def filename_for(self, title, key):
+        # Security: sanitize title for use in filename — strip non-alphanumeric
+        # chars; the content hash suffix prevents collisions.
+        safe_slug = re.sub(r'[^a-zA-Z0-9_-]', '_', title)[:40]
+        return f"video_{safe_slug}_{key[:20]}.mp4"
+
+    def lookup(self, filename):
+        """Returns True if the finished video exists, marking it recently used."""
+        path = os.path.join(self.media_dir, filename)
+        if not os.path.isfile(path):
+            return False
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True
+
+    def touch(self, rel_path, interval=60.0):
+        """Marks a served /media file as recently used; at most one utime per file per ``interval``.
+
+        ``rel_path`` is relative to media_dir. Only evictable entries are
+        touched: ``video_*.mp4`` files and the playlist of an HLS stream.
+        """
+        parts = rel_path.replace("\\", "/").split("/")
+        if len(parts) == 1 and parts[0].startswith("video_") and parts[0].endswith(".mp4"):
+            path = os.path.join(self.media_dir, parts[0])
+        elif len(parts) == 3 and parts[0] == "hls":
+            path = os.path.join(self.media_dir, "hls", parts[1], "index.m3u8")
+        else:
+            return
+        now = time.monotonic()
+        if now - self._touched.get(path, -interval) < interval:
+            return
+        self._touched[path] = now
+        try:
+            os.utime(path)
+        except OSError:
+            self._touched.pop(path, None)
+
+    def claim(self, key, job_id):
+        """Registers ``job_id`` as the render for ``key``.
+
+        Returns the job_id already rendering this key, or None if the caller
+        now owns the render.
+        """
+        with self._lock:
+            existing = self._inflight.get(key)
+            if existing:
+                return existing
+            self._inflight[key] = job_id
+            return None
+
+    def release(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _live_tags(self):
+        """Key prefixes (as used in file names) of renders still in flight."""
+        with self._lock:
+            return {f"_{key[:20]}" for key in self._inflight}
+
+    def _entries(self):
+        """Yields (mtime, size, path) for every evictable video and HLS stream dir.
+
+        Previews and HLS stream dirs of renders still in flight are skipped;
+        ffmpeg may still be writing to them.
+        """
+        live = self._live_tags()
+
+        def is_live(path):
+            return any(tag in os.path.basename(path) for tag in live)
+
+        for path in glob.glob(os.path.join(self.media_dir, "video_*.mp4")):
+            if ".partial" in path or is_live(path):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            yield st.st_mtime, st.st_size, path
+        for path in glob.glob(os.path.join(self.media_dir, "hls", "*")):
+            if not os.path.isdir(path) or is_live(path):
+                continue
+            size, mtime = 0, 0.0
+            for name in os.listdir(path):
+                try:
+                    st = os.stat(os.path.join(path, name))
+                except OSError:
+                    continue
+                size += st.st_size
+                mtime = max(mtime, st.st_mtime)
+            yield mtime, size, path
+
+    def total_bytes(self, max_age=15.0):
+        """Size of everything under media_dir; recomputed at most every ``max_age`` seconds."""
+        now = time.monotonic()
+        cached = self._total_cache
+        if cached and now - cached[0] < max_age:
+            return cached[1]
+        total = 0
+        for root, _, files in os.walk(self.media_dir):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    continue
+        self._total_cache = (now, total)
+        return total
+
+    def evict(self):
+        """Deletes least recently used videos until the directory fits ``max_bytes``."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        # Non-video files (presenter images, in-flight renders) count toward the
+        # budget but are never evicted. Live HLS dirs and previews are left out
+        # of _entries, so they are neither counted nor evicted.
+        for path in glob.glob(os.path.join(self.media_dir, "*")):
+            if os.path.isfile(path) and not (os.path.basename(path).startswith("video_") and ".partial" not in path):
+                total += os.path.getsize(path)
+
+        removed = []
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+                total -= size
+                removed.append(os.path.basename(path))
+            except OSError:
+                continue
+        if removed:
+            print(f"[MEDIA] Evicted {len(removed)} videos, media dir now {total / 1e6:.1f} MB")
+        return removed
@@ -1,6 +1,9 @@
 import os
-import glob
-from gtts import gTTS
+import time
+import shutil
+import subprocess
+import threading
+from functools import lru_cache
 from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips, CompositeVideoClip, TextClip, vfx, VideoFileClip
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageOps
 import textwrap
@@ -9,10 +12,29 @@ from dotenv import load_dotenv
 import requests
 from io import BytesIO
 
+import proglog
 import numpy as np # Needed for array manipulation in moviepy usually, but Pillow handles most.
 
+from media.pipeline import StageGraph
+from media.slide_dedup import SlidePruner, thumbnail
+from media.tts import OpenAIEngine, GTTSEngine, synthesize_speech
+from storage.catalog import get_catalog
+from media.sora import SoraClipService
+from monitoring.metrics import timed_llm_call, VIDEO_STAGE_SECONDS
+from monitoring.tracing import current_span
+
 load_dotenv()
 
+# Bump PERSONA_VERSION to regenerate the presenter; both it and the encoder
+# settings feed the content hash used to dedup finished videos.
+PERSONA_VERSION = "female_v1"
+ENCODER_SETTINGS = {
+    "codec": "libx264",
+    "audio_codec": "aac",
+    "fps": 24,
+    "preset": "ultrafast",
+}
+
 def download_image(url, save_path):
     # Security: enforce timeout and size cap to prevent DoS from slow/huge responses
     MAX_BYTES = 20 * 1024 * 1024  # 20 MB
@@ -33,7 +55,8 @@ def generate_ai_presenter(client, output_path):
     """Generates a professional AI instructor image using DALL-E 3."""
     try:
         print("Generating AI Presenter with DALL-E 3...")
-        response = client.images.generate(
+        response = timed_llm_call(
+            "openai", "image", client.images.generate,
             model="dall-e-3",
             prompt="A professional, friendly tech instructor looking directly at the camera, studio lighting, blurred modern office background, high quality, photorealistic, 4k, head and shoulders shot",
             size="1024x1024",
@@ -46,18 +69,30 @@ def generate_ai_presenter(client, output_path):
         print(f"DALL-E Generation failed: {e}")
         return None
 
+@lru_cache(maxsize=8)
+def load_font(size):
+    """Loads (once per size) the slide font, falling back to Pillow's default."""
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except IOError:
+        return ImageFont.load_default()
+
+@lru_cache(maxsize=4)
+def _title_background(size):
+    img = Image.new('RGB', size, color=(30, 30, 30))
+    d = ImageDraw.Draw(img)
+    # Simple gradient
+    for y in range(size[1]):
+        r = int(20 + y/20)
+        d.rectangle([(0, y), (size[0], y+1)], fill=(r, 30, 50))
+    return img
+
 def create_text_slide(text, size=(1280, 720), bg_color=(45, 55, 72), text_color=(255, 255, 255), title=None):
     """Generates a colorful slide with text using Pillow."""
     img = Image.new('RGB', size, color=bg_color)
     d = ImageDraw.Draw(img)
-    
-    # Try to load a font
-    try:
-        title_font = ImageFont.truetype("arial.ttf", 72)
-        body_font = ImageFont.truetype("arial.ttf", 48)
-    except IOError:
-        title_font = ImageFont.load_default()
-        body_font = ImageFont.load_default()
+    title_font = load_font(72)
+    body_font = load_font(48)
 
     y_offset = 100
     if title:
@@ -79,19 +114,11 @@ def create_text_slide(text, size=(1280, 720), bg_color=(45, 55, 72), text_color=
 
 def create_title_slide(title, size=(1280, 720)):
     """Creates a title slide."""
-    img = Image.new('RGB', size, color=(30, 30, 30))
+    # The gradient background is identical for every lesson; draw it once.
+    img = _title_background(tuple(size)).copy()
     d = ImageDraw.Draw(img)
-    
-    # Simple gradient
-    for y in range(size[1]):
-        r = int(20 + y/20)
-        d.rectangle([(0, y), (size[0], y+1)], fill=(r, 30, 50))
-    
-    try:
-        font = ImageFont.truetype("arial.ttf", 80)
-    except:
-        font = ImageFont.load_default()
-        
+    font = load_font(80)
+
     lines = textwrap.wrap(title, width=20)
     y = (size[1] - len(lines)*100)/2
     for line in lines:
@@ -101,14 +128,50 @@ def create_title_slide(title, size=(1280, 720)):
     
     return img
 
-def get_screenshots(limit=5):
-    """Return the most recently captured screenshots, newest first."""
-    screenshot_dir = os.path.join(os.path.dirname(__file__), "..", "scraped_data")
-    if not os.path.exists(screenshot_dir):
-        return []
-    screenshots = glob.glob(os.path.join(screenshot_dir, "screenshot_*.png"))
-    screenshots.sort(key=os.path.getmtime, reverse=True)
-    return screenshots[:limit]
+def get_screenshots(limit=5, course=None):
+    """Return the most recently captured screenshots for ``course``, newest first.
+
+    Backed by the screenshot catalog (an indexed SQLite lookup) rather than
+    globbing and stat-ing scraped_data/ on every render.
+    """
+    records = get_catalog().screenshots_for(course, limit=limit)
+    return [r["path"] for r in records if os.path.exists(r["path"])]
+
+
+def _reduce_decode(img, target_w):
+    """Ask the decoder for a smaller image where the format supports it.
+
+    JPEG can decode directly at 1/2, 1/4 or 1/8 scale (never below the
+    requested size); other formats ignore this and decode at full size.
+    """
+    if img.format == "JPEG" and img.width > target_w:
+        scale = target_w / img.width
+        img.draft("RGB", (target_w, max(1, int(img.height * scale))))
+    return img
+
+
+def plan_slices(src_w, src_h, size=(1280, 720), max_slides=5):
+    """Compute viewport-sized source regions for a full-page screenshot.
+
+    Returns a list of ``(left, top, right, bottom)`` boxes in *source* pixels,
+    each of which maps onto one canvas-sized slide, or None when the page is
+    too short to be worth slicing. Nothing is decoded or resampled here.
+    """
+    canvas_w, canvas_h = size
+    scale = canvas_w / src_w
+    new_h = max(1, int(round(src_h * scale)))
+    if new_h <= int(canvas_h * 1.3):
+        return None
+
+    region_h = canvas_h / scale
+    coverage = new_h / canvas_h
+    n_slides = min(max_slides, max(2, int(round(coverage))))
+    max_start = src_h - region_h
+    boxes = []
+    for i in range(n_slides):
+        y = (max_start * i) / (n_slides - 1) if n_slides > 1 else 0
+        boxes.append((0, y, src_w, y + region_h))
+    return boxes
 
 
 def fit_to_canvas(img, size=(1280, 720), bg_color=(15, 15, 20)):
@@ -118,6 +181,7 @@ def fit_to_canvas(img, size=(1280, 720), bg_color=(15, 15, 20)):
     We scale by width to preserve aspect; if the scaled image is still taller
     than the canvas we crop to the top viewport (the most informative region).
     Images shorter than the canvas get letterboxed on a dark background.
+    Only the source region that ends up on the canvas is resampled.
     """
     canvas_w, canvas_h = size
     src_w, src_h = img.size
@@ -127,50 +191,59 @@ def fit_to_canvas(img, size=(1280, 720), bg_color=(15, 15, 20)):
     scale = canvas_w / src_w
     new_w = canvas_w
     new_h = max(1, int(round(src_h * scale)))
-    scaled = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
 
     if new_h >= canvas_h:
         # Crop to top viewport — that's what a human sees first on a webpage.
-        scaled = scaled.crop((0, 0, canvas_w, canvas_h))
-        return scaled.convert("RGB")
+        box = (0, 0, src_w, min(src_h, canvas_h / scale))
+        return img.resize(size, Image.Resampling.LANCZOS, box=box, reducing_gap=3.0).convert("RGB")
 
+    scaled = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
     canvas = Image.new("RGB", size, color=bg_color)
     y_offset = (canvas_h - new_h) // 2
     canvas.paste(scaled.convert("RGB"), (0, y_offset))
     return canvas
 
 
-def split_tall_screenshot(img, size=(1280, 720), max_slides=5, bg_color=(15, 15, 20)):
+def split_tall_screenshot(img, size=(1280, 720), max_slides=5, bg_color=(15, 15, 20),
+                          pruner=None):
     """Slice a full-page screenshot into a series of viewport-sized slides.
 
     A one-minute video over a single static frame feels dead; full-page
     screenshots are usually tall enough to show several distinct sections
-    (hero, features, pricing, footer, etc). We scale by width, then sample
-    evenly-spaced crops down the page so the video "walks" through the page.
-    Short screenshots fall back to a single fit_to_canvas slide.
+    (hero, features, pricing, footer, etc). We sample evenly-spaced regions
+    down the page so the video "walks" through it. Short screenshots fall
+    back to a single fit_to_canvas slide.
+
+    Regions are planned in source coordinates first and each is resampled
+    straight to the canvas size, so the full page is never scaled (PNGs
+    are still decoded at full size; only JPEG can decode smaller). A ``pruner``
+    (SlidePruner) sees a thumbnail of each region first, and blank or
+    near-duplicate regions are never resampled.
     """
     canvas_w, canvas_h = size
-    src_w, src_h = img.size
-    if src_w == 0 or src_h == 0:
+    if img.width == 0 or img.height == 0:
         return [Image.new("RGB", size, color=bg_color)]
 
-    scale = canvas_w / src_w
-    new_w = canvas_w
-    new_h = max(1, int(round(src_h * scale)))
-
-    # Not tall enough to benefit from slicing — keep the simpler path.
-    if new_h <= int(canvas_h * 1.3):
-        return [fit_to_canvas(img, size=size, bg_color=bg_color)]
+    img = _reduce_decode(img, canvas_w)
 
-    scaled = img.resize((new_w, new_h), Image.Resampling.LANCZOS).convert("RGB")
-    coverage = new_h / canvas_h
-    n_slides = min(max_slides, max(2, int(round(coverage))))
+    boxes = plan_slices(img.width, img.height, size=size, max_slides=max_slides)
+    if pruner is not None:
+        keep = pruner.select([thumbnail(img, box) for box in boxes or [None]])
+        if boxes is None and not keep[0]:
+            return []
+        boxes = [box for box, k in zip(boxes, keep) if k] if boxes is not None else None
 
-    slides = []
-    max_start = new_h - canvas_h
-    for i in range(n_slides):
-        y = int(round((max_start * i) / (n_slides - 1))) if n_slides > 1 else 0
-        slides.append(scaled.crop((0, y, canvas_w, y + canvas_h)))
+    start = time.perf_counter()
+    # Not tall enough to benefit from slicing — keep the simpler path.
+    if boxes is None:
+        slides = [fit_to_canvas(img, size=size, bg_color=bg_color)]
+    else:
+        slides = [
+            img.resize(size, Image.Resampling.LANCZOS, box=box, reducing_gap=3.0).convert("RGB")
+            for box in boxes
+        ]
+    if pruner is not None:
+        pruner.build_seconds += time.perf_counter() - start
     return slides
 
 def clean_text_for_tts(text):
@@ -183,12 +256,12 @@ def clean_text_for_tts(text):
 def get_ai_presenter(client):
     """Generates a consistent AI Presenter image if it doesn't exist locally.
 
-    The filenames include "_female_v1" so that bumping the persona (gender,
+    The filenames include PERSONA_VERSION so that bumping the persona (gender,
     style, etc) invalidates the cache automatically without requiring a
     manual file delete on every host.
     """
-    presenter_path = "media/presenter_persona_female_v1.png"
-    circular_path = "media/presenter_bubble_female_v1.png"
+    presenter_path = f"media/presenter_persona_{PERSONA_VERSION}.png"
+    circular_path = f"media/presenter_bubble_{PERSONA_VERSION}.png"
     if os.path.exists(circular_path):
         return circular_path
 
@@ -202,7 +275,8 @@ def get_ai_presenter(client):
             "high-quality photorealistic portrait, wearing business casual, "
             "neutral studio background, looking into camera with a slight smile."
         )
-        response = client.images.generate(
+        response = timed_llm_call(
+            "openai", "image", client.images.generate,
             model="dall-e-3",
             prompt=prompt,
             size="1024x1024",
@@ -237,6 +311,15 @@ def get_ai_presenter(client):
         print(f"Failed to generate persona: {e}")
         return None
 
+@lru_cache(maxsize=4)
+def _scaled_bubble(presenter_path, mtime, canvas_h):
+    """Presenter bubble resized for the canvas; cached since every slide reuses it."""
+    bubble = Image.open(presenter_path).convert("RGBA")
+    target_h = int(canvas_h * 0.25)
+    scale = target_h / bubble.height
+    target_w = max(1, int(bubble.width * scale))
+    return bubble.resize((target_w, target_h), Image.Resampling.LANCZOS)
+
 def paste_presenter(slide_img, presenter_path, canvas_size=(1280, 720), padding=30):
     """Bakes the circular AI presenter onto a PIL slide.
 
@@ -248,11 +331,8 @@ def paste_presenter(slide_img, presenter_path, canvas_size=(1280, 720), padding=
         return slide_img
     try:
         canvas_w, canvas_h = canvas_size
-        bubble = Image.open(presenter_path).convert("RGBA")
-        target_h = int(canvas_h * 0.25)
-        scale = target_h / bubble.height
-        target_w = max(1, int(bubble.width * scale))
-        bubble = bubble.resize((target_w, target_h), Image.Resampling.LANCZOS)
+        bubble = _scaled_bubble(presenter_path, os.path.getmtime(presenter_path), canvas_h)
+        target_w, target_h = bubble.size
 
         base = slide_img if slide_img.mode == "RGBA" else slide_img.convert("RGBA")
         x = canvas_w - target_w - padding
@@ -282,7 +362,8 @@ def generate_engaging_script(client, title, raw_text):
     """Rewrites content into a punchy narration script."""
     try:
         print("Rewriting script for high energy...")
-        response = client.chat.completions.create(
+        response = timed_llm_call(
+            "openai", "script", client.chat.completions.create,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a video scriptwriter for a tech education channel. Rewrite the provided text into a punchy, clear spoken script. Keep it under 150 words. Do NOT include visual directions like [Curtain Up]. Just the spoken text."},
@@ -295,103 +376,247 @@ def generate_engaging_script(client, title, raw_text):
         return raw_text
 
 def generate_sora_clip(client, prompt, output_path):
-    """Generates a 4-8s video clip using OpenAI Sora v2."""
-    import time
-    import requests
-    
-    API_URL = "https://api.openai.com/v1/videos"
-    headers = {
-        "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
-        "Content-Type": "application/json"
-    }
-    
+    """Generates a 4-8s video clip using OpenAI Sora v2.
+
+    Thin blocking wrapper over SoraClipService (async submit/poll/download
+    with a prompt-hash cache); prefer generate_many() for several clips.
+    """
+    path = SoraClipService().generate_many_sync([prompt])[0]
+    if not path:
+        return None
+    shutil.copyfile(path, output_path)
+    return output_path
+
+# Optional b-roll: number of Sora clips to cut in after the title slide (0 = off).
+BROLL_CLIPS = int(os.environ.get("VIDEO_BROLL_CLIPS", "0"))
+BROLL_TIMEOUT = float(os.environ.get("VIDEO_BROLL_TIMEOUT", "180"))
+BROLL_CLIP_SECONDS = 4
+BROLL_SHOTS = (
+    "Establishing shot of a bright modern office where a team works on laptops, related to {title}",
+    "Close-up of hands using a laptop trackpad, screen glow, topic: {title}",
+    "Slow dolly shot across a desk with a notebook and coffee while someone learns about {title}",
+)
+
+# Part of the video cache key: toggling b-roll must not reuse renders made without it.
+BROLL_SETTINGS = {"clips": BROLL_CLIPS, "clip_seconds": BROLL_CLIP_SECONDS, "shots": BROLL_SHOTS} if BROLL_CLIPS else None
+
+def broll_prompts(title, count=BROLL_CLIPS):
+    return [BROLL_SHOTS[i % len(BROLL_SHOTS)].format(title=title[:120]) for i in range(count)]
+
+HLS_PLAYLIST = "index.m3u8"
+HLS_SEGMENT_SECONDS = 4
+PREVIEW_WIDTH = 640
+PREVIEW_FPS = 12
+
+class EncodeProgressLogger(proglog.ProgressBarLogger):
+    """proglog logger that reports moviepy's frame loop as whole percents."""
+
+    def __init__(self, on_percent):
+        super().__init__()
+        # Not "callback": proglog already uses that attribute for messages.
+        self.on_percent = on_percent
+        self._last = -1
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        if bar != "t" or attr != "index":
+            return
+        total = self.bars[bar].get("total") or 0
+        if not total:
+            return
+        percent = min(100, int(100 * (value + 1) / total))
+        if percent != self._last:
+            self._last = percent
+            self.on_percent(percent)
+
+def run_ffmpeg(args):
+    """Runs the ffmpeg binary moviepy is configured with."""
+    from moviepy.config import get_setting
+    cmd = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error"] + args
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {proc.stderr.decode(errors='replace')[-500:]}")
+
+def encode_aac(audio_path, aac_path):
+    """Encodes the narration to AAC once so every video encode can stream-copy it."""
+    run_ffmpeg(["-i", audio_path, "-vn", "-c:a", "aac", "-b:a", "128k", aac_path])
+    return aac_path
+
+def write_preview(clip, aac_path, preview_path):
+    """Quick low-res render: ffmpeg downscales, half the frame rate, high CRF."""
+    clip.write_videofile(
+        preview_path, audio=aac_path, fps=PREVIEW_FPS, codec="libx264", preset="ultrafast", threads=2,
+        ffmpeg_params=["-vf", f"scale={PREVIEW_WIDTH}:-2", "-crf", "32", "-movflags", "+faststart"],
+        logger=None,
+    )
+    return preview_path
+
+def write_hls(clip, aac_path, stream_dir, on_first_segment=None, logger=None, threads=4):
+    """Encodes ``clip`` as an event-type fMP4 HLS playlist in ``stream_dir``.
+
+    ffmpeg appends each segment to the playlist as soon as it is closed, so a
+    watcher thread reports the playlist as playable once the first segment
+    lands while the rest of the encode continues.
+    """
+    os.makedirs(stream_dir, exist_ok=True)
+    playlist = os.path.join(stream_dir, HLS_PLAYLIST)
+    fps = ENCODER_SETTINGS["fps"]
+    gop = str(fps * 2)
+    done = threading.Event()
+    fired = []
+
+    def check():
+        try:
+            with open(playlist, "r", encoding="utf-8") as f:
+                if "#EXTINF" in f.read() and not fired:
+                    fired.append(True)
+                    on_first_segment(playlist)
+        except OSError:
+            pass
+        return bool(fired)
+
+    def watch():
+        while not done.wait(0.25):
+            if check():
+                return
+
+    watcher = None
+    if on_first_segment:
+        watcher = threading.Thread(target=watch, daemon=True)
+        watcher.start()
+    try:
+        clip.write_videofile(
+            playlist, audio=aac_path, threads=threads, logger=logger,
+            ffmpeg_params=[
+                "-g", gop, "-keyint_min", gop, "-sc_threshold", "0",
+                "-f", "hls", "-hls_time", str(HLS_SEGMENT_SECONDS), "-hls_playlist_type", "event",
+                "-hls_segment_type", "fmp4", "-hls_flags", "independent_segments",
+                "-hls_segment_filename", os.path.join(stream_dir, "seg_%03d.m4s"),
+            ],
+            **ENCODER_SETTINGS,
+        )
+    finally:
+        done.set()
+    if watcher:
+        watcher.join()
+        # Short renders can finish between polls; report the stream regardless.
+        check()
+    return playlist
+
+def remux_faststart(playlist, output_path):
+    """Joins HLS segments into a single faststart MP4 without re-encoding."""
+    run_ffmpeg(["-i", playlist, "-c", "copy", "-movflags", "+faststart", output_path])
+    return output_path
+
+def build_screenshot_slides(screenshots=None, size=(1280, 720), budget=5, pruner=None):
+    """Expand recent screenshots into viewport-sized PIL slides.
+
+    A tall full-page screenshot becomes several viewport-height slides so the
+    video "walks" down the page instead of sitting on a single static frame.
+    With a ``pruner`` blank and near-duplicate slices are dropped, across
+    screenshots too.
+    """
+    slide_images = []
+    if screenshots is None:
+        screenshots = get_screenshots()
+    # Share the 5-slide budget across however many screenshots we have
+    # so more screenshots -> fewer slices each, keeping total pace sane.
+    per_screenshot_cap = max(2, budget // max(1, len(screenshots)))
+    for s in screenshots:
+        try:
+            with Image.open(s) as raw:
+                slide_images.extend(split_tall_screenshot(
+                    raw, size=size, max_slides=per_screenshot_cap, pruner=pruner
+                ))
+        except Exception as e:
+            print(f"[VIDEO] Skipping unreadable screenshot {s}: {e}")
+    if pruner is not None and pruner.pruned:
+        print(f"[VIDEO] Pruned {pruner.duplicates} duplicate and {pruner.blank} blank slides "
+              f"({pruner.kept}/{pruner.candidates} kept)")
+    return slide_images
+
+def make_openai_client():
+    """OpenAI client for script, TTS and presenter, or None to use the free fallbacks."""
+    if not os.getenv("OPENAI_API_KEY"):
+        print("[VIDEO] No OPENAI_API_KEY found, using gTTS fallback")
+        return None
     try:
-        with open("sora_trace.log", "w") as log:
-            log.write(f"Starting Sora Request for: {prompt[:30]}...\n")
-            
-            print(f"REQUESTING SORA CLIP: {prompt[:50]}...")
-            # 1. Submit Generation Request
-            payload = {
-                "model": "sora-2",
-                "prompt": f"Realism style, high definition, cinematic lighting. {prompt}",
-                "seconds": "8", # Generate 8 second clips
-                "size": "1280x720"
-            }
-            
-            log.write(f"Payload: {payload}\n")
-            
-            response = requests.post(API_URL, headers=headers, json=payload)
-            log.write(f"Response Status: {response.status_code}\n")
-            
-            if response.status_code != 200:
-                print(f"Sora Request Failed: {response.text}")
-                log.write(f"Error Body: {response.text}\n")
-                return None
-                
-            video_id = response.json().get("id")
-            print(f"Sora Task ID: {video_id}. Polling for completion...")
-            log.write(f"Task ID: {video_id}\n")
-            
-            # 2. Poll for Completion
-            # Sora takes time, so we need to wait.
-            status = "queued"
-            video_url = None
-            
-            for i in range(30): # Wait up to 5 minutes (30 * 10s)
-                time.sleep(10)
-                status_res = requests.get(f"{API_URL}/{video_id}", headers=headers)
-                log.write(f"Poll {i}: {status_res.status_code} - ")
-                
-                if status_res.status_code == 200:
-                    data = status_res.json()
-                    status = data.get("status")
-                    log.write(f"Status: {status}\n")
-                    
-                    if status == "completed":
-                        log.write(f"COMPLETION DATA: {data}\n")
-                        video_url = data.get("video_url")
-                        
-                        if not video_url: video_url = data.get("url")
-                        if not video_url and 'result' in data: video_url = data['result'].get('url')
-                        
-                        # Handle OpenAI Standard 'data' list format
-                        if not video_url and 'data' in data:
-                             if isinstance(data['data'], list) and len(data['data']) > 0:
-                                 video_url = data['data'][0].get('url')
-                        
-                        log.write(f"Video URL found: {video_url}\n")
-                        break
-                    elif status == "failed":
-                        print("Sora Generation Failed.")
-                        log.write(f"FAILED. Error details: {data}\n")
-                        return None
-                else:
-                    log.write(f"Polling Error Body: {status_res.text}\n")
-            
-            if video_url:
-                print(f"Downloading Sora Clip from {video_url[:50]}...")
-                # 3. Download Video
-                v_res = requests.get(video_url)
-                with open(output_path, 'wb') as f:
-                    f.write(v_res.content)
-                log.write("Download complete.\n")
-                return output_path
-            else:
-                log.write("Timed out or no URL.\n")
-            
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        print("[VIDEO] OpenAI client initialized for premium audio + presenter")
+        return client
     except Exception as e:
-        print(f"Sora Error: {e}")
-        with open("sora_trace.log", "a") as log:
-             log.write(f"Exception: {e}\n")
+        print(f"[VIDEO] OpenAI client init failed: {e}")
         return None
-    return None
 
-def generate_simple_video(lesson_title, summary_text, output_path):
+class SharedAssets:
+    """Per-course inputs that are the same for every lesson video.
+
+    Prepared once by ``prepare_shared_assets`` and passed to each
+    ``generate_simple_video`` call of a batch, so lessons skip rebuilding the
+    OpenAI client, fetching the presenter and slicing/compositing screenshots.
+    ``slide_paths`` are the presenter-baked screenshot slides on disk; they
+    belong to the batch, not to any one render, and are removed by ``close``.
+    ``slide_report`` is the SlidePruner report for them.
+    """
+
+    def __init__(self, client, presenter, slide_paths, slide_report=None):
+        self.client = client
+        self.presenter = presenter
+        self.slide_paths = slide_paths
+        self.slide_report = slide_report
+
+    def close(self):
+        for p in self.slide_paths:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+def prepare_shared_assets(screenshots, work_prefix, size=(1280, 720)):
+    """Builds SharedAssets; slide PNGs are written as ``{work_prefix}_slide_{i}.png``."""
+    client = make_openai_client()
+    presenter = get_ai_presenter(client)
+    pruner = SlidePruner()
+    paths = []
+    slide_images = build_screenshot_slides(screenshots, size=size, pruner=pruner)
+    start = time.perf_counter()
+    for i, slide_img in enumerate(slide_images):
+        if presenter:
+            slide_img = paste_presenter(slide_img, presenter, canvas_size=size)
+        p = f"{work_prefix}_slide_{i}.png"
+        slide_img.save(p)
+        paths.append(p)
+    pruner.baked(time.perf_counter() - start, len(paths))
+    return SharedAssets(client, presenter, paths, pruner.report())
+
+def generate_simple_video(lesson_title, summary_text, output_path, on_stage=None, screenshots=None,
+                          preview_path=None, stream_dir=None, on_asset=None, on_progress=None,
+                          assets=None, encode_threads=4, on_slides=None):
     """
     Creates an AI-narrated slideshow video:
     1. AI script rewrite + TTS audio (OpenAI Shimmer or gTTS fallback)
     2. Title slide + screenshot slides + content slides
     3. Optional presenter overlay via DALL-E
+
+    The steps run as a StageGraph so that screenshot slicing, slide rendering
+    and presenter retrieval overlap with the script rewrite and TTS; only the
+    timeline (slide durations) waits on the audio. ``on_stage(name, record)``
+    is called on every stage transition with its start/end timestamps.
+    ``screenshots`` pins the screenshot files to use (defaults to the newest).
+
+    Progressive mode: with ``preview_path`` a low-res preview is encoded
+    before the full render, and with ``stream_dir`` the full render is
+    written as fMP4/HLS segments (then remuxed to ``output_path`` with
+    faststart). ``on_asset(kind, path)`` fires with "preview" when the preview
+    is written and "stream" as soon as the first HLS segment is playable.
+    ``on_progress(stage, percent)`` reports how far the final encode has got.
+
+    Batch mode: ``assets`` (SharedAssets) supplies the client, presenter and
+    screenshot slides prepared once for the whole course, and
+    ``encode_threads`` caps x264 threads so several encodes can share the CPU.
+
+    Blank and near-duplicate screenshot slices are pruned before they are
+    resampled and baked (media/slide_dedup.py); ``on_slides(report)`` gets the
+    counts and the estimated seconds saved once the slides are on disk.
     """
     print(f"[VIDEO] === Starting video generation ===")
     print(f"[VIDEO] Title: {lesson_title}")
@@ -399,138 +624,202 @@ def generate_simple_video(lesson_title, summary_text, output_path):
     print(f"[VIDEO] Text length: {len(summary_text)} chars")
 
     temp_files = []
-    audio_clip = None
-    final_video = None
-
-    client = None
-    if os.getenv("OPENAI_API_KEY"):
-        try:
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            print("[VIDEO] OpenAI client initialized for premium audio + presenter")
-        except Exception as e:
-            print(f"[VIDEO] OpenAI client init failed: {e}")
-            client = None
-    else:
-        print("[VIDEO] No OPENAI_API_KEY found, using gTTS fallback")
-
-    try:
-        # 1. GENERATE AUDIO
-        print("[VIDEO] Step 1: Generating audio...")
-        script_text = summary_text
-        if client:
-            print("[VIDEO] Rewriting script via GPT-4...")
-            script_text = generate_engaging_script(client, lesson_title, summary_text)
-            script_text = clean_text_for_tts(script_text)
-            print(f"[VIDEO] Script ready ({len(script_text)} chars)")
-
-            audio_path = output_path.replace(".mp4", ".mp3")
-            temp_files.append(audio_path)
-
-            print("[VIDEO] Generating TTS audio (Nova)...")
-            response = client.audio.speech.create(
-                model="tts-1", voice="nova", input=script_text[:4096]
-            )
-            response.stream_to_file(audio_path)
-            print(f"[VIDEO] TTS audio saved to {audio_path}")
-        else:
-            clean = clean_text_for_tts(summary_text)
-            audio_path = output_path.replace(".mp4", ".mp3")
-            temp_files.append(audio_path)
-            print("[VIDEO] Generating gTTS audio...")
-            tts = gTTS(text=clean, lang='en')
-            tts.save(audio_path)
-            print(f"[VIDEO] gTTS audio saved to {audio_path}")
-
+    clips = {}
+    pruner = SlidePruner()
+
+    def stage_hook(name, record):
+        if record.get("status") == "done" and record.get("duration") is not None:
+            VIDEO_STAGE_SECONDS.observe(record["duration"], stage=name)
+        if on_stage:
+            on_stage(name, record)
+
+    def stage_client():
+        if assets:
+            return assets.client
+        return make_openai_client()
+
+    def stage_script(client):
+        if not client:
+            return clean_text_for_tts(summary_text)
+        print("[VIDEO] Rewriting script via GPT-4...")
+        script_text = generate_engaging_script(client, lesson_title, summary_text)
+        script_text = clean_text_for_tts(script_text)
+        print(f"[VIDEO] Script ready ({len(script_text)} chars)")
+        return script_text
+
+    def stage_audio(client, script):
+        # Sentence-chunked, parallel, cached synthesis (see media/tts.py).
+        engine = OpenAIEngine(client, voice="nova") if client else GTTSEngine()
+        print(f"[VIDEO] Generating TTS audio ({engine.name})...")
+        audio_path, stats = synthesize_speech(engine, script, output_path[:-len(".mp4")])
+        temp_files.append(audio_path)
+        print(f"[VIDEO] TTS audio saved to {audio_path}")
         audio_clip = AudioFileClip(audio_path)
-        total_duration = audio_clip.duration
-        print(f"[VIDEO] Audio duration: {total_duration:.1f}s")
+        clips["audio"] = audio_clip
+        print(f"[VIDEO] Audio duration: {audio_clip.duration:.1f}s")
+        return audio_clip
 
-        # 2. OPTIONAL PRESENTER OVERLAY
-        print("[VIDEO] Step 2: Getting AI presenter...")
+    def stage_presenter(client):
+        if assets:
+            return assets.presenter
         presenter_bubble = get_ai_presenter(client)
         print(f"[VIDEO] Presenter: {'ready' if presenter_bubble else 'skipped'}")
+        return presenter_bubble
 
-        # 3. BUILD VISUAL SLIDES
-        print("[VIDEO] Step 3: Building visual slides...")
-        visual_clips = []
-        remaining_time = total_duration
-
-        # A. Title slide (3 seconds, no presenter bubble)
-        title_img = create_title_slide(lesson_title)
+    def stage_title():
+        # Title slide is shown for 3 seconds without the presenter bubble.
         title_p = output_path.replace(".mp4", "_title.png")
-        title_img.save(title_p)
+        create_title_slide(lesson_title).save(title_p)
         temp_files.append(title_p)
-        title_dur = min(3, remaining_time)
-        visual_clips.append(ImageClip(title_p).set_duration(title_dur))
-        remaining_time -= title_dur
-
-        # B. Expand assets into PIL slides. A tall full-page screenshot
-        # becomes several viewport-height slides so the video "walks"
-        # down the page instead of sitting on a single static frame.
-        slide_images = []
-        screenshots = get_screenshots()
-        # Share the 5-slide budget across however many screenshots we have
-        # so more screenshots -> fewer slices each, keeping total pace sane.
-        per_screenshot_cap = max(2, 5 // max(1, len(screenshots)))
-        for s in screenshots:
-            try:
-                with Image.open(s) as raw:
-                    slide_images.extend(split_tall_screenshot(
-                        raw, size=(1280, 720), max_slides=per_screenshot_cap
-                    ))
-            except Exception as e:
-                print(f"[VIDEO] Skipping unreadable screenshot {s}: {e}")
+        return title_p
 
+    def stage_screenshots():
+        if assets and len(assets.slide_paths) >= 2:
+            return None  # stage_slides reuses the batch's slides
+        slide_images = build_screenshot_slides(screenshots, size=(1280, 720), pruner=pruner)
         if len(slide_images) < 2:
             slide_images.append(create_text_slide(summary_text[:300], title=lesson_title))
-
         if not slide_images:
             slide_images.append(create_text_slide(lesson_title, title=lesson_title))
+        return slide_images
+
+    def stage_slides(screenshots, presenter):
+        # Bake the presenter bubble into each slide once (PIL) rather than
+        # overlaying a CompositeVideoClip during encoding. Slide PNGs don't
+        # depend on timing, so they're written while TTS is still running.
+        if screenshots is None:
+            report_slides(assets.slide_report)
+            return list(assets.slide_paths)
+        paths = []
+        start = time.perf_counter()
+        for i, slide_img in enumerate(screenshots):
+            if presenter:
+                slide_img = paste_presenter(slide_img, presenter, canvas_size=(1280, 720))
+            temp_p = output_path.replace(".mp4", f"_slide_{i}.png")
+            slide_img.save(temp_p)
+            temp_files.append(temp_p)
+            paths.append(temp_p)
+        pruner.baked(time.perf_counter() - start, len(paths))
+        report_slides(pruner.report())
+        return paths
+
+    def report_slides(report):
+        if not report:
+            return
+        s = current_span()
+        if s is not None:
+            s.set(slides_pruned=report["pruned"], slides_saved_seconds=report["saved_seconds"])
+        if on_slides:
+            on_slides(report)
+
+    def stage_broll():
+        # Clips are generated concurrently and cached by prompt; any that fail
+        # or miss the time budget are simply left out of the video.
+        service = SoraClipService(timeout=BROLL_TIMEOUT)
+        if not service.api_key:
+            return []
+        paths = service.generate_many_sync(broll_prompts(lesson_title))
+        return [p for p in paths if p]
+
+    def stage_timeline(audio, title, slides, broll=()):
+        total_duration = audio.duration
+        remaining_time = total_duration
+        title_dur = min(3, remaining_time)
+        visual_clips = [ImageClip(title).set_duration(title_dur)]
+        remaining_time -= title_dur
 
-        # C. Distribute remaining time evenly across all slides.
-        slide_duration = remaining_time / max(len(slide_images), 1)
+        for clip_p in broll:
+            if remaining_time <= BROLL_CLIP_SECONDS:
+                break
+            clip = VideoFileClip(clip_p, audio=False)
+            clips.setdefault("broll", []).append(clip)
+            # Chain concatenation needs every clip at canvas size.
+            if tuple(clip.size) != (1280, 720):
+                continue
+            dur = min(BROLL_CLIP_SECONDS, clip.duration)
+            visual_clips.append(clip.subclip(0, dur))
+            remaining_time -= dur
 
-        for i, slide_img in enumerate(slide_images):
+        # Distribute remaining time evenly across all slides.
+        slide_duration = remaining_time / max(len(slides), 1)
+        for slide_p in slides:
             if remaining_time <= 0:
                 break
-
             dur = min(slide_duration, remaining_time)
-
-            # Bake the presenter bubble into the slide once (PIL) rather than
-            # overlaying a CompositeVideoClip during encoding.
-            if presenter_bubble:
-                slide_img = paste_presenter(slide_img, presenter_bubble, canvas_size=(1280, 720))
-
-            temp_p = output_path.replace(".mp4", f"_slide_{i}.png")
-            slide_img.save(temp_p)
-            temp_files.append(temp_p)
-            visual_clips.append(ImageClip(temp_p).set_duration(dur))
+            visual_clips.append(ImageClip(slide_p).set_duration(dur))
             remaining_time -= dur
 
-        # 4. COMPOSE FINAL VIDEO — method="chain" is much faster than "compose"
-        # when all clips share the same size, which is the case after fit_to_canvas.
-        print(f"[VIDEO] Step 4: Composing final video ({len(visual_clips)} clips)...")
+        # method="chain" is much faster than "compose" when all clips share
+        # the same size, which is the case after fit_to_canvas.
+        print(f"[VIDEO] Composing final video ({len(visual_clips)} clips)...")
         main_video = concatenate_videoclips(visual_clips, method="chain")
-
         if main_video.duration < total_duration:
             main_video = main_video.set_duration(total_duration)
         else:
             main_video = main_video.subclip(0, total_duration)
 
-        final_video = main_video.set_audio(audio_clip)
-        final_video.fps = 24
-
-        print(f"[VIDEO] Writing video to {output_path}...")
-        final_video.write_videofile(
-            output_path,
-            codec="libx264",
-            audio_codec="aac",
-            fps=24,
-            preset='ultrafast',
-            threads=4
-        )
-        print(f"[VIDEO] === Video generation complete ===")
+        # Audio is muxed in from the pre-encoded AAC track (see stage_aac),
+        # so the timeline stays video-only. Its b-roll readers are stateful
+        # ffmpeg subprocesses, so only one encode may pull frames at a time.
+        main_video.fps = ENCODER_SETTINGS["fps"]
+        clips["final"] = main_video
+        return main_video
+
+    def stage_aac(audio):
+        aac_path = output_path[:-len(".mp4")] + "_audio.m4a"
+        temp_files.append(aac_path)
+        encode_aac(audio.filename, aac_path)
+        return aac_path
+
+    def stage_preview(timeline, aac):
+        print(f"[VIDEO] Writing low-res preview to {preview_path}...")
+        write_preview(timeline, aac, preview_path)
+        if on_asset:
+            on_asset("preview", preview_path)
+        return preview_path
+
+    def stage_encode(timeline, aac, preview=None):
+        logger = EncodeProgressLogger(lambda p: on_progress("encode", p)) if on_progress else None
+        if stream_dir:
+            print(f"[VIDEO] Writing HLS segments to {stream_dir}...")
+            write_hls(timeline, aac, stream_dir,
+                      on_first_segment=(lambda p: on_asset("stream", p)) if on_asset else None,
+                      logger=logger, threads=encode_threads)
+            remux_faststart(os.path.join(stream_dir, HLS_PLAYLIST), output_path)
+        else:
+            print(f"[VIDEO] Writing video to {output_path}...")
+            timeline.write_videofile(
+                output_path, audio=aac, threads=encode_threads,
+                ffmpeg_params=["-movflags", "+faststart"], logger=logger, **ENCODER_SETTINGS
+            )
+        return output_path
+
+    graph = StageGraph(max_workers=4, on_stage=stage_hook)
+    graph.add("client", stage_client)
+    graph.add("script", stage_script, deps=("client",))
+    graph.add("audio", stage_audio, deps=("client", "script"))
+    graph.add("presenter", stage_presenter, deps=("client",))
+    graph.add("title", stage_title)
+    graph.add("screenshots", stage_screenshots)
+    graph.add("slides", stage_slides, deps=("screenshots", "presenter"))
+    timeline_deps = ("audio", "title", "slides")
+    if BROLL_CLIPS:
+        graph.add("broll", stage_broll)
+        timeline_deps += ("broll",)
+    graph.add("timeline", stage_timeline, deps=timeline_deps)
+    graph.add("aac", stage_aac, deps=("audio",))
+    encode_deps = ("timeline", "aac")
+    if preview_path:
+        # The preview and the full encode share the timeline's clips, so the
+        # cheap preview goes first and the full encode follows it.
+        graph.add("preview", stage_preview, deps=("timeline", "aac"))
+        encode_deps += ("preview",)
+    graph.add("encode", stage_encode, deps=encode_deps)
 
+    try:
+        graph.run()
+        print(f"[VIDEO] Critical path: {' -> '.join(graph.critical_path())}")
+        print(f"[VIDEO] === Video generation complete ===")
     except Exception as e:
         print(f"[VIDEO] ERROR: {e}")
         import traceback
@@ -538,10 +827,12 @@ def generate_simple_video(lesson_title, summary_text, output_path):
         raise
     finally:
         try:
-            if final_video:
-                final_video.close()
-            if audio_clip:
-                audio_clip.close()
+            if clips.get("final"):
+                clips["final"].close()
+            if clips.get("audio"):
+                clips["audio"].close()
+            for clip in clips.get("broll", []):
+                clip.close()
         except:
             pass
         for f in temp_files:
@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from collections import deque
+
+LOOP_LAG_INTERVAL = 0.05
+LOOP_STALL_THRESHOLD_MS = float(os.environ.get("LOOP_STALL_THRESHOLD_MS", "100"))
+SAMPLE_WINDOW = 2048
+STALL_HISTORY = 50
+STACK_DEPTH = 8
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+class LoopLagMonitor:
+    """Measures event-loop scheduling delay and attributes stalls.
+
+    A task on the loop sleeps ``interval`` seconds at a time; how late each
+    wake-up is gives the lag sample. A watchdog thread watches the task's
+    heartbeat, and once it is more than ``threshold_ms`` overdue it snapshots
+    the loop thread's stack, so the blocking handler and line are known even
+    while the stall is still in progress. ``handlers`` maps endpoint code
+    objects to a route label ("POST /api/browser/scrape") for attribution.
+    """
+
+    def __init__(self, interval=LOOP_LAG_INTERVAL, threshold_ms=LOOP_STALL_THRESHOLD_MS):
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+        self.stalls = deque(maxlen=STALL_HISTORY)
+        self.stall_count = 0
+        self.handlers = {}
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id = None
+        self._pending = None
+        self._lock = threading.Lock()
+        self._task = None
+        self._stop = threading.Event()
+
+    def register_routes(self, routes):
+        for route in routes:
+            endpoint = getattr(route, "endpoint", None)
+            code = getattr(endpoint, "__code__", None)
+            if code is not None:
+                methods = ",".join(sorted(getattr(route, "methods", None) or []))
+                self.handlers[code] = f"{methods} {route.path}".strip()
+
+    def start(self):
+        """Starts sampling on the running loop; call from the loop (app startup)."""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+
+    async def _sample(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag_ms = max(0.0, (now - start - self.interval) * 1000)
+            self.samples.append(lag_ms)
+            if lag_ms >= self.threshold_ms:
+                self._finish_stall(lag_ms)
+            elif self._pending is not None:
+                # The watchdog fired on a delay that ended up under the threshold.
+                with self._lock:
+                    self._pending = None
+
+    def _watch(self):
+        period = max(0.01, self.threshold_ms / 2000)
+        while not self._stop.wait(period):
+            overdue_ms = (time.monotonic() - self._heartbeat - self.interval) * 1000
+            with self._lock:
+                if overdue_ms < self.threshold_ms or self._pending is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is None:
+                    continue
+                self._pending = self._attribute(frame)
+
+    def _attribute(self, frame):
+        handler = None
+        f = frame
+        while f is not None:
+            handler = self.handlers.get(f.f_code)
+            if handler:
+                break
+            f = f.f_back
+        stack = [f"{os.path.basename(s.filename)}:{s.lineno} {s.name}"
+                 for s in traceback.extract_stack(frame)[-STACK_DEPTH:]]
+        return {"handler": handler or "unknown", "stack": stack, "at": time.time()}
+
+    def _finish_stall(self, lag_ms):
+        with self._lock:
+            stall = self._pending or {"handler": "unknown", "stack": [], "at": time.time()}
+            self._pending = None
+        stall["lag_ms"] = round(lag_ms, 1)
+        self.stalls.append(stall)
+        self.stall_count += 1
+        where = stall["stack"][-1] if stall["stack"] else "?"
+        print(f"[LOOP] Event loop stalled {lag_ms:.0f}ms in {stall['handler']} at {where}")
+
+    def snapshot(self):
+        values = sorted(self.samples)
+        return {
+            "lag_ms": {
+                "p50": round(percentile(values, 50), 2),
+                "p95": round(percentile(values, 95), 2),
+                "p99": round(percentile(values, 99), 2),
+                "max": round(values[-1], 2) if values else 0.0,
+            },
+            "samples": len(values),
+            "threshold_ms": self.threshold_ms,
+            "stall_count": self.stall_count,
+            "recent_stalls": list(self.stalls)[-10:],
+        }
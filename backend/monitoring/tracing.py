@@ -0,0 +1,296 @@
+import os
+import json
+import time
+import queue
+import secrets
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+# "" keeps spans in memory only (GET /api/traces/...); "jsonl" appends them to
+# TRACE_FILE; "otel" prints them to stdout shaped like OpenTelemetry's console exporter.
+TRACE_EXPORT = os.environ.get("TRACE_EXPORT", "").lower()
+TRACE_FILE = os.environ.get("TRACE_FILE", "traces.jsonl")
+TRACE_BUFFER = 5000
+COURSE_TRACES = 1000
+
+_current = contextvars.ContextVar("trace_span", default=None)
+
+
+def new_trace_id():
+    return secrets.token_hex(16)
+
+
+def new_span_id():
+    return secrets.token_hex(8)
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end", "attributes", "status", "error")
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None, start=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = new_span_id()
+        self.parent_id = parent_id
+        self.start = start if start is not None else time.time()
+        self.end = None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id, "name": self.name,
+            "start": self.start, "end": self.end,
+            "duration_ms": round((self.end - self.start) * 1000, 2) if self.end else None,
+            "status": self.status, "error": self.error, "attributes": self.attributes,
+        }
+
+    def traceparent(self):
+        """W3C trace context header value for this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+def _iso(ts):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(ts)) + f".{int(ts % 1 * 1e6):06d}Z"
+
+
+def otel_dict(span):
+    """A finished span in the shape of OpenTelemetry's ConsoleSpanExporter output."""
+    return {
+        "name": span.name,
+        "context": {"trace_id": "0x" + span.trace_id, "span_id": "0x" + span.span_id, "trace_state": "[]"},
+        "kind": "SpanKind.INTERNAL",
+        "parent_id": "0x" + span.parent_id if span.parent_id else None,
+        "start_time": _iso(span.start),
+        "end_time": _iso(span.end),
+        "status": {"status_code": "ERROR" if span.status == "error" else "OK",
+                   **({"description": span.error} if span.error else {})},
+        "attributes": span.attributes,
+        "events": [],
+        "links": [],
+        "resource": {"attributes": {"service.name": "training-hub-backend"}, "schema_url": ""},
+    }
+
+
+class Tracer:
+    """Collects finished spans in a bounded buffer and hands them to the exporter.
+
+    Exporting runs on its own thread so a span ending on the event loop
+    never waits on file or console I/O.
+    """
+
+    def __init__(self, export=TRACE_EXPORT, path=TRACE_FILE):
+        self.export = export
+        self.path = path
+        self.spans = deque(maxlen=TRACE_BUFFER)
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._writer = None
+        # course key -> trace ID, so separate HTTP calls for one course share a trace
+        self._courses = OrderedDict()
+
+    def finish(self, span):
+        with self._lock:
+            self.spans.append(span)
+        if self.export in ("jsonl", "otel"):
+            if self._writer is None:
+                with self._lock:
+                    if self._writer is None:
+                        self._writer = threading.Thread(target=self._write_loop, name="trace-export", daemon=True)
+                        self._writer.start()
+            self._queue.put(span)
+
+    def _write_loop(self):
+        while True:
+            span = self._queue.get()
+            try:
+                if self.export == "otel":
+                    print(json.dumps(otel_dict(span)), flush=True)
+                else:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(span.to_dict()) + "\n")
+            except Exception as e:
+                print(f"[TRACE] Export failed: {e}")
+
+    def trace(self, trace_id):
+        with self._lock:
+            return [s for s in self.spans if s.trace_id == trace_id]
+
+    def bind_course(self, key, trace_id):
+        with self._lock:
+            self._courses[key] = trace_id
+            self._courses.move_to_end(key)
+            while len(self._courses) > COURSE_TRACES:
+                self._courses.popitem(last=False)
+
+    def course_trace(self, key):
+        with self._lock:
+            return self._courses.get(key)
+
+
+tracer = Tracer()
+
+
+def current_span():
+    return _current.get()
+
+
+@contextmanager
+def span(name, parent=None, trace_id=None, **attributes):
+    """Times the block as a child of ``parent`` (default: the current span).
+
+    With no parent and no ``trace_id`` a new trace is started.
+    """
+    parent = parent if parent is not None else _current.get()
+    if trace_id is None:
+        trace_id = parent.trace_id if parent else new_trace_id()
+    s = Span(name, trace_id, parent.span_id if parent else None, attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.status = "error"
+        s.error = f"{type(e).__name__}: {str(e)[:200]}"
+        raise
+    finally:
+        _current.reset(token)
+        s.end = time.time()
+        tracer.finish(s)
+
+
+def mark_error(e):
+    """Marks the current span failed, for errors that are handled rather than raised."""
+    s = _current.get()
+    if s is not None:
+        s.status = "error"
+        s.error = f"{type(e).__name__}: {str(e)[:200]}"
+
+
+def propagate(fn):
+    """Wraps ``fn`` to run in the caller's trace context, for thread pools and queues.
+
+    Thread pools don't carry contextvars over; the context is captured now
+    and each call runs in its own copy of it (one Context can't be entered by
+    two threads at once).
+    """
+    ctx = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def parse_traceparent(value):
+    """(trace_id, parent span_id) from a W3C traceparent header, or None if malformed."""
+    parts = (value or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32:
+        return None
+    return parts[1].lower(), parts[2].lower()
+
+
+def begin_trace(key):
+    """Starts a new trace for ``key`` (a course build) at the current request span.
+
+    The request span is moved to a fresh trace ID unless the client sent its
+    own traceparent, which then becomes the course's trace.
+    """
+    s = _current.get()
+    if s is None:
+        return None
+    if not s.attributes.get("remote_parent"):
+        s.trace_id = new_trace_id()
+    tracer.bind_course(key, s.trace_id)
+    return s.trace_id
+
+
+def continue_trace(key, bind=None):
+    """Joins the current request span to ``key``'s trace (or starts one), optionally binding it to ``bind`` too."""
+    s = _current.get()
+    if s is None:
+        return None
+    trace_id = tracer.course_trace(key)
+    if trace_id is None:
+        trace_id = begin_trace(key)
+    elif not s.attributes.get("remote_parent"):
+        s.trace_id = trace_id
+    if bind:
+        tracer.bind_course(bind, s.trace_id)
+    return s.trace_id
+
+
+def summarize(spans):
+    """Spans of one trace ordered by start, with the wall time and total time per span name."""
+    spans = sorted(spans, key=lambda s: s.start)
+    if not spans:
+        return None
+    end = max(s.end or s.start for s in spans)
+    by_name = {}
+    for s in spans:
+        if s.end:
+            by_name[s.name] = round(by_name.get(s.name, 0) + (s.end - s.start) * 1000, 2)
+    return {
+        "trace_id": spans[0].trace_id,
+        "wall_ms": round((end - spans[0].start) * 1000, 2),
+        "span_count": len(spans),
+        "by_name_ms": dict(sorted(by_name.items(), key=lambda kv: kv[1], reverse=True)),
+        "spans": [s.to_dict() for s in spans],
+    }
+
+
+class TracingMiddleware:
+    """Opens a span per HTTP request, named after the route template once routing is done.
+
+    Honours an incoming ``traceparent`` and returns ``traceparent`` and
+    ``X-Trace-Id`` on the response. Paths in ``skip`` (health checks,
+    metrics, polling) aren't traced.
+    """
+
+    def __init__(self, app, skip=()):
+        self.app = app
+        self.skip = tuple(skip)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.skip):
+            await self.app(scope, receive, send)
+            return
+        remote = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                remote = parse_traceparent(value.decode("latin-1"))
+                break
+        method = scope.get("method", "")
+        with span(f"{method} {scope['path']}", trace_id=remote[0] if remote else None,
+                  method=method, path=scope["path"]) as s:
+            if remote:
+                s.parent_id = remote[1]
+                s.attributes["remote_parent"] = True
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    s.attributes["status"] = message["status"]
+                    if message["status"] >= 500:
+                        s.status = "error"
+                    headers = list(message.get("headers", []))
+                    headers += [(b"traceparent", s.traceparent().encode()), (b"x-trace-id", s.trace_id.encode())]
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if getattr(route, "path", None):
+                    s.name = f"{method} {route.path}"
@@ -4,6 +4,8 @@ import json
 import os
 import time
 
+from scraper.elements import collect_elements
+
 async def refresh_snapshot():
     print("Launching browser for manual refresh...")
     async with async_playwright() as p:
@@ -26,36 +28,8 @@ async def refresh_snapshot():
         print(f"Capturing full-page screenshot to {filepath}...")
         await page.screenshot(path=filepath, full_page=True)
         
-        # Extract elements matching backend logic
-        interactive_elements = []
-        selectors = ["a", "button", "input[type='button']", "input[type='submit']"]
-        
-        # Simple extraction logic mirroring the backend
-        for selector in selectors:
-            elements = await page.query_selector_all(selector)
-            for el in elements:
-                try:
-                    if not await el.is_visible():
-                        continue
-                    box = await el.bounding_box()
-                    if not box:
-                        continue
-                    
-                    # Get text
-                    text = await el.inner_text()
-                    if not text:
-                        text = await el.get_attribute("value") or await el.get_attribute("placeholder") or "unnamed"
-                    
-                    interactive_elements.append({
-                        "text": text.strip(),
-                        "type": selector,
-                        "x": box["x"],
-                        "y": box["y"], # These are relative to the top of the page, which works with full_page screenshot
-                        "width": box["width"],
-                        "height": box["height"]
-                    })
-                except:
-                    continue
+        # Same element collection as the backend extractor
+        interactive_elements = await collect_elements(page)
 
         data = {
             "title": await page.title(),
@@ -63,7 +37,7 @@ async def refresh_snapshot():
             "text_content": "Manual Refresh Content",
             "screenshot": f"scraped_data/{filename}", # Relative path for frontend
             "viewport": {"width": 1280, "height": 720},
-            "interactive_elements": interactive_elements[:100]
+            "interactive_elements": interactive_elements
         }
         
         with open(os.path.join("scraped_data", "latest_scrape.json"), "w") as f:
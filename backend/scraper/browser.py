@@ -1,5 +1,31 @@
 from playwright.async_api import async_playwright
 import asyncio
+import os
+
+from monitoring.metrics import timed, BROWSER_SECONDS, BROWSER_ERRORS
+
+# Device profiles for multi-viewport scrapes; "desktop" is the main page's
+# context. The scale factor stays 1 so screenshot pixels and element boxes
+# share one coordinate space on every device.
+DEVICE_PROFILES = {
+    "desktop": {
+        "viewport": {"width": 1280, "height": 720},
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    },
+    "tablet": {
+        "viewport": {"width": 820, "height": 1180},
+        "user_agent": "Mozilla/5.0 (iPad; CPU OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Mobile/15E148 Safari/604.1",
+        "is_mobile": True,
+        "has_touch": True,
+    },
+    "mobile": {
+        "viewport": {"width": 390, "height": 844},
+        "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Mobile/15E148 Safari/604.1",
+        "is_mobile": True,
+        "has_touch": True,
+    },
+}
+PRIMARY_DEVICE = "desktop"
 
 class BrowserManager:
     def __init__(self):
@@ -7,6 +33,7 @@ class BrowserManager:
         self.browser = None
         self.context = None
         self.page = None
+        self.auth_state_path = None
 
     @property
     def is_ready(self) -> bool:
@@ -15,27 +42,39 @@ class BrowserManager:
     async def launch(self, headless=False, auth_state_path=None):
         """Launches the browser instance. Cleans up partial state on failure."""
         try:
-            self.playwright = await async_playwright().start()
-            self.browser = await self.playwright.chromium.launch(headless=headless)
-
-            context_args = {
-                'viewport': {'width': 1280, 'height': 720},
-                'user_agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            }
-
-            if auth_state_path:
-                import os
-                if os.path.exists(auth_state_path):
-                    context_args['storage_state'] = auth_state_path
-                    print(f"Loading auth state from {auth_state_path}")
-
-            self.context = await self.browser.new_context(**context_args)
-            self.page = await self.context.new_page()
-            return self.page
+            with timed(BROWSER_SECONDS, BROWSER_ERRORS, span_name="browser.launch", operation="launch"):
+                return await self._launch(headless, auth_state_path)
         except Exception:
             await self.close()
             raise
 
+    async def _launch(self, headless, auth_state_path):
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(headless=headless)
+
+        self.auth_state_path = auth_state_path
+        self.context = await self.browser.new_context(**self._context_args(PRIMARY_DEVICE))
+        self.page = await self.context.new_page()
+        return self.page
+
+    def _context_args(self, device):
+        context_args = dict(DEVICE_PROFILES[device], device_scale_factor=1)
+        if self.auth_state_path and os.path.exists(self.auth_state_path):
+            context_args['storage_state'] = self.auth_state_path
+            print(f"Loading auth state from {self.auth_state_path}")
+        return context_args
+
+    async def new_device_page(self, device):
+        """A page in a new context of the running browser emulating ``device``.
+
+        Contexts are cheap and isolated, so several devices can load the same
+        URL at once. The caller closes it with ``page.context.close()``.
+        """
+        if self.browser is None:
+            raise RuntimeError("Browser not started")
+        context = await self.browser.new_context(**self._context_args(device))
+        return await context.new_page()
+
     async def close(self):
         """Cleans up resources. Always resets attrs so a failed launch can be retried cleanly."""
         try:
@@ -57,3 +96,4 @@ class BrowserManager:
         self.context = None
         self.browser = None
         self.playwright = None
+        self.auth_state_path = None
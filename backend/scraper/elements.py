@@ -0,0 +1,214 @@
+import os
+import math
+import functools
+from array import array
+
+from jobs.offload import offload
+from storage.scrape_pack import ScrapePack, fresh_pack_path
+from storage.workspace import artifacts
+
+# Safety cap for pathological pages; real pages stay far below it.
+ELEMENTS_MAX = int(os.environ.get("ELEMENTS_MAX", "20000"))
+GRID_CELL = 256
+# Two boxes overlapping this much (intersection over union) with the same
+# label are one target, e.g. an <a> wrapping a <button>.
+DUPLICATE_IOU = 0.9
+
+SELECTORS = ["a", "button", "input[type='button']", "input[type='submit']"]
+
+# One round trip for the whole page instead of five per element. Boxes are in
+# page coordinates (scroll offset added) so they line up with the full-page
+# screenshot; "visible" matches Playwright's is_visible (non-empty box, not
+# visibility:hidden).
+COLLECT_JS = """
+([selectors, limit]) => {
+    const out = [];
+    const sx = window.scrollX, sy = window.scrollY;
+    for (const selector of selectors) {
+        for (const el of document.querySelectorAll(selector)) {
+            if (out.length >= limit) return out;
+            const r = el.getBoundingClientRect();
+            if (!r.width || !r.height) continue;
+            if (getComputedStyle(el).visibility === "hidden") continue;
+            const text = (el.innerText || "").trim() || el.getAttribute("value")
+                || el.getAttribute("placeholder") || "unnamed";
+            out.push([text, selector, r.x + sx, r.y + sy, r.width, r.height]);
+        }
+    }
+    return out;
+}
+"""
+
+
+async def collect_elements(page, limit=ELEMENTS_MAX):
+    """Visible interactive elements of ``page`` as scrape dicts, duplicates collapsed."""
+    rows = await page.evaluate(COLLECT_JS, [SELECTORS, limit])
+    elements = [{"text": text, "type": kind, "x": x, "y": y, "width": w, "height": h}
+                for text, kind, x, y, w, h in rows]
+    # A few ms per thousand elements; kept off the event loop for huge pages.
+    return await offload(collapse_duplicates, elements)
+
+
+def _iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = min(ax + aw, bx + bw) - max(ax, bx)
+    ih = min(ay + ah, by + bh) - max(ay, by)
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / (aw * ah + bw * bh - inter)
+
+
+def _same_label(a, b):
+    a, b = a.strip().lower(), b.strip().lower()
+    return a == b or "unnamed" in (a, b)
+
+
+class ElementIndex:
+    """Interactive elements in flat arrays with a uniform grid over their boxes.
+
+    Boxes live in one float32 array (x, y, w, h per element); the grid maps
+    each ``cell`` x ``cell`` square to the IDs of the boxes touching it. A
+    viewport query visits only the cells it covers and a point query one
+    cell, so both cost the elements nearby rather than a scan of the page.
+    """
+
+    def __init__(self, cell=GRID_CELL):
+        self.cell = cell
+        self.boxes = array("f")
+        self.texts = []
+        self.types = []
+        self._grid = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    @classmethod
+    def from_elements(cls, elements, dedupe=True, cell=GRID_CELL):
+        index = cls(cell)
+        for el in elements:
+            try:
+                box = (float(el["x"]), float(el["y"]), float(el["width"]), float(el["height"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if box[2] <= 0 or box[3] <= 0:
+                continue
+            if dedupe and index._duplicate_of(box, el.get("text") or "") is not None:
+                continue
+            index.add(el.get("text") or "unnamed", el.get("type") or "", box)
+        return index
+
+    @classmethod
+    def from_columns(cls, xs, ys, widths, heights, texts, types, cell=GRID_CELL):
+        """Index over already-deduplicated columns, as stored in a scrape pack."""
+        index = cls(cell)
+        for box, text, kind in zip(zip(xs, ys, widths, heights), texts, types):
+            index.add(text, kind, box)
+        return index
+
+    def add(self, text, kind, box):
+        i = len(self.texts)
+        self.texts.append(text)
+        self.types.append(kind)
+        self.boxes.extend(box)
+        for key in self._cells(*box):
+            self._grid.setdefault(key, array("I")).append(i)
+        return i
+
+    def _cells(self, x, y, w, h):
+        c = self.cell
+        for cx in range(math.floor(x / c), math.floor((x + w) / c) + 1):
+            for cy in range(math.floor(y / c), math.floor((y + h) / c) + 1):
+                yield cx, cy
+
+    def box(self, i):
+        return tuple(self.boxes[4 * i:4 * i + 4])
+
+    def _duplicate_of(self, box, text):
+        # A box overlapping this much covers the other's centre, so the
+        # centre's cell holds every candidate.
+        x, y, w, h = box
+        for i in self._grid.get((math.floor((x + w / 2) / self.cell), math.floor((y + h / 2) / self.cell)), ()):
+            if _iou(box, self.box(i)) >= DUPLICATE_IOU and _same_label(text, self.texts[i]):
+                return i
+        return None
+
+    def _candidates(self, x, y, w, h):
+        seen = set()
+        for key in self._cells(x, y, w, h):
+            for i in self._grid.get(key, ()):
+                if i not in seen:
+                    seen.add(i)
+                    yield i
+
+    def query(self, x, y, width, height):
+        """IDs of elements intersecting the rectangle, in reading order (top to bottom, left to right)."""
+        hits = []
+        for i in self._candidates(x, y, width, height):
+            bx, by, bw, bh = self.box(i)
+            if bx < x + width and bx + bw > x and by < y + height and by + bh > y:
+                hits.append(i)
+        hits.sort(key=lambda i: (self.boxes[4 * i + 1], self.boxes[4 * i]))
+        return hits
+
+    def at(self, x, y):
+        """ID of the element under the point, or None; the smallest box wins when they nest."""
+        best, best_area = None, None
+        for i in self._grid.get((math.floor(x / self.cell), math.floor(y / self.cell)), ()):
+            bx, by, bw, bh = self.box(i)
+            if bx <= x < bx + bw and by <= y < by + bh and (best is None or bw * bh < best_area):
+                best, best_area = i, bw * bh
+        return best
+
+    def element(self, i):
+        x, y, w, h = self.box(i)
+        return {"id": i, "text": self.texts[i], "type": self.types[i],
+                "x": round(x, 1), "y": round(y, 1), "width": round(w, 1), "height": round(h, 1)}
+
+    def elements(self, ids):
+        return [self.element(i) for i in ids]
+
+
+def collapse_duplicates(elements):
+    """``elements`` without the near-identical boxes of nested or repeated targets (first one wins)."""
+    index = ElementIndex()
+    kept = []
+    for el in elements:
+        box = (el["x"], el["y"], el["width"], el["height"])
+        if index._duplicate_of(box, el["text"]) is None:
+            index.add(el["text"], el["type"], box)
+            kept.append(el)
+    return kept
+
+
+def index_for_scrape(json_path, device=None):
+    """ElementIndex of a course's scrape, or None if there is none; built once per version of the file.
+
+    ``device`` picks an extra viewport from ``viewports`` (None is the main
+    desktop capture). Reads only the boxes and labels of a fresh scrape
+    pack, else the JSON.
+    """
+    source = fresh_pack_path(json_path) or json_path
+    try:
+        st = os.stat(source)
+    except FileNotFoundError:
+        return None
+    return _cached_index(source, device, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_index(source, device, *signature):
+    if source.endswith(".pack"):
+        with ScrapePack(source) as pack:
+            if device is None:
+                return ElementIndex.from_columns(*pack.boxes(), *pack.labels())
+            data = pack.meta()
+    else:
+        entry = artifacts.get(source)
+        data = entry.data if entry else {}
+    if device is not None:
+        data = (data.get("viewports") or {}).get(device)
+        if data is None:
+            return None
+    return ElementIndex.from_elements(data.get("interactive_elements") or [], dedupe=False)
@@ -2,63 +2,105 @@ import asyncio
 import time
 import os
 
+from jobs.offload import offload
+from monitoring.metrics import timed, BROWSER_SECONDS, BROWSER_ERRORS
+from scraper.elements import collect_elements
+
+# Time given to client-side rendering after load before the page is read.
+DYNAMIC_CONTENT_WAIT = 2
+
+def scrape_record(text, screenshot, elements):
+    """The saved scrape: ``extract_text``'s fields plus the screenshot path and elements."""
+    return {
+        "title": text["title"],
+        "url": text["url"],
+        "text_content": text["text_content"],
+        "screenshot": screenshot,
+        "viewport": text["viewport"],
+        "interactive_elements": elements,
+    }
+
+def visible_text(html):
+    """The page's text without scripts and styles, whitespace-collapsed."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.decompose()
+    return soup.get_text(separator=' ', strip=True)
+
 class ContentExtractor:
-    def __init__(self, output_dir="scraped_data"):
+    def __init__(self, output_dir="scraped_data", catalog=None):
         self.output_dir = output_dir
+        self.catalog = catalog
         os.makedirs(output_dir, exist_ok=True)
 
-    async def extract_page(self, page, screenshot=True):
-        """Detailed extraction of the current page including element coordinates."""
-        from bs4 import BeautifulSoup
-        
+    async def extract_page(self, page, screenshot=True, course=None, devices=(), browser=None):
+        """Detailed extraction of the current page including element coordinates.
+
+        ``course`` tags the screenshot in the catalog (defaults to the site's hostname).
+        ``devices`` (e.g. tablet, mobile) are captured at the same time in their
+        own contexts of ``browser`` and added under ``viewports``.
+        """
+        with timed(BROWSER_SECONDS, BROWSER_ERRORS, span_name="browser.extract", operation="extract"):
+            if not devices:
+                return await self._extract_page(page, screenshot, course)
+            data, *captures = await asyncio.gather(
+                self._extract_page(page, screenshot, course),
+                *(self._capture_device(browser, device, page.url, course) for device in devices))
+            data["viewports"] = {device: c for device, c in zip(devices, captures) if c is not None}
+            return data
+
+    async def _extract_page(self, page, screenshot, course):
         # Wait for dynamic content
-        await asyncio.sleep(2)
-        
+        await asyncio.sleep(DYNAMIC_CONTENT_WAIT)
+        text = await self.extract_text(page)
+        screenshot_path = await self.capture_screenshot(page, course, text["url"]) if screenshot else None
+        return scrape_record(text, screenshot_path, await self.extract_elements(page))
+
+    async def _capture_device(self, browser, device, url, course):
+        """Screenshot and elements of ``url`` as ``device`` sees it; None if that capture fails.
+
+        The text isn't re-read: it is the same page, so the primary capture's text is shared.
+        """
+        page = None
+        try:
+            page = await browser.new_device_page(device)
+            await page.goto(url, wait_until="networkidle", timeout=30000)
+            await asyncio.sleep(DYNAMIC_CONTENT_WAIT)
+            return {
+                "viewport": page.viewport_size,
+                "screenshot": await self.capture_screenshot(page, course, url, device=device),
+                "interactive_elements": await self.extract_elements(page),
+            }
+        except Exception as e:
+            print(f"[SCRAPE] {device} capture failed: {e}")
+            return None
+        finally:
+            if page is not None:
+                await page.context.close()
+
+    async def extract_text(self, page):
+        """Title, URL, viewport and visible text: all that course planning needs."""
         title = await page.title()
         url = page.url
         content = await page.content()
         viewport = page.viewport_size or {"width": 1280, "height": 720}
-        
-        soup = BeautifulSoup(content, 'html.parser')
-        for script in soup(["script", "style"]):
-            script.decompose()
-        text_content = soup.get_text(separator=' ', strip=True)
-        
-        screenshot_path = None
-        if screenshot:
-            filename = f"screenshot_{int(time.time())}.png"
-            screenshot_path = os.path.join(self.output_dir, filename)
-            await page.screenshot(path=screenshot_path, full_page=True)
+        # Parsing a large page takes tens of milliseconds; kept off the event loop
+        text_content = await offload(visible_text, content)
+        return {"title": title, "url": url, "text_content": text_content, "viewport": viewport}
 
-        # Extract interactive elements with coordinates
-        interactive_elements = []
-        selectors = ["a", "button", "input[type='button']", "input[type='submit']"]
-        for selector in selectors:
-            elements = await page.query_selector_all(selector)
-            for el in elements:
-                try:
-                    if not await el.is_visible():
-                        continue
-                    box = await el.bounding_box()
-                    if not box:
-                        continue
-                    text = (await el.inner_text()).strip() or await el.get_attribute("value") or await el.get_attribute("placeholder") or "unnamed"
-                    interactive_elements.append({
-                        "text": text,
-                        "type": selector,
-                        "x": box["x"],
-                        "y": box["y"],
-                        "width": box["width"],
-                        "height": box["height"]
-                    })
-                except:
-                    continue
+    async def capture_screenshot(self, page, course=None, url=None, device=None):
+        # Device captures run alongside the primary one, so they need their own names
+        filename = f"screenshot_{int(time.time())}{'_' + device if device else ''}.png"
+        screenshot_path = os.path.join(self.output_dir, filename)
+        await page.screenshot(path=screenshot_path, full_page=True)
+        if self.catalog:
+            # Hashes the PNG and commits to SQLite; kept off the event loop
+            await offload(self.catalog.record_screenshot, screenshot_path, course=course, url=url or page.url,
+                          device=device)
+        return screenshot_path
 
-        return {
-            "title": title,
-            "url": url,
-            "text_content": text_content,
-            "screenshot": screenshot_path,
-            "viewport": viewport,
-            "interactive_elements": interactive_elements[:100]
-        }
+    async def extract_elements(self, page):
+        # Every visible interactive element, read in one round trip
+        return await collect_elements(page)
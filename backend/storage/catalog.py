@@ -0,0 +1,225 @@
+import os
+import re
+import glob
+import time
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlparse
+
+from media.tts import prune_tts_cache
+from media.sora import prune_sora_cache
+
+SCRAPED_DIR = os.path.join(os.path.dirname(__file__), "..", "scraped_data")
+MEDIA_DIR = os.path.join(os.path.dirname(__file__), "..", "media")
+CATALOG_PATH = os.environ.get("CATALOG_PATH", os.path.join(SCRAPED_DIR, "catalog.db"))
+
+SCREENSHOT_RETENTION_DAYS = float(os.environ.get("SCREENSHOT_RETENTION_DAYS", "14"))
+SCREENSHOT_QUOTA_BYTES = int(os.environ.get("SCREENSHOT_QUOTA_BYTES", str(500 * 1024 ** 2)))
+# Render temp files (slides, audio, partial encodes) older than this are crash leftovers.
+TEMP_MAX_AGE_SECONDS = 3600
+
+_TEMP_PATTERNS = ("video_*_slide_*.png", "video_*_title.png", "video_*.partial*", "video_*_audio.m4a",
+                  "video_*.wav", "video_*.mp3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS screenshots (
+    path TEXT PRIMARY KEY,
+    course TEXT,
+    url TEXT,
+    captured_at REAL NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    bytes INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    device TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_screenshots_course ON screenshots (course, captured_at DESC);
+CREATE INDEX IF NOT EXISTS idx_screenshots_captured ON screenshots (captured_at);
+"""
+
+
+def course_key_for_url(url):
+    """Default course key for a scrape: the site's hostname."""
+    if not url:
+        return None
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else (host or None)
+
+
+def _image_size(path):
+    try:
+        from PIL import Image
+        with Image.open(path) as img:  # header-only read
+            return img.size
+    except Exception:
+        return None, None
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class MediaCatalog:
+    """SQLite index of captured screenshots.
+
+    Replaces glob-and-stat over ``scraped_data/``: each capture is recorded
+    once with its course, source URL, capture time, dimensions and content
+    hash, so render-time lookups are an indexed query regardless of how many
+    files have accumulated. ``gc()`` enforces age retention and a byte quota
+    on screenshots, keeps the TTS chunk cache within TTS_CACHE_MAX_BYTES and
+    sweeps render temp files left behind by crashes.
+    """
+
+    def __init__(self, db_path=CATALOG_PATH, screenshot_dir=SCRAPED_DIR, media_dir=MEDIA_DIR):
+        self.db_path = db_path
+        self.screenshot_dir = screenshot_dir
+        self.media_dir = media_dir
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            columns = {r[1] for r in self._conn.execute("PRAGMA table_info(screenshots)")}
+            if "device" not in columns:
+                # Catalogs from before multi-viewport scrapes: every row is a primary capture.
+                self._conn.execute("ALTER TABLE screenshots ADD COLUMN device TEXT")
+            empty = self._conn.execute("SELECT COUNT(*) FROM screenshots").fetchone()[0] == 0
+        if empty:
+            self.backfill()
+
+    def backfill(self):
+        """Imports screenshots captured before the catalog existed (course unknown)."""
+        count = 0
+        for path in glob.glob(os.path.join(self.screenshot_dir, "screenshot_*.png")):
+            m = re.search(r"(\d{9,})", os.path.basename(path))
+            captured_at = float(m.group(1)) if m else os.path.getmtime(path)
+            self.record_screenshot(path, captured_at=captured_at)
+            count += 1
+        if count:
+            print(f"[CATALOG] Backfilled {count} existing screenshots")
+        return count
+
+    def record_screenshot(self, path, course=None, url=None, captured_at=None, device=None):
+        """``device`` names an extra viewport (tablet, mobile); None is the primary desktop capture."""
+        path = os.path.abspath(path)
+        width, height = _image_size(path)
+        row = (
+            path,
+            course if course is not None else course_key_for_url(url),
+            url,
+            captured_at if captured_at is not None else time.time(),
+            width,
+            height,
+            os.path.getsize(path),
+            _sha256(path),
+            device,
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO screenshots (path, course, url, captured_at, width, height, bytes, sha256, "
+                "device) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            self._conn.commit()
+        return dict(zip(("path", "course", "url", "captured_at", "width", "height", "bytes", "sha256", "device"),
+                        row))
+
+    def screenshots_for(self, course=None, limit=5, device=None):
+        """Newest-first screenshot records for ``course`` (any course if None) and ``device`` (None = desktop)."""
+        with self._lock:
+            if course is None:
+                rows = self._conn.execute(
+                    "SELECT * FROM screenshots WHERE device IS ? ORDER BY captured_at DESC LIMIT ?", (device, limit)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM screenshots WHERE course = ? AND device IS ? ORDER BY captured_at DESC LIMIT ?",
+                    (course, device, limit)
+                ).fetchall()
+        return [dict(r) for r in rows]
+
+    def _delete(self, paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[CATALOG] Could not delete {path}: {e}")
+                continue
+        with self._lock:
+            self._conn.executemany("DELETE FROM screenshots WHERE path = ?", [(p,) for p in paths])
+            self._conn.commit()
+
+    def gc(self, retention_days=SCREENSHOT_RETENTION_DAYS, quota_bytes=SCREENSHOT_QUOTA_BYTES):
+        """Applies retention and quota to screenshots, trims the TTS chunk cache and sweeps stale temp files.
+
+        The newest screenshot of each course (per device) is always kept so
+        the practice simulation never loses its backdrop.
+        """
+        cutoff = time.time() - retention_days * 86400
+        with self._lock:
+            keep = {r[0] for r in self._conn.execute(
+                "SELECT path FROM screenshots s WHERE captured_at = "
+                "(SELECT MAX(captured_at) FROM screenshots t WHERE t.course IS s.course AND t.device IS s.device)"
+            )}
+            expired = [r[0] for r in self._conn.execute(
+                "SELECT path FROM screenshots WHERE captured_at < ?", (cutoff,)
+            ) if r[0] not in keep]
+            # Rows whose file vanished outside the catalog are dropped too.
+            missing = [r[0] for r in self._conn.execute("SELECT path FROM screenshots")
+                       if not os.path.exists(r[0])]
+        self._delete(expired + missing)
+
+        over_quota = []
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM screenshots").fetchone()[0]
+            if total > quota_bytes:
+                for path, size in self._conn.execute("SELECT path, bytes FROM screenshots ORDER BY captured_at"):
+                    if total <= quota_bytes:
+                        break
+                    if path in keep:
+                        continue
+                    over_quota.append(path)
+                    total -= size
+        self._delete(over_quota)
+
+        temp = []
+        now = time.time()
+        for pattern in _TEMP_PATTERNS:
+            for path in glob.glob(os.path.join(self.media_dir, pattern)):
+                try:
+                    if now - os.path.getmtime(path) > TEMP_MAX_AGE_SECONDS:
+                        os.remove(path)
+                        temp.append(path)
+                except OSError:
+                    continue
+
+        tts = prune_tts_cache()
+        sora = prune_sora_cache()
+
+        removed = {"expired": len(expired), "missing": len(missing), "over_quota": len(over_quota), "temp": len(temp),
+                   "tts": tts, "sora": sora}
+        if any(removed.values()):
+            print(f"[CATALOG] GC removed {removed}")
+        return removed
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Process-wide catalog, opened on first use."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = MediaCatalog()
+        return _catalog
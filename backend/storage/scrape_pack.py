@@ -0,0 +1,233 @@
+"""Compact binary scrape artifact ("scrape pack").
+
+Layout: a fixed prelude (magic, version, header length), a small JSON
+header indexing the sections by offset, then the sections themselves:
+
+    meta    zlib JSON   title, url, screenshot, viewport, any other keys
+    text    zlib UTF-8  text_content
+    boxes   float32     x[n], y[n], width[n], height[n] (columnar, little-endian)
+    labels  zlib JSON   element texts, selector types and any other element keys
+
+Readers memory-map the file and touch only the sections they ask for, so
+the lesson endpoint reads and inflates the text without parsing the
+elements, and the element index reads the boxes without the text.
+
+    python -m storage.scrape_pack pack scrape.json [scrape.pack]
+    python -m storage.scrape_pack export scrape.pack [scrape.json]
+"""
+import os
+import sys
+import mmap
+import zlib
+import json
+import struct
+from array import array
+
+MAGIC = b"THSP"
+VERSION = 1
+PRELUDE = struct.Struct("<4sHxxI")
+ALIGN = 8
+TEXT_KEY = "text_content"
+ELEMENTS_KEY = "interactive_elements"
+ELEMENT_KEYS = ("text", "type", "x", "y", "width", "height")
+
+
+def pack_path(json_path):
+    return os.path.splitext(json_path)[0] + ".pack"
+
+
+def _le(values):
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _zjson(obj):
+    return zlib.compress(json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def pack_scrape(data):
+    """Encodes a scrape dict as pack bytes."""
+    elements = data.get(ELEMENTS_KEY) or []
+    columns = [array("f") for _ in range(4)]
+    texts, type_ids, types, extra = [], [], {}, {}
+    for i, el in enumerate(elements):
+        for col, key in zip(columns, ("x", "y", "width", "height")):
+            col.append(float(el.get(key) or 0))
+        texts.append(el.get("text") or "")
+        type_ids.append(types.setdefault(el.get("type") or "", len(types)))
+        # Keys beyond the standard six are kept per element, only where present.
+        rest = {k: v for k, v in el.items() if k not in ELEMENT_KEYS}
+        if rest:
+            extra[str(i)] = rest
+    boxes = b"".join(_le(col).tobytes() for col in columns)
+    labels = {"text": texts, "types": list(types), "type": type_ids}
+    if extra:
+        labels["extra"] = extra
+
+    meta = {k: v for k, v in data.items() if k not in (TEXT_KEY, ELEMENTS_KEY)}
+    meta["_keys"] = list(data)
+    sections = [
+        ("meta", _zjson(meta), "zlib-json"),
+        ("text", zlib.compress((data.get(TEXT_KEY) or "").encode("utf-8"), 6), "zlib-utf8"),
+        ("boxes", boxes, "f32-columns"),
+        ("labels", _zjson(labels), "zlib-json"),
+    ]
+
+    # Offsets depend on the header's length, which depends on the offsets;
+    # repeat until the header stops growing (two or three passes).
+    header = b""
+    while True:
+        offset = PRELUDE.size + len(header)
+        index = {}
+        for name, body, codec in sections:
+            offset += -offset % ALIGN
+            index[name] = [offset, len(body), codec]
+            offset += len(body)
+        encoded = json.dumps({"count": len(elements), "sections": index}, separators=(",", ":")).encode("utf-8")
+        if len(encoded) == len(header):
+            header = encoded
+            break
+        header = encoded
+
+    out = bytearray(PRELUDE.pack(MAGIC, VERSION, len(header)) + header)
+    for name, body, _ in sections:
+        out += b"\0" * (index[name][0] - len(out))
+        out += body
+    return bytes(out)
+
+
+class ScrapePack:
+    """Read-only view of a pack file; use as a context manager.
+
+    Opening maps the file and parses only the prelude and header. Each
+    accessor copies its section out of the map, so results stay valid
+    after ``close``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, header_len = PRELUDE.unpack_from(self._map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not a scrape pack (v{VERSION}): {path}")
+            header = json.loads(self._map[PRELUDE.size:PRELUDE.size + header_len])
+        except Exception:
+            self._map.close()
+            raise
+        self.count = header["count"]
+        self.sections = header["sections"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    def _section(self, name):
+        offset, length, _ = self.sections[name]
+        return self._map[offset:offset + length]
+
+    def meta(self):
+        meta = json.loads(zlib.decompress(self._section("meta")))
+        meta.pop("_keys", None)
+        return meta
+
+    def text(self):
+        return zlib.decompress(self._section("text")).decode("utf-8")
+
+    def boxes(self):
+        """(xs, ys, widths, heights) as float32 arrays."""
+        cols = _le(array("f", self._section("boxes")))
+        n = self.count
+        return tuple(cols[i * n:(i + 1) * n] for i in range(4))
+
+    def _labels(self):
+        return json.loads(zlib.decompress(self._section("labels")))
+
+    def labels(self):
+        """(texts, types), one entry per element."""
+        labels = self._labels()
+        return labels["text"], [labels["types"][i] for i in labels["type"]]
+
+    def elements(self):
+        xs, ys, ws, hs = self.boxes()
+        labels = self._labels()
+        types = labels["types"]
+        extra = labels.get("extra", {})
+        out = []
+        for i, (t, k, x, y, w, h) in enumerate(zip(labels["text"], labels["type"], xs, ys, ws, hs)):
+            el = {"text": t, "type": types[k], "x": round(x, 2), "y": round(y, 2), "width": round(w, 2),
+                  "height": round(h, 2)}
+            el.update(extra.get(str(i), ()))
+            out.append(el)
+        return out
+
+    def to_dict(self, fields=None):
+        """The scrape as a dict (the JSON export), or just ``fields`` of it.
+
+        Box coordinates come back at float32 precision, rounded to 0.01 px;
+        extra element keys follow the standard six.
+        """
+        meta = json.loads(zlib.decompress(self._section("meta")))
+        keys = meta.pop("_keys", None) or list(meta) + [TEXT_KEY, ELEMENTS_KEY]
+        out = {}
+        for key in keys:
+            if fields is not None and key not in fields:
+                continue
+            if key == TEXT_KEY:
+                out[key] = self.text()
+            elif key == ELEMENTS_KEY:
+                out[key] = self.elements()
+            elif key in meta:
+                out[key] = meta[key]
+        return out
+
+
+def fresh_pack_path(json_path):
+    """The pack beside ``json_path`` if it is at least as new as the JSON, else None.
+
+    A JSON written by something that doesn't know about packs (an older
+    build, refresh_snapshot.py) makes the stale pack be ignored.
+    """
+    path = pack_path(json_path)
+    try:
+        pack_mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    try:
+        if os.stat(json_path).st_mtime_ns > pack_mtime:
+            return None
+    except FileNotFoundError:
+        pass
+    return path
+
+
+def main(argv):
+    if len(argv) not in (2, 3) or argv[0] not in ("pack", "export"):
+        print(__doc__)
+        return 2
+    src = argv[1]
+    if argv[0] == "pack":
+        dst = argv[2] if len(argv) == 3 else pack_path(src)
+        with open(src, "r", encoding="utf-8") as f:
+            body = pack_scrape(json.load(f))
+        with open(dst, "wb") as f:
+            f.write(body)
+    else:
+        dst = argv[2] if len(argv) == 3 else os.path.splitext(src)[0] + ".json"
+        with ScrapePack(src) as pack:
+            data = pack.to_dict()
+        with open(dst, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"{src} ({os.path.getsize(src)} bytes) -> {dst} ({os.path.getsize(dst)} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
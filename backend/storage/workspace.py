@@ -0,0 +1,274 @@
+import os
+import re
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+from storage.scrape_pack import ScrapePack, pack_scrape, pack_path, fresh_pack_path
+
+SCRAPED_DIR = os.path.join(os.path.dirname(__file__), "..", "scraped_data")
+WORKSPACES_DIR = os.environ.get("COURSE_WORKSPACES_DIR", os.path.join(SCRAPED_DIR, "courses"))
+
+# Security: course IDs become directory names, so only a conservative slug is accepted
+COURSE_ID_RE = re.compile(r"[a-z0-9][a-z0-9_-]{0,63}")
+
+
+def valid_course_id(course_id):
+    return bool(course_id) and COURSE_ID_RE.fullmatch(course_id) is not None
+
+
+def atomic_write_bytes(path, body):
+    """Writes via a temp file in the same directory and renames it into place.
+
+    Readers see either the old file or the new one, never a half-written one.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_text(path, text):
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def atomic_write_json(path, data, indent=2):
+    atomic_write_text(path, json.dumps(data, indent=indent, ensure_ascii=False))
+
+
+class Artifact:
+    """One parsed JSON file plus what's needed to serve it: compact body and strong ETag.
+
+    ``data`` is shared between callers and must be treated as read-only.
+    """
+
+    __slots__ = ("sig", "data", "body", "etag")
+
+    def __init__(self, sig, raw):
+        self.sig = sig
+        self.data = json.loads(raw)
+        # Serialized once per version of the file, not once per request.
+        self.body = json.dumps(self.data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+
+
+class ArtifactCache:
+    """In-process cache of JSON artifacts, validated against the file on every get.
+
+    The (inode, size, mtime) signature is one ``stat`` per lookup; atomic
+    writes always produce a new inode, so a replaced file is never served
+    stale even within one mtime tick. Writers also call ``invalidate``.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path):
+        """Returns the Artifact for ``path``, or None if the file doesn't exist."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self.invalidate(path)
+            return None
+        sig = (st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.sig == sig:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+        with open(path, "rb") as f:
+            entry = Artifact(sig, f.read())
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, path):
+        with self._lock:
+            self._entries.pop(path, None)
+
+
+artifacts = ArtifactCache()
+
+
+def load_scrape_fields(json_path, fields):
+    """Just ``fields`` of a scrape, from its pack when there is a fresh one.
+
+    Only the pack sections holding those fields are read; without a pack
+    the JSON artifact is used. Returns None if neither exists.
+    """
+    path = fresh_pack_path(json_path)
+    if path is not None:
+        try:
+            with ScrapePack(path) as pack:
+                return pack.to_dict(fields)
+        except FileNotFoundError:
+            pass  # replaced between the freshness check and the open; fall back
+    entry = artifacts.get(json_path)
+    return {k: entry.data[k] for k in fields if k in entry.data} if entry else None
+
+
+def _legacy_slug(title):
+    return re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_")[:80] or "lesson"
+
+
+def lesson_slug(title):
+    """Readable file name for a lesson title, suffixed with a hash of the exact title.
+
+    The readable part alone is lossy ("Intro" and "Intro!", long titles that
+    share their first 80 characters), so the hash keeps distinct titles apart.
+    """
+    return f"{_legacy_slug(title)}-{hashlib.sha1(title.encode('utf-8')).hexdigest()[:8]}"
+
+
+class CourseWorkspace:
+    """On-disk state of one course: scrape (JSON + pack), plan, generated lessons and quizzes, video manifest.
+
+    Reads need no lock because every write is an atomic rename; ``lock``
+    serializes writers of the same course. JSON reads go through the shared
+    ArtifactCache, so the returned objects are read-only. The default
+    workspace (no course ID) is the legacy ``scraped_data/latest_scrape.json``
+    + ``course_plan.json`` pair, so single-course clients keep working.
+    """
+
+    def __init__(self, course_id, root, scrape_name="scrape.json"):
+        self.course_id = course_id
+        self.root = root
+        self.scrape_path = os.path.join(root, scrape_name)
+        self.scrape_pack_path = pack_path(self.scrape_path)
+        self.plan_path = os.path.join(root, "course_plan.json")
+        self.lessons_dir = os.path.join(root, "lessons")
+        self.quizzes_dir = os.path.join(root, "quizzes")
+        self.videos_path = os.path.join(root, "videos.json")
+        self.lock = threading.Lock()
+
+    def _read_json(self, path):
+        entry = artifacts.get(path)
+        return entry.data if entry else None
+
+    def _write_json(self, path, data):
+        with self.lock:
+            atomic_write_json(path, data)
+            artifacts.invalidate(path)
+
+    def scrape_artifact(self):
+        return artifacts.get(self.scrape_path)
+
+    def plan_artifact(self):
+        return artifacts.get(self.plan_path)
+
+    def read_scrape(self):
+        return self._read_json(self.scrape_path)
+
+    def read_scrape_fields(self, *fields):
+        return load_scrape_fields(self.scrape_path, fields)
+
+    def write_scrape(self, data):
+        """Writes the JSON (kept for compatibility and the snapshot endpoint), then the pack.
+
+        The pack goes second so it is never older than the JSON it mirrors.
+        """
+        body = pack_scrape(data)
+        with self.lock:
+            atomic_write_json(self.scrape_path, data)
+            artifacts.invalidate(self.scrape_path)
+            atomic_write_bytes(self.scrape_pack_path, body)
+
+    def read_plan(self):
+        return self._read_json(self.plan_path)
+
+    def write_plan(self, plan):
+        self._write_json(self.plan_path, plan)
+
+    def _stored_path(self, directory, title, ext):
+        """Path a lesson artifact was saved under; files written before titles
+        were hashed into the name are still found by their old slug."""
+        path = os.path.join(directory, f"{lesson_slug(title)}{ext}")
+        legacy = os.path.join(directory, f"{_legacy_slug(title)}{ext}")
+        return legacy if not os.path.exists(path) and os.path.exists(legacy) else path
+
+    def lesson_path(self, title):
+        return os.path.join(self.lessons_dir, f"{lesson_slug(title)}.md")
+
+    def read_lesson(self, title):
+        path = self._stored_path(self.lessons_dir, title, ".md")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def write_lesson(self, title, content):
+        with self.lock:
+            atomic_write_text(self.lesson_path(title), content)
+
+    def quiz_path(self, title):
+        return os.path.join(self.quizzes_dir, f"{lesson_slug(title)}.json")
+
+    def read_quiz(self, title):
+        return self._read_json(self._stored_path(self.quizzes_dir, title, ".json"))
+
+    def write_quiz(self, title, questions):
+        self._write_json(self.quiz_path(title), questions)
+
+    def read_videos(self):
+        return self._read_json(self.videos_path) or {}
+
+    def record_videos(self, videos):
+        """Merges {lesson title: video URL} into the course's video manifest."""
+        with self.lock:
+            manifest = dict(self._read_json(self.videos_path) or {})
+            manifest.update(videos)
+            atomic_write_json(self.videos_path, manifest)
+            artifacts.invalidate(self.videos_path)
+
+
+class WorkspaceStore:
+    """Hands out one CourseWorkspace per course ID (and so one lock per course)."""
+
+    def __init__(self, root=WORKSPACES_DIR, default_root=SCRAPED_DIR):
+        self.root = root
+        self._default = CourseWorkspace(None, default_root, scrape_name="latest_scrape.json")
+        self._workspaces = {}
+        self._lock = threading.Lock()
+
+    def get(self, course_id=None):
+        """Workspace for ``course_id`` (the legacy default if None).
+
+        Raises ValueError for an ID that isn't a safe slug.
+        """
+        if course_id is None:
+            return self._default
+        if not valid_course_id(course_id):
+            raise ValueError("Invalid course ID")
+        with self._lock:
+            ws = self._workspaces.get(course_id)
+            if ws is None:
+                ws = self._workspaces[course_id] = CourseWorkspace(course_id, os.path.join(self.root, course_id))
+            return ws
+
+    def list_courses(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if valid_course_id(name) and os.path.isdir(os.path.join(self.root, name)))
@@ -0,0 +1,191 @@
+import os
+import math
+import time
+import asyncio
+from collections import deque
+
+from monitoring.metrics import ADMISSION_REJECTED, ADMISSION_WAIT
+from web.responses import dumps
+
+# name=concurrency:queue pairs; see DEFAULT_LIMITS for the names.
+ADMISSION_LIMITS = os.environ.get("ADMISSION_LIMITS", "")
+# Longest a queued request waits for a slot before giving up with 503.
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "30"))
+
+# One page in one Chromium: browser work is serialized. LLM limits bound the
+# Groq requests in flight; video admission only covers job submission (the
+# render queue has its own bound). An export holds its slot for minutes, so it
+# has its own limiter; the lessons it generates take ``lesson`` slots.
+DEFAULT_LIMITS = {
+    "browser": (1, 8),
+    "plan": (2, 8),
+    "lesson": (4, 16),
+    "video": (4, 16),
+    "export": (1, 2),
+}
+ROUTES = {
+    ("POST", "/api/browser/navigate"): "browser",
+    ("POST", "/api/browser/scrape"): "browser",
+    ("POST", "/api/ai/plan"): "plan",
+    ("POST", "/api/ai/lesson"): "lesson",
+    ("POST", "/api/ai/quiz"): "lesson",
+    ("POST", "/api/course/export"): "export",
+    ("POST", "/api/ai/video"): "video",
+    ("POST", "/api/ai/video/course"): "video",
+}
+
+
+class Overloaded(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def retry_after_seconds(avg_seconds, waiting, slots, cap=60):
+    """Rough time until a new request would get a slot: the queue ahead drained by ``slots`` workers."""
+    return max(1, min(cap, math.ceil(avg_seconds * (waiting + 1) / max(1, slots))))
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded FIFO wait queue, for use on the event loop.
+
+    ``async with limiter:`` takes a slot, waiting in line if all ``limit``
+    slots are busy. When ``queue`` requests are already waiting it raises
+    Overloaded("queue_full") at once, and a request that waits longer than
+    ``timeout`` raises Overloaded("timeout"). Both carry a Retry-After
+    estimate from the recent average time a slot is held.
+    """
+
+    def __init__(self, name, limit, queue, timeout=ADMISSION_QUEUE_TIMEOUT):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue = max(0, queue)
+        self.timeout = timeout
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "timeout": 0}
+        self.avg_hold = 1.0
+        self._waiters = deque()
+
+    @property
+    def waiting(self):
+        return len(self._waiters)
+
+    def retry_after(self):
+        return retry_after_seconds(self.avg_hold, self.waiting, self.limit)
+
+    def _reject(self, reason):
+        self.rejected[reason] += 1
+        ADMISSION_REJECTED.inc(limiter=self.name, reason=reason)
+        return Overloaded(reason, self.retry_after())
+
+    async def acquire(self):
+        start = time.perf_counter()
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+        elif len(self._waiters) >= self.queue:
+            raise self._reject("queue_full")
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                # The releasing request hands its slot straight to us (in_flight is unchanged).
+                await asyncio.wait_for(asyncio.shield(fut), self.timeout)
+            except asyncio.TimeoutError:
+                if fut in self._waiters:
+                    self._waiters.remove(fut)
+                    raise self._reject("timeout")
+                # Otherwise the slot was handed over just as the wait timed out; take it.
+            except asyncio.CancelledError:
+                if fut in self._waiters:
+                    self._waiters.remove(fut)
+                else:
+                    self.release()  # client went away after being handed a slot
+                raise
+        self.admitted += 1
+        ADMISSION_WAIT.observe(time.perf_counter() - start, limiter=self.name)
+        return time.perf_counter()
+
+    def release(self, acquired_at=None):
+        if acquired_at is not None:
+            self.avg_hold = 0.8 * self.avg_hold + 0.2 * (time.perf_counter() - acquired_at)
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(True)
+                return
+        self.in_flight -= 1
+
+    def snapshot(self):
+        return {"limit": self.limit, "queue": self.queue, "in_flight": self.in_flight, "waiting": self.waiting,
+                "admitted": self.admitted, "rejected": dict(self.rejected),
+                "avg_hold_seconds": round(self.avg_hold, 3)}
+
+
+def parse_limits(spec, defaults=DEFAULT_LIMITS):
+    """Defaults overridden by "name=concurrency:queue,..." (e.g. "browser=2:10,plan=1:4").
+
+    Raises ValueError for an unknown name or malformed entry, so a typo in the
+    deployment config fails at startup rather than silently not limiting.
+    """
+    limits = dict(defaults)
+    for part in (p.strip() for p in spec.split(",")):
+        if not part:
+            continue
+        name, _, values = part.partition("=")
+        name = name.strip()
+        if name not in defaults:
+            raise ValueError(f"Unknown admission limiter {name!r}; expected one of {sorted(defaults)}")
+        limit, _, queue = values.partition(":")
+        try:
+            limits[name] = (int(limit), int(queue) if queue else limits[name][1])
+        except ValueError:
+            raise ValueError(f"Bad admission limit {part!r}; expected name=concurrency:queue")
+    return limits
+
+
+def build_limiters(spec=ADMISSION_LIMITS, timeout=ADMISSION_QUEUE_TIMEOUT):
+    return {name: AdmissionLimiter(name, limit, queue, timeout) for name, (limit, queue) in parse_limits(spec).items()}
+
+
+def overloaded_response_parts(exc):
+    """(status, headers, body) for a rejected request: 429 if the queue was full, 503 on wait timeout."""
+    status = 429 if exc.reason == "queue_full" else 503
+    body = dumps({"detail": "Server is busy, retry later"})
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+               (b"retry-after", str(exc.retry_after).encode())]
+    return status, headers, body
+
+
+class AdmissionMiddleware:
+    """Applies ``limiters`` to the expensive routes in ``routes`` ((method, path) -> limiter name).
+
+    A slot is held until the response has been sent. Rejections are answered
+    before the request reaches FastAPI, so they stay cheap under overload.
+    """
+
+    def __init__(self, app, limiters, routes=ROUTES):
+        self.app = app
+        self.limiters = limiters
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        name = self.routes.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        limiter = self.limiters.get(name)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            acquired_at = await limiter.acquire()
+        except Overloaded as e:
+            print(f"[ADMISSION] {name}: rejected ({e.reason}), in flight {limiter.in_flight}, "
+                  f"waiting {limiter.waiting}")
+            status, headers, body = overloaded_response_parts(e)
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(acquired_at)
@@ -0,0 +1,118 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+from jobs.offload import offload
+
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/markdown", "text/css",
+                      "application/javascript")
+# Compressing bigger bodies takes long enough that it shouldn't run on the event loop.
+OFFLOAD_MIN_BYTES = 64 * 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Appended inside a compressed response's ETag so each encoding has its own strong validator.
+ETAG_SUFFIXES = {"br": "-br", "gzip": "-gz"}
+
+
+def strip_etag_suffix(tag):
+    """ETag as sent by the client, minus any encoding suffix this middleware added."""
+    for suffix in ETAG_SUFFIXES.values():
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def negotiate(accept_encoding):
+    """Best supported coding in an Accept-Encoding header: "br", "gzip" or None."""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            offered[name] = q
+    for coding in (("br",) if brotli else ()) + ("gzip",):
+        if offered.get(coding, offered.get("*", 0)) > 0:
+            return coding
+    return None
+
+
+def compress(body, coding):
+    if coding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """Negotiates brotli/gzip for single-body textual responses over ``minimum_size``.
+
+    Streaming responses (SSE, static video files) pass through untouched;
+    they are sent in several body messages, and only the first message is
+    ever inspected.
+    """
+
+    def __init__(self, app, minimum_size=1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        coding = negotiate(accept)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_wrapper(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                ctype = headers.get(b"content-type", b"").decode("latin-1")
+                if (b"content-encoding" in headers or not ctype.startswith(COMPRESSIBLE_TYPES)
+                        or message.get("status") == 304):
+                    await send(message)
+                else:
+                    start = message  # held until we see whether the body is worth compressing
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            held, start = start, None
+            body = message.get("body", b"")
+            if message.get("more_body") or len(body) < self.minimum_size:
+                await send(held)
+                await send(message)
+                return
+            if len(body) >= OFFLOAD_MIN_BYTES:
+                body = await offload(compress, body, coding)
+            else:
+                body = compress(body, coding)
+            headers = []
+            for k, v in held.get("headers", []):
+                if k.lower() == b"content-length":
+                    continue
+                if k.lower() == b"etag" and v.endswith(b'"'):
+                    v = v[:-1] + ETAG_SUFFIXES[coding].encode() + b'"'
+                headers.append((k, v))
+            headers += [(b"content-encoding", coding.encode()), (b"content-length", str(len(body)).encode()),
+                        (b"vary", b"Accept-Encoding")]
+            await send({**held, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
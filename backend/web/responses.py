@@ -0,0 +1,56 @@
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to compact stdlib JSON
+    orjson = None
+
+# Named field groups for ?fields=; anything else must be a top-level key.
+FIELD_GROUPS = {
+    "hotspots": ("screenshot", "viewport", "interactive_elements"),
+    "text": ("title", "url", "text_content"),
+}
+SCRAPE_FIELDS = ("title", "url", "text_content", "screenshot", "viewport", "interactive_elements", "viewports")
+
+
+def dumps(data):
+    """Compact JSON bytes; orjson when installed (several times faster on scrapes)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with ``dumps``: no indentation, no ASCII escaping."""
+
+    def render(self, content):
+        return dumps(content)
+
+
+def parse_fields(fields, allowed=SCRAPE_FIELDS):
+    """Turns "hotspots,title" into an ordered tuple of keys.
+
+    Returns None for no selection; raises ValueError on an unknown field.
+    """
+    if not fields:
+        return None
+    keys = []
+    for name in fields.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        group = FIELD_GROUPS.get(name, (name,))
+        for key in group:
+            if key not in allowed:
+                raise ValueError(f"Unknown field: {name}")
+            if key not in keys:
+                keys.append(key)
+    return tuple(keys) or None
+
+
+def select_fields(data, keys):
+    if keys is None:
+        return data
+    return {k: data[k] for k in keys if k in data}
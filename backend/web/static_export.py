@@ -0,0 +1,584 @@
+"""Static course export: a course compiled into files any static host can serve.
+
+    python -m web.static_export [course_id] [--out DIR] [--no-generate] [--no-zip]
+
+Bundle layout (one directory per course under COURSE_EXPORTS_DIR):
+
+    index.html                   course outline linking every lesson
+    course.json                  plan with each lesson's files (the bundle manifest)
+    lessons/<slug>.html, .md     pre-rendered lesson with its video and quiz
+    quizzes/<slug>.json          quiz questions
+    simulation.html              screenshot with its hotspots as boxes
+    snapshot.json                page title/url/viewport, hotspots, screenshot paths
+    assets/<name>.<hash>.webp    compressed screenshots
+    videos/<slug>.<hash>.mp4     lesson videos
+    _headers                     Cache-Control per path (Netlify / Cloudflare Pages format)
+
+Content-hashed files never change under their name, so they are cached
+``immutable`` for a year; pages and JSON revalidate after five minutes.
+"""
+import io
+import os
+import re
+import sys
+import html
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+import zipfile
+import argparse
+import threading
+
+from PIL import Image
+
+from jobs.offload import offload
+from media.batch import course_lessons
+from storage.workspace import SCRAPED_DIR, WorkspaceStore, lesson_slug
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+MEDIA_DIR = os.path.join(BACKEND_DIR, "media")
+EXPORTS_DIR = os.environ.get("COURSE_EXPORTS_DIR", os.path.join(BACKEND_DIR, "exports"))
+EXPORT_IMAGE_QUALITY = int(os.environ.get("EXPORT_IMAGE_QUALITY", "80"))
+# Wider screenshots are scaled down; hotspots are placed in percent of the page, so they still line up.
+EXPORT_IMAGE_MAX_WIDTH = 1600
+# WebP can't encode beyond this; taller full-page captures are written as JPEG.
+WEBP_MAX_SIDE = 16383
+# Missing lessons and quizzes generated at once during an export.
+GENERATE_CONCURRENCY = 4
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "public, max-age=300, must-revalidate"
+STORED_EXTENSIONS = (".mp4", ".webp", ".jpg")
+
+# Security: only files the app itself names are read from scraped_data/ and media/
+SCREENSHOT_RE = re.compile(r"screenshot_[0-9A-Za-z_]+\.png")
+VIDEO_RE = re.compile(r"[\w.-]+\.mp4")
+
+
+def export_dir(course_id=None, root=EXPORTS_DIR):
+    return os.path.join(root, course_id or "default")
+
+
+# --- Markdown ---------------------------------------------------------------
+
+_INLINE = [
+    (re.compile(r"`([^`]+)`"), r"<code>\1</code>"),
+    (re.compile(r"\*\*(.+?)\*\*"), r"<strong>\1</strong>"),
+    (re.compile(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?![*\w])"), r"<em>\1</em>"),
+    # Security: only http(s) links; the text was escaped before this runs
+    (re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+)\)"), r'<a href="\2" rel="noopener">\1</a>'),
+]
+_HEADING = re.compile(r"(#{1,6})\s+(.*?)\s*#*$")
+_BULLET = re.compile(r"\s*[-*+]\s+(.*)")
+_NUMBERED = re.compile(r"\s*\d+[.)]\s+(.*)")
+_RULE = re.compile(r"(-{3,}|\*{3,}|_{3,})")
+
+
+def _inline(text):
+    text = html.escape(text)
+    for pattern, repl in _INLINE:
+        text = pattern.sub(repl, text)
+    return text
+
+
+def render_markdown(markdown):
+    """HTML for the Markdown the lesson generator writes: headings, paragraphs, lists, quotes, emphasis, links."""
+    out, para, items, quote = [], [], [], []
+    list_tag = None
+
+    def flush():
+        nonlocal list_tag
+        if para:
+            out.append(f"<p>{_inline(' '.join(para))}</p>")
+            para.clear()
+        if items:
+            out.append(f"<{list_tag}>" + "".join(f"<li>{_inline(i)}</li>" for i in items) + f"</{list_tag}>")
+            items.clear()
+            list_tag = None
+        if quote:
+            out.append(f"<blockquote><p>{_inline(' '.join(quote))}</p></blockquote>")
+            quote.clear()
+
+    for raw in markdown.splitlines():
+        line = raw.strip()
+        if not line:
+            flush()
+            continue
+        m = _HEADING.fullmatch(line)
+        if m:
+            flush()
+            level = len(m.group(1))
+            out.append(f"<h{level}>{_inline(m.group(2))}</h{level}>")
+            continue
+        if _RULE.fullmatch(line):
+            flush()
+            out.append("<hr>")
+            continue
+        for tag, pattern in (("ul", _BULLET), ("ol", _NUMBERED)):
+            m = pattern.fullmatch(raw)
+            if m:
+                if list_tag != tag or para or quote:
+                    flush()
+                list_tag = tag
+                items.append(m.group(1))
+                break
+        else:
+            if line.startswith(">"):
+                if para or items:
+                    flush()
+                quote.append(line.lstrip("> "))
+            elif items and raw[:1].isspace():
+                items[-1] += " " + line  # continuation of a list item
+            else:
+                if items or quote:
+                    flush()
+                para.append(line)
+    flush()
+    return "\n".join(out)
+
+
+# --- Pages ------------------------------------------------------------------
+
+STYLE = """
+body{font:16px/1.6 system-ui,sans-serif;max-width:860px;margin:0 auto;padding:24px;color:#1f2937}
+a{color:#2563eb}nav{margin-bottom:16px}video,img{max-width:100%}
+h1{line-height:1.2}code{background:#f3f4f6;padding:0 4px;border-radius:4px}
+blockquote{border-left:4px solid #d1d5db;margin:0;padding-left:16px;color:#4b5563}
+fieldset{border:1px solid #e5e7eb;border-radius:8px;margin:12px 0}
+fieldset.right{border-color:#16a34a}fieldset.wrong{border-color:#dc2626}
+.shot{position:relative}.shot img{display:block;width:100%}
+.hotspot{position:absolute;outline:2px solid rgba(37,99,235,.6);background:rgba(37,99,235,.08)}
+.hotspot:hover{background:rgba(37,99,235,.25)}
+"""
+
+QUIZ_SCRIPT = """
+document.querySelectorAll("form.quiz").forEach(function (form) {
+  form.addEventListener("submit", function (e) {
+    e.preventDefault();
+    var sets = form.querySelectorAll("fieldset"), score = 0;
+    sets.forEach(function (f) {
+      var picked = f.querySelector("input:checked");
+      var ok = picked && picked.value === f.dataset.correct;
+      f.className = ok ? "right" : "wrong";
+      if (ok) score++;
+    });
+    form.querySelector("output").textContent = score + " / " + sets.length + " correct";
+  });
+});
+"""
+
+
+def _page(title, body, root=""):
+    return (f'<!doctype html>\n<html lang="en"><head><meta charset="utf-8">'
+            f'<meta name="viewport" content="width=device-width,initial-scale=1">'
+            f"<title>{html.escape(title)}</title><style>{STYLE}</style></head>\n"
+            f'<body><nav><a href="{root}index.html">Course home</a></nav>\n{body}\n</body></html>\n')
+
+
+def valid_questions(quiz):
+    """The well-formed questions of a saved or generated quiz.
+
+    LLM output is not trusted: a question needs a list of options and an
+    integer ``correct_index`` inside it, anything else is dropped.
+    """
+    if not isinstance(quiz, list):
+        return []
+    valid = []
+    for q in quiz:
+        if not isinstance(q, dict):
+            continue
+        options, correct = q.get("options"), q.get("correct_index")
+        if not isinstance(options, list) or not options:
+            continue
+        if not isinstance(correct, int) or isinstance(correct, bool) or not 0 <= correct < len(options):
+            continue
+        valid.append(q)
+    return valid
+
+
+def _quiz_html(questions):
+    sets = []
+    for qi, q in enumerate(questions):
+        options = "".join(
+            f'<label><input type="radio" name="q{qi}" value="{oi}"> {html.escape(str(opt))}</label><br>'
+            for oi, opt in enumerate(q["options"]))
+        sets.append(f'<fieldset data-correct="{q["correct_index"]}">'
+                    f"<legend>{html.escape(str(q.get('question', '')))}</legend>{options}</fieldset>")
+    return (f'<section><h2>Quiz</h2><form class="quiz">{"".join(sets)}'
+            f'<button type="submit">Check answers</button> <output></output></form>'
+            f"<script>{QUIZ_SCRIPT}</script></section>")
+
+
+def _lesson_html(lesson, video):
+    parts = [f"<p>{html.escape(lesson['module'])}</p>" if lesson["module"] else ""]
+    if video:
+        parts.append(f'<video controls preload="metadata" src="../{video}"></video>')
+    parts.append(f"<article>{render_markdown(lesson['content'])}</article>")
+    if lesson["quiz"]:
+        parts.append(_quiz_html(lesson["quiz"]))
+    body = f"<h1>{html.escape(lesson['title'])}</h1>\n" + "\n".join(p for p in parts if p)
+    return _page(lesson["title"], body, root="../")
+
+
+def _index_html(plan, lessons, has_snapshot):
+    title = plan.get("course_title") or "Course"
+    parts = [f"<h1>{html.escape(title)}</h1>"]
+    if plan.get("description"):
+        parts.append(f"<p>{html.escape(plan['description'])}</p>")
+    if has_snapshot:
+        parts.append('<p><a href="simulation.html">Explore the page</a></p>')
+    by_module = {}
+    for lesson in lessons:
+        by_module.setdefault(lesson["module"], []).append(lesson)
+    for module, entries in by_module.items():
+        links = "".join(f'<li><a href="lessons/{l["slug"]}.html">{html.escape(l["title"])}</a></li>' for l in entries)
+        parts.append(f"<h2>{html.escape(module or 'Lessons')}</h2><ol>{links}</ol>")
+    return _page(title, "\n".join(parts))
+
+
+def _hotspots_html(view):
+    page_w, page_h = view["page_size"]
+    boxes = []
+    for el in view.get("interactive_elements") or []:
+        try:
+            x, y, w, h = (float(el[k]) for k in ("x", "y", "width", "height"))
+        except (KeyError, TypeError, ValueError):
+            continue
+        boxes.append(f'<span class="hotspot" title="{html.escape(str(el.get("text", "")))}" style="'
+                     f"left:{100 * x / page_w:.3f}%;top:{100 * y / page_h:.3f}%;"
+                     f'width:{100 * w / page_w:.3f}%;height:{100 * h / page_h:.3f}%"></span>')
+    return f'<div class="shot"><img src="{view["screenshot"]}" alt="" loading="lazy">{"".join(boxes)}</div>'
+
+
+def _simulation_html(snapshot):
+    title = snapshot.get("title") or "Page"
+    parts = [f"<h1>{html.escape(title)}</h1>"]
+    if snapshot.get("url"):
+        url = html.escape(snapshot["url"])
+        parts.append(f'<p><a href="{url}" rel="noopener">{url}</a></p>')
+    views = [("desktop", snapshot)] + list((snapshot.get("viewports") or {}).items())
+    for device, view in views:
+        if view.get("screenshot"):
+            parts.append(f"<h2>{html.escape(device.title())}</h2>{_hotspots_html(view)}")
+    return _page(title, "\n".join(parts))
+
+
+# --- Files ------------------------------------------------------------------
+
+def compress_screenshot(path, max_width=EXPORT_IMAGE_MAX_WIDTH, quality=EXPORT_IMAGE_QUALITY):
+    """(bytes, extension, original (w, h)) of a screenshot re-encoded as WebP, or JPEG when too tall."""
+    with Image.open(path) as img:
+        size = img.size
+        img = img.convert("RGB")
+        if img.width > max_width:
+            img = img.resize((max_width, max(1, round(img.height * max_width / img.width))),
+                             Image.Resampling.LANCZOS, reducing_gap=3.0)
+        buf = io.BytesIO()
+        if max(img.size) <= WEBP_MAX_SIDE:
+            img.save(buf, "WEBP", quality=quality, method=4)
+            ext = ".webp"
+        else:
+            img.save(buf, "JPEG", quality=quality, optimize=True, progressive=True)
+            ext = ".jpg"
+    return buf.getvalue(), ext, size
+
+
+def _content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+class BundleWriter:
+    """Writes a bundle into a scratch directory and swaps it in whole, so hosts never see half an export."""
+
+    def __init__(self, root):
+        self.root = root
+        self.files = {}  # relative path -> Cache-Control
+        self.bytes = 0
+        shutil.rmtree(root, ignore_errors=True)
+        os.makedirs(root)
+
+    def _target(self, rel, cache):
+        path = os.path.join(self.root, *rel.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.files[rel] = cache
+        return path
+
+    def write(self, rel, body, cache=REVALIDATE_CACHE):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        with open(self._target(rel, cache), "wb") as f:
+            f.write(body)
+        self.bytes += len(body)
+        return rel
+
+    def write_json(self, rel, data):
+        return self.write(rel, json.dumps(data, ensure_ascii=False, indent=2))
+
+    def write_hashed(self, folder, stem, ext, body):
+        return self.write(f"{folder}/{stem}.{_content_hash(body)}{ext}", body, IMMUTABLE_CACHE)
+
+    def copy_hashed(self, folder, stem, src):
+        """Hard-links (or copies) ``src`` in under a name carrying its content hash."""
+        with open(src, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()[:12]
+        rel = f"{folder}/{stem}.{digest}{os.path.splitext(src)[1]}"
+        path = self._target(rel, IMMUTABLE_CACHE)
+        try:
+            os.link(src, path)
+        except OSError:
+            shutil.copyfile(src, path)
+        self.bytes += os.path.getsize(path)
+        return rel
+
+    def write_headers(self):
+        """``_headers`` rules: hashed folders by wildcard, everything else by exact path."""
+        rules = {}
+        for rel, cache in sorted(self.files.items()):
+            folder = rel.split("/")[0]
+            key = f"/{folder}/*" if cache == IMMUTABLE_CACHE else f"/{rel}"
+            rules[key] = cache
+        rules["/"] = REVALIDATE_CACHE
+        body = "".join(f"{path}\n  Cache-Control: {cache}\n" for path, cache in rules.items())
+        self.write("_headers", body)
+
+    def commit(self, out_dir):
+        # Two renames: the old bundle is gone for an instant, never mixed with the new one.
+        old = f"{out_dir}.old-{os.getpid()}-{threading.get_ident()}"
+        if os.path.exists(out_dir):
+            os.replace(out_dir, old)
+        os.replace(self.root, out_dir)
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def screenshot_file(value):
+    """Path in scraped_data/ of a scrape's ``screenshot`` value, or None."""
+    # Scrapes saved on Windows store backslashes
+    name = os.path.basename((value or "").replace("\\", "/"))
+    if not SCREENSHOT_RE.fullmatch(name):
+        return None
+    path = os.path.join(SCRAPED_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+def _video_file(url, media_dir):
+    name = (url or "").rsplit("/", 1)[-1]
+    if not url or not url.startswith("/media/") or not VIDEO_RE.fullmatch(name):
+        return None
+    path = os.path.join(media_dir, name)
+    return path if os.path.isfile(path) else None
+
+
+def _export_view(bundle, view, stem):
+    """Scrape fields of one capture with its screenshot swapped for the bundle's compressed copy."""
+    out = {k: view[k] for k in ("viewport", "interactive_elements") if k in view}
+    src = screenshot_file(view.get("screenshot"))
+    out["screenshot"] = None
+    if src:
+        try:
+            body, ext, size = compress_screenshot(src)
+            out["screenshot"] = bundle.write_hashed("assets", stem, ext, body)
+            out["page_size"] = list(size)
+        except Exception as e:
+            print(f"[EXPORT] Skipping screenshot {src}: {e}")
+    return out
+
+
+def write_bundle(ws, course, out_dir, media_dir=MEDIA_DIR):
+    """Writes the static bundle for ``course`` (from ``gather_course``) to ``out_dir``. Returns a summary."""
+    start = time.time()
+    bundle = BundleWriter(f"{out_dir}.tmp-{os.getpid()}-{threading.get_ident()}")
+    try:
+        plan, lessons = course["plan"], course["lessons"]
+        scrape = ws.read_scrape_fields("title", "url", "screenshot", "viewport", "interactive_elements",
+                                       "viewports") or {}
+        snapshot = None
+        screenshots = 0
+        if scrape:
+            snapshot = {"title": scrape.get("title"), "url": scrape.get("url"),
+                        **_export_view(bundle, scrape, "screenshot")}
+            viewports = {device: _export_view(bundle, view, f"screenshot-{lesson_slug(device)}")
+                         for device, view in (scrape.get("viewports") or {}).items() if isinstance(view, dict)}
+            if viewports:
+                snapshot["viewports"] = viewports
+            screenshots = sum(1 for v in [snapshot, *viewports.values()] if v.get("screenshot"))
+            bundle.write_json("snapshot.json", snapshot)
+            if screenshots:
+                bundle.write("simulation.html", _simulation_html(snapshot))
+
+        recorded = ws.read_videos()
+        modules, videos, quizzes = {}, 0, 0
+        for lesson in lessons:
+            slug = lesson["slug"]
+            video = None
+            src = _video_file(recorded.get(lesson["title"]), media_dir)
+            if src:
+                video = bundle.copy_hashed("videos", slug, src)
+                videos += 1
+            entry = {"title": lesson["title"], "description": lesson["description"],
+                     "html": bundle.write(f"lessons/{slug}.html", _lesson_html(lesson, video)),
+                     "markdown": bundle.write(f"lessons/{slug}.md", lesson["content"]),
+                     "quiz": None, "video": video}
+            if lesson["quiz"]:
+                entry["quiz"] = bundle.write_json(f"quizzes/{slug}.json", {"questions": lesson["quiz"]})
+                quizzes += 1
+            modules.setdefault(lesson["module"], []).append(entry)
+
+        bundle.write("index.html", _index_html(plan, lessons, bool(screenshots)))
+        bundle.write_json("course.json", {
+            "course_title": plan.get("course_title"),
+            "description": plan.get("description"),
+            "exported_at": int(start),
+            "snapshot": "snapshot.json" if snapshot else None,
+            "modules": [{"title": title, "lessons": entries} for title, entries in modules.items()],
+        })
+        bundle.write_headers()
+        bundle.commit(out_dir)
+    except BaseException:
+        shutil.rmtree(bundle.root, ignore_errors=True)
+        raise
+    return {
+        "lessons": len(lessons),
+        "quizzes": quizzes,
+        "videos": videos,
+        "screenshots": screenshots,
+        "files": len(bundle.files),
+        "bytes": bundle.bytes,
+        "generated": course["generated"],
+        "seconds": round(time.time() - start, 2),
+    }
+
+
+def zip_bundle(out_dir):
+    """``out_dir``.zip of the bundle; media that is already compressed is stored, not deflated."""
+    zip_path = out_dir + ".zip"
+    tmp = f"{zip_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        with zipfile.ZipFile(tmp, "w") as zf:
+            for folder, _, names in os.walk(out_dir):
+                for name in sorted(names):
+                    path = os.path.join(folder, name)
+                    stored = name.endswith(STORED_EXTENSIONS)
+                    zf.write(path, os.path.relpath(path, out_dir).replace(os.sep, "/"),
+                             compress_type=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED)
+        os.replace(tmp, zip_path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return zip_path
+
+
+# --- Export -----------------------------------------------------------------
+
+async def gather_course(ws, planner, generate=True, limiter=None):
+    """Plan, lesson Markdown and quiz of every lesson; None without a plan.
+
+    With ``generate`` missing lessons and quizzes are written by ``planner``
+    (GENERATE_CONCURRENCY at a time) and saved to the workspace, so the
+    lesson page and later exports reuse them. Each lesson's generation also
+    holds a slot of ``limiter`` (the server passes its ``lesson`` admission
+    limiter). A lesson that can't be generated is exported as its outline
+    description.
+    """
+    plan = await offload(ws.read_plan)
+    if plan is None:
+        return None
+    lessons = course_lessons(plan)
+    context = None
+    if generate:
+        context = ((await offload(ws.read_scrape_fields, "text_content")) or {}).get("text_content", "")
+    sem = asyncio.Semaphore(GENERATE_CONCURRENCY)
+    generated = [0]
+
+    async def fill(lesson):
+        title = lesson["title"]
+        content = await offload(ws.read_lesson, title)
+        quiz = await offload(ws.read_quiz, title)
+        if generate and (content is None or quiz is None):
+            async with sem:
+                token = None
+                try:
+                    if limiter is not None:
+                        token = await limiter.acquire()
+                    if content is None:
+                        content = await planner.generate_lesson(title, context)
+                        await offload(ws.write_lesson, title, content)
+                        generated[0] += 1
+                    if quiz is None:
+                        quiz = await planner.generate_quiz(content)
+                        await offload(ws.write_quiz, title, quiz)
+                        generated[0] += 1
+                except Exception as e:
+                    print(f"[EXPORT] Generating {title!r} failed: {e}")
+                finally:
+                    if token is not None:
+                        limiter.release(token)
+        questions = valid_questions(quiz)
+        if quiz and (not isinstance(quiz, list) or len(questions) < len(quiz)):
+            print(f"[EXPORT] Dropped malformed quiz questions in {title!r}")
+        return {**lesson, "content": content or f"# {title}\n\n{lesson['description']}", "quiz": questions or None}
+
+    filled = await asyncio.gather(*(fill(lesson) for lesson in lessons))
+    for lesson in filled:
+        # Same key the workspace stores the lesson, quiz and video under
+        lesson["slug"] = lesson_slug(lesson["title"])
+    return {"plan": plan, "lessons": filled, "generated": generated[0]}
+
+
+_export_locks = {}
+_export_locks_guard = threading.Lock()
+
+
+def _write_locked(ws, course, out_dir, make_zip, media_dir):
+    with _export_locks_guard:
+        lock = _export_locks.setdefault(os.path.abspath(out_dir), threading.Lock())
+    # One export per course at a time; a second waits rather than racing the swap.
+    with lock:
+        report = write_bundle(ws, course, out_dir, media_dir)
+        if make_zip:
+            report["zip_bytes"] = os.path.getsize(zip_bundle(out_dir))
+    return report
+
+
+async def export_course(ws, planner, out_dir, generate=True, make_zip=True, media_dir=MEDIA_DIR, limiter=None):
+    """Gathers the course and writes its bundle (and zip) to ``out_dir``. Returns a summary, or None without a plan."""
+    course = await gather_course(ws, planner, generate, limiter)
+    if course is None:
+        return None
+    report = await offload(_write_locked, ws, course, out_dir, make_zip, media_dir)
+    print(f"[EXPORT] {out_dir}: {report['lessons']} lessons, {report['quizzes']} quizzes, "
+          f"{report['videos']} videos, {report['files']} files ({report['bytes']} bytes) in {report['seconds']}s")
+    return report
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("course_id", nargs="?", help="course to export (default: the legacy single course)")
+    parser.add_argument("--out", help="bundle directory (default: COURSE_EXPORTS_DIR/<course_id>)")
+    parser.add_argument("--no-generate", action="store_true", help="export only lessons and quizzes already saved")
+    parser.add_argument("--no-zip", action="store_true", help="skip writing <out>.zip")
+    args = parser.parse_args(argv)
+
+    from ai.planner import CoursePlanner
+
+    try:
+        ws = WorkspaceStore().get(args.course_id)
+    except ValueError as e:
+        print(e)
+        return 2
+    out_dir = args.out or export_dir(args.course_id)
+    report = asyncio.run(export_course(ws, CoursePlanner(), out_dir, generate=not args.no_generate,
+                                       make_zip=not args.no_zip))
+    if report is None:
+        print("No course plan found")
+        return 1
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
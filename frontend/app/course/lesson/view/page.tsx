@@ -11,7 +11,7 @@ interface Question {
     correct_index: number;
 }
 
-function QuizComponent({ content, onComplete }: { content: string, onComplete: () => void }) {
+function QuizComponent({ content, title, onComplete }: { content: string, title: string, onComplete: () => void }) {
     const [questions, setQuestions] = useState<Question[]>([]);
     const [loading, setLoading] = useState(false);
     const [score, setScore] = useState<number | null>(null);
@@ -24,7 +24,8 @@ function QuizComponent({ content, onComplete }: { content: string, onComplete: (
             const res = await fetch("/api/ai/quiz", {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ lesson_content: content }),
+                // The title lets the backend keep the quiz for the course's static export
+                body: JSON.stringify({ lesson_content: content, lesson_title: title }),
             });
             const data = await res.json();
             if (data.questions) {
@@ -222,6 +223,7 @@ function LessonContent() {
     const [error, setError] = useState("");
     const [videoUrl, setVideoUrl] = useState<string | null>(null);
     const [generatingVideo, setGeneratingVideo] = useState(false);
+    const [videoProgress, setVideoProgress] = useState<string | null>(null);
     const [mounted, setMounted] = useState(false);
     const [coursePlan, setCoursePlan] = useState<CoursePlan | null>(null);
     const [completedLessons, setCompletedLessons] = useState<string[]>([]);
@@ -254,7 +256,8 @@ function LessonContent() {
         try {
             // Priority 1: Try live scrape (Fresh content + Full Page capture)
             try {
-                const res = await fetch("/api/browser/scrape", { method: "POST" });
+                // Only the screenshot and hotspots are needed here, not the page text
+                const res = await fetch("/api/browser/scrape?fields=hotspots", { method: "POST" });
                 if (res.ok) {
                     const data = await res.json();
                     setSimData(data.data);
@@ -266,7 +269,7 @@ function LessonContent() {
 
             // Priority 2: Fallback to cached snapshot (Offline mode)
             // Use relative path — Next.js rewrites proxy it to the backend
-            const snapRes = await fetch("/api/browser/snapshot");
+            const snapRes = await fetch("/api/browser/snapshot?fields=hotspots");
             if (snapRes.ok) {
                 const data = await snapRes.json();
                 setSimData(data.data);
@@ -348,7 +351,8 @@ function LessonContent() {
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify({
                     title: lessonTitle,
-                    text_content: content
+                    text_content: content,
+                    progressive: true
                 }),
             });
 
@@ -360,32 +364,76 @@ function LessonContent() {
             }
 
             const startData = await res.json();
+            // Identical lesson already rendered: the backend answers with the URL directly.
+            if (startData.status === "complete" && startData.video_url) {
+                setVideoUrl(startData.video_url);
+                showBanner('success', "Video ready.");
+                return;
+            }
             if (!startData.job_id) {
                 showBanner('error', "Video error: " + (startData.detail || "Failed to start job"));
                 return;
             }
 
-            // 2. Poll for completion with a ~15 min budget.
-            // Start at 3s for snappier feedback, back off to 10s to cut load.
+            // 2. Follow the job over server-sent events (queue position, stage,
+            // encode percent, final URL). Falls back to polling if the stream
+            // can't be opened at all.
             const jobId = startData.job_id;
-            const deadline = Date.now() + 15 * 60 * 1000;
-            let wait = 3000;
-            while (Date.now() < deadline) {
-                await new Promise(r => setTimeout(r, wait));
-                wait = Math.min(wait + 1000, 10000);
-                const pollRes = await fetch(`/api/ai/video/status/${jobId}`);
-                if (!pollRes.ok) continue;
-                const job = await pollRes.json();
-
+            let showingPreview = false;
+            const handleJob = (job: any): boolean => {
+                // Progressive mode: play the low-res preview while the full encode finishes.
+                if (!showingPreview && job.status === "processing" && job.preview_url) {
+                    showingPreview = true;
+                    setVideoUrl(job.preview_url);
+                    showBanner('info', "Preview ready. Full quality video is still rendering.");
+                }
                 if (job.status === "complete" && job.video_url) {
                     setVideoUrl(job.video_url);
+                    setVideoProgress(null);
                     showBanner('success', "Video ready.");
-                    return;
+                    return true;
                 }
                 if (job.status === "failed") {
+                    setVideoProgress(null);
                     showBanner('error', "Video error: " + (job.detail || "Generation failed"));
-                    return;
+                    return true;
                 }
+                return false;
+            };
+
+            const streamed = await new Promise<boolean>((resolve) => {
+                if (typeof EventSource === "undefined") return resolve(false);
+                const source = new EventSource(`/api/ai/video/events/${jobId}`);
+                const finish = (ok: boolean) => { source.close(); resolve(ok); };
+                const data = (e: Event) => JSON.parse((e as MessageEvent).data || "{}");
+                source.addEventListener("queued", (e) => setVideoProgress(`Queued (position ${data(e).position})`));
+                source.addEventListener("stage", (e) => {
+                    const d = data(e);
+                    if (d.status === "running") setVideoProgress(`Rendering: ${d.name}`);
+                });
+                source.addEventListener("progress", (e) => setVideoProgress(`Encoding ${data(e).percent}%`));
+                source.addEventListener("asset", (e) => {
+                    const d = data(e);
+                    if (d.kind === "preview") handleJob({ status: "processing", preview_url: d.url });
+                });
+                source.addEventListener("complete", (e) => { handleJob({ status: "complete", ...data(e) }); finish(true); });
+                source.addEventListener("failed", (e) => { handleJob({ status: "failed", ...data(e) }); finish(true); });
+                // EventSource reconnects on its own (resuming via Last-Event-ID);
+                // CLOSED means the server refused the stream.
+                source.onerror = () => { if (source.readyState === EventSource.CLOSED) finish(false); };
+            });
+            if (streamed) return;
+
+            // Polling fallback with a ~15 min budget.
+            // Start at 3s for snappier feedback, back off to 10s to cut load.
+            const deadline = Date.now() + 15 * 60 * 1000;
+            let wait = 3000;
+            while (Date.now() < deadline) {
+                await new Promise(r => setTimeout(r, wait));
+                wait = Math.min(wait + 1000, 10000);
+                const pollRes = await fetch(`/api/ai/video/status/${jobId}`);
+                if (!pollRes.ok) continue;
+                if (handleJob(await pollRes.json())) return;
             }
             showBanner('error', "Video generation timed out. Please try again.");
         } catch (e) {
@@ -393,6 +441,7 @@ function LessonContent() {
             showBanner('error', "Video generation failed: " + msg);
         } finally {
             setGeneratingVideo(false);
+            setVideoProgress(null);
         }
     };
 
@@ -514,16 +563,16 @@ function LessonContent() {
                                     {/* Video Section with Glass Finish */}
                                     {(generatingVideo || videoUrl) && (
                                         <section className="relative group">
-                                            {generatingVideo && (
+                                            {generatingVideo && !videoUrl && (
                                                 <div className="aspect-video w-full rounded-3xl overflow-hidden bg-gray-50 dark:bg-white/5 border border-gray-200 dark:border-white/10 flex flex-col items-center justify-center space-y-4 animate-in fade-in zoom-in duration-500">
                                                     <div className="w-16 h-16 border-4 border-indigo-500 border-t-transparent rounded-full animate-spin shadow-[0_0_30px_rgba(99,102,241,0.3)]"></div>
                                                     <div className="text-center">
                                                         <h3 className="text-xl font-bold text-gray-900 dark:text-white uppercase tracking-tighter">Synthesizing Sora Clips...</h3>
-                                                        <p className="text-indigo-600/70 dark:text-indigo-300/60 text-xs">Several minutes required for high-fidelity rendering</p>
+                                                        <p className="text-indigo-600/70 dark:text-indigo-300/60 text-xs">{videoProgress || "Several minutes required for high-fidelity rendering"}</p>
                                                     </div>
                                                 </div>
                                             )}
-                                            {videoUrl && !generatingVideo && (
+                                            {videoUrl && (
                                                 <div className="rounded-3xl overflow-hidden shadow-[0_0_100px_rgba(0,0,0,0.15)] dark:shadow-[0_0_100px_rgba(0,0,0,0.5)] border border-gray-200 dark:border-white/10 p-1 bg-gray-50 dark:bg-white/5">
                                                     <video controls className="w-full aspect-video rounded-2xl bg-black shadow-inner" src={videoUrl}>
                                                         Your browser does not support the video tag.
@@ -552,7 +601,7 @@ function LessonContent() {
 
                                     {/* Interaction Hub */}
                                     <section className="mt-20 pt-12 border-t border-gray-200 dark:border-white/5">
-                                        <QuizComponent content={content || ""} onComplete={markAsComplete} />
+                                        <QuizComponent content={content || ""} title={lessonTitle || ""} onComplete={markAsComplete} />
                                     </section>
                                 </>
                             ) : (
@@ -2,6 +2,16 @@
 
 import { useState } from "react";
 
+const BUILD_STAGE_LABELS: Record<string, string> = {
+    launch: "Launching browser...",
+    navigate: "Navigating...",
+    text: "Reading page text...",
+    outline: "Generating course curriculum with AI...",
+    elements: "Capturing interactive elements...",
+    screenshot: "Capturing screenshot...",
+    save: "Saving course...",
+};
+
 export default function UrlInput() {
     const [url, setUrl] = useState("");
     const [loading, setLoading] = useState(false);
@@ -53,46 +63,72 @@ export default function UrlInput() {
         }
     };
 
+    const finishBuild = (job: { status: string; total_seconds?: number; detail?: string }) => {
+        if (job.status === "complete") {
+            setStatus(`Success! Course built in ${job.total_seconds}s. Redirecting to course viewer...`);
+            // Short delay to let the user see the success message
+            setTimeout(() => {
+                window.location.href = "/course/viewer";
+            }, 1000);
+            return true;
+        }
+        if (job.status === "failed") {
+            setStatus("Error: " + (job.detail || "Course build failed"));
+            return true;
+        }
+        return false;
+    };
+
+    // One server-side job: launch, navigate, read the text, then plan the course
+    // while elements and the screenshot are still being captured.
     const handleStartScrape = async () => {
         setLoading(true);
-        setStatus("Starting scraper...");
+        setStatus("Starting course build...");
         try {
-            // Launch headless with auth
-            const launchRes = await fetch("/api/browser/launch", {
+            const res = await fetch("/api/course/build", {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ headless: true, use_auth: true }),
+                body: JSON.stringify({ url, use_auth: true }),
             });
-            if (!launchRes.ok) {
-                const err = await launchRes.json().catch(() => ({ detail: "Browser launch failed" }));
-                setStatus("Error: " + (err.detail || "Browser launch failed"));
+            if (!res.ok) {
+                const err = await res.json().catch(() => ({ detail: "Course build failed" }));
+                setStatus("Error: " + (err.detail || "Course build failed"));
                 return;
             }
-
-            setStatus("Navigating...");
-            const navRes = await fetch("/api/browser/navigate", {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ url }),
+            const { job_id: jobId } = await res.json();
+
+            const streamed = await new Promise<boolean>((resolve) => {
+                if (typeof EventSource === "undefined") return resolve(false);
+                const source = new EventSource(`/api/course/build/${jobId}/events`);
+                const finish = (ok: boolean) => { source.close(); resolve(ok); };
+                const data = (e: Event) => JSON.parse((e as MessageEvent).data || "{}");
+                const running = new Set<string>();
+                source.addEventListener("stage", (e) => {
+                    const d = data(e);
+                    if (d.status === "running") running.add(d.name);
+                    else running.delete(d.name);
+                    const labels = Array.from(running).map((name) => BUILD_STAGE_LABELS[name] || name);
+                    if (labels.length) setStatus(labels.join(" + "));
+                });
+                source.addEventListener("plan", (e) => {
+                    setStatus(`Curriculum ready after ${data(e).seconds}s, finishing page capture...`);
+                });
+                source.addEventListener("complete", (e) => { finishBuild({ status: "complete", ...data(e) }); finish(true); });
+                source.addEventListener("failed", (e) => { finishBuild({ status: "failed", ...data(e) }); finish(true); });
+                // EventSource reconnects on its own (resuming via Last-Event-ID);
+                // CLOSED means the server refused the stream.
+                source.onerror = () => { if (source.readyState === EventSource.CLOSED) finish(false); };
             });
-            if (!navRes.ok) {
-                const err = await navRes.json().catch(() => ({ detail: "Navigation failed" }));
-                setStatus("Error: " + (err.detail || "Navigation failed"));
-                return;
+            if (streamed) return;
+
+            // Polling fallback
+            const deadline = Date.now() + 5 * 60 * 1000;
+            while (Date.now() < deadline) {
+                await new Promise(r => setTimeout(r, 2000));
+                const pollRes = await fetch(`/api/course/build/${jobId}`);
+                if (pollRes.ok && finishBuild(await pollRes.json())) return;
             }
-
-            setStatus("Scraping content...");
-            const res = await fetch("/api/browser/scrape", { method: "POST" });
-            if (!res.ok) {
-                const err = await res.json().catch(() => ({ detail: "Scrape failed" }));
-                setStatus("Error: " + (err.detail || "Scrape failed"));
-                return;
-            }
-            const data = await res.json();
-
-            console.log("Scraped Data:", data);
-            setStatus("Scrape complete! Click 'Generate Curriculum' to proceed.");
-
+            setStatus("Error: course build timed out. Please try again.");
         } catch (e) {
             console.error(e);
             setStatus("Error: " + e);
@@ -101,39 +137,6 @@ export default function UrlInput() {
         }
     };
 
-    const handleGenerateCurriculum = async () => {
-        setLoading(true);
-        setStatus("Generating course curriculum with AI...");
-        try {
-            const res = await fetch("/api/ai/plan", { method: "POST" });
-            const data = await res.json();
-
-            console.log("Generated Plan Response:", data);
-
-            // Check for success status OR valid plan data
-            if (data.status === "planned" || (data.plan && data.plan.course_title)) {
-                setStatus(`Success! Redirecting to course viewer...`);
-                // Force redirect after short delay to let user see success msg
-                setTimeout(() => {
-                    window.location.href = "/course/viewer";
-                }, 1000);
-            } else if (data.error) {
-                setStatus(`Error: ${data.error}`);
-            } else if (data.detail) {
-                // FastAPI standard error
-                setStatus(`Backend Error: ${data.detail}`);
-            } else {
-                setStatus(`Unknown response: ${JSON.stringify(data)}`);
-            }
-
-        } catch (e) {
-            console.error(e);
-            setStatus("Error generating curriculum: " + e);
-        } finally {
-            setLoading(false);
-        }
-    };
-
     return (
         <div className="w-full max-w-xl mx-auto p-6 bg-white dark:bg-zinc-800 rounded-xl shadow-lg space-y-4">
             <div className="flex flex-col space-y-2">
@@ -174,16 +177,6 @@ export default function UrlInput() {
                 </button>
             )}
 
-            {status.includes("Scrape complete") && (
-                <button
-                    onClick={handleGenerateCurriculum}
-                    disabled={loading}
-                    className="w-full bg-purple-600 hover:bg-purple-700 text-white font-bold py-2 px-4 rounded disabled:opacity-50"
-                >
-                    {loading ? "Generating..." : "🤖 Generate Curriculum"}
-                </button>
-            )}
-
             {status && (
                 <div className="p-3 bg-zinc-100 dark:bg-zinc-900 rounded text-sm font-mono break-words">
                     &gt; {status}